@@ -0,0 +1,76 @@
+"""
+계정과목 마스터 인덱스 (new_docs/guide/계정과목및적요등록.json)
+- 계정코드 → 기준계정명, 표준계정(cd_stacctit/nm_stacctit), 차대구분(ty_crdr), 계정분류(key_gr)
+- 최초 1회 JSON을 파싱해 pickle로 컴파일, 이후 실행은 캐시만 로드 (캐시 폴더는 호출 측 출력 루트 기준)
+"""
+import json
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).parent.parent
+MASTER_FILE = BASE_DIR / "new_docs" / "guide" / "계정과목및적요등록.json"
+CACHE_NAME = "account_master.pkl"
+
+# 원본 필드 → 인덱스 컬럼
+MASTER_COLS = {
+    'cd_acctit': '계정코드',
+    'nm_acctit': '기준계정명',
+    'cd_stacctit': '표준계정코드',
+    'nm_stacctit': '표준계정명',
+    'ty_crdr': '차대구분',
+    'key_gr': '계정분류',
+}
+
+
+def compile_account_master(master_file: Path = MASTER_FILE) -> pd.DataFrame:
+    """마스터 JSON을 계정코드 인덱스 DataFrame으로 변환"""
+    with open(master_file, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+
+    master = pd.DataFrame(raw)[list(MASTER_COLS)].rename(columns=MASTER_COLS)
+    master['표준계정코드'] = master['표준계정코드'].fillna('').astype(str)
+    master['표준계정명'] = master['표준계정명'].fillna('')
+    return master.drop_duplicates('계정코드').set_index('계정코드')
+
+
+def load_account_master(cache_dir: Path, master_file: Path = MASTER_FILE) -> pd.DataFrame:
+    """컴파일된 마스터 인덱스 로드 (원본 JSON이 바뀌면 다시 컴파일)
+
+    Args:
+        cache_dir: 컴파일 결과를 둘 폴더 (예: {출력 루트}/_cache)
+    """
+    cache_file = cache_dir / CACHE_NAME
+    stat = master_file.stat()
+    signature = (stat.st_size, stat.st_mtime_ns)
+
+    if cache_file.exists():
+        cached = pd.read_pickle(cache_file)
+        if cached.get('signature') == signature:
+            return cached['master']
+
+    master = compile_account_master(master_file)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    pd.to_pickle({'signature': signature, 'master': master}, cache_file)
+    return master
+
+
+def lookup_accounts(master: pd.DataFrame, codes: pd.Series) -> pd.DataFrame:
+    """계정코드 Series를 마스터 정보로 조회 (codes와 같은 인덱스)
+
+    마스터에 없는 세부코드(예: 즉시원가 45101)는 기본코드(45100)로 다시 조회한다.
+    """
+    codes = codes.fillna('').astype(str)
+    found = master.reindex(codes)
+    found.index = codes.index
+
+    missing = found['기준계정명'].isna()
+    if missing.any():
+        base_codes = codes[missing].str[:3] + '00'
+        fallback = master.reindex(base_codes)
+        fallback.index = base_codes.index
+        found.loc[missing] = fallback
+
+    found['표준계정코드'] = found['표준계정코드'].fillna('')
+    found['표준계정명'] = found['표준계정명'].replace('', '(미분류)').fillna('(미분류)')
+    return found
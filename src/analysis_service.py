@@ -0,0 +1,287 @@
+"""
+분석 결과 조회 서비스 (로컬 상주)
+- 회사별 결과 캐시(output/{회사명}/_results/, analyze_thej.py 실행 시 저장)의 원본 장부/큐브/결과 테이블을 메모리에 유지
+- 메모리 상한(MEMORY_LIMIT_MB)을 넘으면 가장 오래 사용하지 않은 회사부터 내림 (LRU)
+- 분석 스크립트가 다시 실행되어 새 결과가 저장되면 다음 요청에서 새 결과로 교체
+- 피벗/Top-N/월별추이/이상거래 조회는 분석 시트와 같은 큐브와 함수(cube.top_n 등)로 계산
+  (피벗은 회사별 CubeQuery로 메모이제이션 - 같은 조회 반복은 캐시된 결과 사용)
+- localhost HTTP 또는 Unix 소켓으로 GET 요청에 JSON 응답
+
+실행:
+    python src/analysis_service.py                    # http://127.0.0.1:8765
+    python src/analysis_service.py --socket /tmp/analysis.sock
+
+조회 예:
+    GET /companies
+    GET /{회사명}/pivot?rows=계정과목&columns=월&measure=순액&손익분류=판관비
+    GET /{회사명}/top?by=계정과목&item=거래처명_filled&n=10&손익분류=판관비
+    GET /{회사명}/monthly
+    GET /{회사명}/anomalies?유형=금액이상,마이너스
+    GET /{회사명}/sheet/{시트명}?offset=0&limit=100
+"""
+import argparse
+import json
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, unquote, urlparse
+
+import numpy as np
+import pandas as pd
+
+from cell_store import SparseCellStore
+from cube import top_n
+from cube_query import CubeQuery
+from result_cache import latest_results
+from result_export import df_to_dict
+
+BASE_DIR = Path(__file__).parent.parent
+OUTPUT_ROOT = BASE_DIR / "output"
+
+# 메모리에 유지할 결과 전체 크기 상한 (MB)
+MEMORY_LIMIT_MB = 2048
+
+DEFAULT_PORT = 8765
+
+
+def _nbytes(table) -> int:
+    """테이블 메모리 사용량 추정 (byte)"""
+    if isinstance(table, SparseCellStore):
+        return table.positions.nbytes + table.values.nbytes + int(table.groups.memory_usage(deep=True).sum())
+    if isinstance(table, pd.DataFrame):
+        return int(table.memory_usage(deep=True).sum())
+    return 0
+
+
+def results_nbytes(results: dict) -> int:
+    """결과 dict 전체 메모리 사용량 추정 (byte)"""
+    return _nbytes(results['cube']) + sum(_nbytes(t) for t in results['tables'].values())
+
+
+class CompanyStore:
+    """회사별 결과 LRU 저장소 (스레드 안전)
+
+    Args:
+        output_root: output/ 디렉토리 (회사별 하위 디렉토리의 _results/ 를 읽음)
+        memory_limit_mb: 메모리 상한 (가장 최근 회사 하나는 상한을 넘어도 유지)
+    """
+
+    def __init__(self, output_root: Path = OUTPUT_ROOT, memory_limit_mb: int = MEMORY_LIMIT_MB):
+        self.output_root = output_root
+        self.memory_limit = memory_limit_mb * 1024 * 1024
+        self.entries = OrderedDict()   # 회사명 → (캐시 파일, 결과, 크기)
+        self.lock = threading.Lock()
+
+    def companies(self) -> list:
+        return sorted(p.parent.name for p in self.output_root.glob('*/_results') if any(p.glob('analysis_*.pkl')))
+
+    def loaded(self) -> dict:
+        with self.lock:
+            return {name: size for name, (_, _, size) in self.entries.items()}
+
+    def get(self, company: str) -> dict:
+        """회사 결과 (메모리에 없거나 더 최근 결과가 저장됐으면 로드)"""
+        cache_dir = self.output_root / company / "_results"
+        newest = max(cache_dir.glob('analysis_*.pkl'), key=lambda p: p.stat().st_mtime, default=None)
+        if newest is None:
+            raise KeyError(f"결과 캐시 없음: {company} (analyze_thej.py를 먼저 실행)")
+
+        with self.lock:
+            entry = self.entries.get(company)
+            if entry is not None and entry[0] == newest:
+                self.entries.move_to_end(company)
+                return entry[1]
+
+        # 로드는 잠금 밖에서 (다른 회사 조회를 막지 않음)
+        path, results = latest_results(cache_dir)
+        if results is None:
+            raise KeyError(f"현재 버전의 결과 캐시 없음: {company}")
+        size = results_nbytes(results)
+        results = {**results, 'query': CubeQuery(results['cube'])}
+
+        with self.lock:
+            self.entries[company] = (path, results, size)
+            self.entries.move_to_end(company)
+            total = sum(s for _, _, s in self.entries.values())
+            while total > self.memory_limit and len(self.entries) > 1:
+                _, (_, _, evicted) = self.entries.popitem(last=False)
+                total -= evicted
+        return results
+
+
+# ============================================================
+# 조회 (분석 시트와 같은 큐브/함수 사용)
+# ============================================================
+def _param(params: dict, name: str, default=None):
+    return params[name][0] if name in params else default
+
+
+def _list_param(params: dict, name: str) -> list:
+    return [v for value in params.get(name, []) for v in value.split(',') if v]
+
+
+def apply_filters(frame: pd.DataFrame, params: dict, reserved: set) -> pd.DataFrame:
+    """컬럼명과 같은 쿼리 파라미터를 필터로 적용 (쉼표로 여러 값 OR, 숫자 컬럼은 숫자로 비교)"""
+    mask = np.ones(len(frame), dtype=bool)
+    for col in params:
+        if col in reserved:
+            continue
+        if col not in frame.columns:
+            raise ValueError(f"알 수 없는 필터 컬럼: {col}")
+        values = _list_param(params, col)
+        if pd.api.types.is_numeric_dtype(frame[col]):
+            values = pd.to_numeric(pd.Series(values), errors='coerce').dropna().tolist()
+        mask &= frame[col].isin(values).to_numpy()
+    return frame[mask]
+
+
+def query_pivot(results: dict, params: dict) -> list:
+    """큐브 피벗: rows × columns 의 measure 합계 (CubeQuery 메모이제이션)"""
+    rows = _list_param(params, 'rows') or ['손익분류']
+    columns = _list_param(params, 'columns')
+    measure = _param(params, 'measure', '순액')
+    cube = results['cube']
+
+    filters = {}
+    for col in params:
+        if col in {'rows', 'columns', 'measure'}:
+            continue
+        values = _list_param(params, col)
+        if col in cube.columns and pd.api.types.is_numeric_dtype(cube[col]):
+            values = pd.to_numeric(pd.Series(values), errors='coerce').dropna().tolist()
+        filters[col] = values
+
+    pivot = results['query'].query(rows, filters, [measure], columns)
+    if columns:
+        pivot.columns = ['_'.join(str(level) for level in col) if isinstance(col, tuple) else str(col)
+                         for col in pivot.columns]
+    return df_to_dict(pivot.reset_index())
+
+
+def query_top(results: dict, params: dict) -> list:
+    """그룹별 Top-N (cube.top_n)"""
+    by = _list_param(params, 'by')
+    item = _param(params, 'item', '거래처명_filled')
+    n = int(_param(params, 'n', 10))
+    measure = _param(params, 'measure', '순액')
+    cube = apply_filters(results['cube'], params, {'by', 'item', 'n', 'measure'})
+    return df_to_dict(top_n(cube, by, item, n, value=measure))
+
+
+def query_monthly(results: dict, params: dict) -> list:
+    """월별추이 시트 (손익분류 × 월 + 합계/평균)"""
+    trend = results['tables']['월별추이'].reset_index()
+    return df_to_dict(apply_filters(trend, params, set()))
+
+
+def query_anomalies(results: dict, params: dict) -> list:
+    """이상거래 시트 (유형/계정과목 등 컬럼 필터)"""
+    anomalies = results['tables']['이상거래']
+    if len(anomalies) == 0:
+        return []
+    return df_to_dict(apply_filters(anomalies, params, set()))
+
+
+def query_sheet(results: dict, name: str, params: dict) -> dict:
+    """결과 시트 한 페이지"""
+    table = results['tables'].get(name)
+    if table is None:
+        raise KeyError(f"시트 없음: {name}")
+    frame = table.to_frame() if isinstance(table, SparseCellStore) else table.reset_index(drop=isinstance(table.index, pd.RangeIndex))
+    offset = int(_param(params, 'offset', 0))
+    limit = int(_param(params, 'limit', 1000))
+    return {'행수': len(frame), 'offset': offset, 'rows': df_to_dict(frame.iloc[offset:offset + limit])}
+
+
+QUERIES = {
+    'pivot': query_pivot,
+    'top': query_top,
+    'monthly': query_monthly,
+    'anomalies': query_anomalies,
+}
+
+
+# ============================================================
+# HTTP 처리
+# ============================================================
+class ServiceHandler(BaseHTTPRequestHandler):
+    store: CompanyStore = None
+
+    def do_GET(self):
+        start = time.perf_counter()
+        url = urlparse(self.path)
+        parts = [unquote(p) for p in url.path.strip('/').split('/') if p]
+        params = parse_qs(url.query)
+
+        try:
+            if parts == ['companies']:
+                body = {'companies': self.store.companies(), 'loaded': self.store.loaded()}
+            elif len(parts) >= 2 and parts[1] == 'sheet':
+                body = query_sheet(self.store.get(parts[0]), '/'.join(parts[2:]), params)
+            elif len(parts) == 2 and parts[1] in QUERIES:
+                body = QUERIES[parts[1]](self.store.get(parts[0]), params)
+            else:
+                raise KeyError(f"알 수 없는 경로: {url.path}")
+            status = 200
+        except KeyError as e:
+            status, body = 404, {'오류': str(e.args[0])}
+        except (ValueError, TypeError) as e:
+            status, body = 400, {'오류': str(e)}
+
+        payload = json.dumps(body, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(payload)))
+        self.send_header('X-Elapsed-Ms', f"{(time.perf_counter() - start) * 1000:.1f}")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def address_string(self):
+        # Unix 소켓은 client_address가 빈 문자열
+        return self.client_address[0] if self.client_address else 'unix'
+
+
+class UnixHTTPServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    daemon_threads = True
+
+
+def serve(host: str = '127.0.0.1', port: int = DEFAULT_PORT, socket_path: str = None,
+          memory_limit_mb: int = MEMORY_LIMIT_MB, output_root: Path = OUTPUT_ROOT):
+    """서비스 실행 (socket_path를 주면 Unix 소켓, 아니면 localhost HTTP)"""
+    ServiceHandler.store = CompanyStore(output_root, memory_limit_mb)
+
+    if socket_path:
+        Path(socket_path).unlink(missing_ok=True)
+        server = UnixHTTPServer(socket_path, ServiceHandler)
+        print(f"분석 서비스: unix:{socket_path}")
+    else:
+        server = ThreadingHTTPServer((host, port), ServiceHandler)
+        print(f"분석 서비스: http://{host}:{port}")
+    print(f"   회사: {', '.join(ServiceHandler.store.companies()) or '(결과 캐시 없음)'} / 메모리 상한 {memory_limit_mb}MB")
+
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        if socket_path:
+            Path(socket_path).unlink(missing_ok=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='분석 결과 조회 서비스')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--socket', help='Unix 소켓 경로 (지정하면 HTTP 포트 대신 사용)')
+    parser.add_argument('--memory-mb', type=int, default=MEMORY_LIMIT_MB)
+    parser.add_argument('--output-root', type=Path, default=OUTPUT_ROOT)
+    args = parser.parse_args()
+    serve(args.host, args.port, args.socket, args.memory_mb, args.output_root)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,36 +3,137 @@
 - 기본 피벗, 거래처별, 증빙유형별, 월별 추이, 카드 현황
 - 요일별 패턴, 금액구간별, 계정월별상세, 이상거래 탐지
 """
-import json
-import numpy as np
+import argparse
+import sys
+import time
 import pandas as pd
 from pathlib import Path
-from datetime import datetime
+
+from account_master import MASTER_FILE as ACCOUNT_MASTER_FILE, load_account_master, lookup_accounts
+from calendar_dim import build_calendar, entry_lags, join_calendar, lag_parse_report, lag_summary
+from card_matching import reconcile_cards
+from cell_store import SparseCellStore
+from cube import grouping_sets, merge_account_stats, top_n
+from cube_query import CubeQuery, build_sheet
+from duplicates import find_duplicates
+from incremental import load_state, save_state, update_state
+from loader import COLUMN_DICT_FILE, index_ledger, ledger_year, load_ledger
+from ordering import EV_TYPE_ORDER, SheetOrdering
+from result_cache import load_results, result_key, save_results
+from result_export import export_results
+from slice_index import SliceIndex
+from stages import default_workers, gil_enabled, run_stages
+from trader_names import canonical_trader_names, merge_proposal_report
+from validation import validate
+
+# 명령행 인자 (모두 생략 가능, 생략하면 아래 기본 설정)
+# - --legacy-compatible: 최적화 이전 출력과 같은 결과가 나오도록 거래처명 정규화/중복 행 제거를 끔 (verify.py 비교용)
+# - --no-cache: 결과 캐시/증분 상태를 읽거나 쓰지 않음, --no-export: 집계만 하고 파일 출력 생략
+parser = argparse.ArgumentParser(description='회계 데이터 분석')
+parser.add_argument('--input', type=Path, help='병합 결과 파일 (기본: 더제이의원 샘플)')
+parser.add_argument('--company', help='회사명 (기본: 입력 파일의 폴더명)')
+parser.add_argument('--output-root', type=Path, help='출력 루트 폴더 (기본: output)')
+parser.add_argument('--legacy-compatible', action='store_true')
+parser.add_argument('--no-cache', action='store_true')
+parser.add_argument('--no-export', action='store_true')
+args = parser.parse_args()
 
 # 경로 설정
 BASE_DIR = Path(__file__).parent.parent
-INPUT_FILE = BASE_DIR / "input_merged_datas" / "더제이의원" / "result_2024_v01_20260106_225407.json"
-OUTPUT_DIR = BASE_DIR / "output" / "더제이의원"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+INPUT_FILE = args.input or BASE_DIR / "input_merged_datas" / "더제이의원" / "result_2024_v01_20260106_225407.json"
 
 # 회사명 (파일명에서 추출하거나 지정)
-COMPANY_NAME = "더제이의원"
+COMPANY_NAME = args.company or INPUT_FILE.parent.name
+
+OUTPUT_ROOT = args.output_root or BASE_DIR / "output"
+OUTPUT_DIR = OUTPUT_ROOT / COMPANY_NAME
+OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+
+# 증분 모드: 이전 실행의 월별 집계 상태를 재사용하고 신규/변경된 월만 다시 집계
+# - --no-cache면 상태 파일을 읽지도 쓰지도 않고 전체 집계
+INCREMENTAL = not args.no_cache
+STATE_FILE = OUTPUT_DIR / "incremental_state.pkl"
+
+# 컬럼 투영: 분석에 필요한 컬럼만 파싱 (Smart-A 원본 필드명 export 또는 대용량 고객사)
+# - False면 원본데이터 시트에 병합 파일의 모든 컬럼을 그대로 출력
+PROJECT_COLUMNS = False
+
+# 중복 행 제거: 기본 키(데이터키+입력순서)와 모든 값이 같은 행(이중 병합)은 첫 행만 남김
+# - False면 탐지만 하고 데이터품질 시트에 기록 (키만 같고 내용이 다른 행은 항상 유지)
+DEDUP_ROWS = not args.legacy_compatible
+
+# 거래처명 정규화: (주)/주식회사, 공백, 지점 접미사 표기 차이와 사업자등록번호/거래처코드가 같은 이름을 대표명으로 통일
+# - 사업자등록번호가 서로 다른 이름은 묶지 않음
+NORMALIZE_TRADERS = not args.legacy_compatible
+TRADER_INDEX_FILE = OUTPUT_DIR / "trader_names.pkl"
+
+# 기본_거래처_증빙유형 compact 모드: 값이 없는(0) 증빙유형 행은 출력하지 않음
+COMPACT_TRADER_EV = False
+
+# 컬럼 형식 출력: 'parquet' 또는 'arrow' (Arrow IPC), None이면 출력 안 함 (pyarrow 필요)
+COLUMNAR_FORMAT = 'parquet'
+
+# 섹션 단위 JSON Lines 출력: 섹션별 행 수/바이트 오프셋 인덱스와 함께 기록 (포털의 섹션/페이지 단위 조회용)
+JSON_SECTIONS = True
+
+EXPORT_OPTIONS = dict(compact_trader_ev=COMPACT_TRADER_EV, columnar_format=COLUMNAR_FORMAT, json_sections=JSON_SECTIONS)
+
+# 4~12단계 동시 실행 작업 스레드 수 (None이면 코어 수, 1이면 순차 실행)
+STAGE_WORKERS = None
+
+# 결과 캐시: 입력 파일/계정과목 마스터/컬럼 사전 내용, 분석 설정, 로직 버전(result_cache.RESULT_VERSION)이
+# 모두 같으면 큐브와 결과 테이블을 output/{회사명}/_results/ 에서 읽어 집계 없이 바로 출력
+RESULT_CACHE = not args.no_cache
+RESULT_CACHE_DIR = OUTPUT_DIR / "_results"
+
+# 선언형 시트: {시트명: 큐브 조회 정의} (cube_query.build_sheet)
+# - dimensions(행) × columns(열) 의 measure(순액/건수) 합계 + totals(합계/평균) + order(행 순서 기준 차원), filters로 부분 선택
+# - 새 집계 시트는 여기에 추가 (결과 캐시/Excel/JSON/컬럼 형식 출력에 포함, 기존 시트 목록에 없으면 맨 뒤에 출력)
+REPORT_SHEETS = {
+    '월별추이': dict(dimensions=['손익분류'], columns=['월'], totals=['합계', '평균'], order='정렬순서'),
+    '계정월별': dict(dimensions=['정렬순서', '손익분류', '계정과목'], columns=['월'], totals=['합계']),
+}
+
+# ============================================================
+# 0. 결과 캐시 확인
+# ============================================================
+result_cache_key = result_key(
+    [INPUT_FILE, ACCOUNT_MASTER_FILE, COLUMN_DICT_FILE],
+    settings={'project': PROJECT_COLUMNS, 'dedup': DEDUP_ROWS, 'normalize_traders': NORMALIZE_TRADERS,
+              'report_sheets': REPORT_SHEETS},
+)
+cached_results = load_results(RESULT_CACHE_DIR, result_cache_key) if RESULT_CACHE else None
+if cached_results is not None:
+    print(f"0. 입력/설정/로직 버전 변경 없음 → 캐시된 결과 사용 (키 {result_cache_key}, 집계 생략)")
+    if not args.no_export:
+        export_results(cached_results, OUTPUT_DIR, COMPANY_NAME, **EXPORT_OPTIONS)
+    sys.exit(0)
 
 # ============================================================
 # 1. 데이터 로드
 # ============================================================
 print("1. 데이터 로드 중...")
 
-# Excel 또는 JSON 파일 로드
-if INPUT_FILE.suffix == '.xlsx':
-    df = pd.read_excel(INPUT_FILE)
-else:
-    with open(INPUT_FILE, 'r', encoding='utf-8') as f:
-        raw = json.load(f)
-    df = pd.DataFrame(raw['data'])
-df_original = df.copy()  # 원본 보존
+# Excel 또는 JSON 파일 로드 (원본 필드명 export는 column_name_dict.json 기준으로 변환)
+load_start = time.perf_counter()
+df = load_ledger(INPUT_FILE, project=PROJECT_COLUMNS)
+load_elapsed = time.perf_counter() - load_start
 print(f"   총 {len(df)}건 로드 완료")
 
+# 1.1 기본 키 인덱스 (데이터키+입력순서 해시), 완전 중복 행 제거
+df, key_index = index_ledger(df, collapse=DEDUP_ROWS)
+if len(key_index.duplicates) or len(key_index.conflicts):
+    print(f"   기본 키: 완전 중복 {len(key_index.duplicates)}건" + (" 제거" if DEDUP_ROWS else " (유지)")
+          + f", 키 충돌 {len(key_index.conflicts)}건")
+df_original = df.copy()  # 원본 보존 (완전 중복 제거 후)
+
+# 1.2 입력 검증 (기본 키 + 핵심/조건부 필수 컬럼 규칙, 파생 컬럼 생성 전 원본 기준)
+validate_start = time.perf_counter()
+data_quality = pd.concat([key_index.report(), validate(df)], ignore_index=True)
+violated = data_quality[data_quality['위반건수'] > 0]
+print(f"   입력 검증: 규칙 {len(data_quality)}개 중 {len(violated)}개 위반, 위반 {violated['위반건수'].sum():,}건 "
+      f"({time.perf_counter() - validate_start:.2f}초 / 로드 {load_elapsed:.2f}초)")
+
 # ============================================================
 # 2. 파생 컬럼 생성
 # ============================================================
@@ -56,10 +157,26 @@ def get_source_type(row):
 
 df['소스유형'] = df.apply(get_source_type, axis=1)
 
-# 2.3 요일 (회계일자에서 추출)
-df['회계일자_dt'] = pd.to_datetime(df['회계일자'], format='%Y%m%d', errors='coerce')
-df['요일'] = df['회계일자_dt'].dt.dayofweek  # 0=월, 6=일
-df['요일명'] = df['요일'].map({0:'월', 1:'화', 2:'수', 3:'목', 4:'금', 5:'토', 6:'일'})
+# 2.2 회계연도 (년도 컬럼, 월 단위 집계의 날짜 표시와 출력 기간에 사용)
+fiscal_year = ledger_year(df)
+
+# 2.3 달력 차원 (고유 회계일자만 파싱 → 날짜 코드로 결합)
+# - 요일(0=월, 6=일), 요일명, 주말, 평일공휴일, 분기, 반기 (원본 공휴일여부 플래그는 그대로 둠)
+date_codes, calendar = build_calendar(df)
+df['회계일자_dt'] = calendar['일자'].to_numpy()[date_codes]
+df.loc[date_codes < 0, '회계일자_dt'] = pd.NaT
+df = join_calendar(df, date_codes, calendar, ['요일', '요일명', '주말', '평일공휴일', '분기', '반기'])
+
+# 2.3.1 입력/수정/전송 지연일수 (회계일자 대비, 고유 일시만 파싱)
+lags = entry_lags(df, df['회계일자_dt'].to_numpy())
+df[lags.columns] = lags
+
+# 값이 있는데 일시로 읽히지 않는 행은 지연 분석에서 빠지므로 데이터품질 시트에 보고
+lag_quality = lag_parse_report(df)
+data_quality = pd.concat([data_quality, lag_quality], ignore_index=True)
+unparsed = lag_quality[lag_quality['위반건수'] > 0] if len(lag_quality) else lag_quality
+for _, row in unparsed.iterrows():
+    print(f"   경고: {row['컬럼']}: 일시 형식 오류 {row['위반건수']:,}건 (지연 분석 제외)")
 
 # 2.4 금액구간
 def get_amount_range(amt):
@@ -91,205 +208,163 @@ evidence_names = {
 }
 df['증빙유형명'] = df['증빙유형'].map(evidence_names).fillna(df['증빙유형'].astype(str))
 
+# 2.6 거래처명 (정규화 인덱스의 대표명, 비어있으면 "(미지정)"으로 처리)
+df['거래처명_정규화'] = canonical_trader_names(df, TRADER_INDEX_FILE) if NORMALIZE_TRADERS else df['거래처명']
+df['거래처명_filled'] = df['거래처명_정규화'].fillna('(미지정)').replace('', '(미지정)')
+if NORMALIZE_TRADERS:
+    print(f"   거래처명 정규화: {df['거래처명'].nunique()}개 → {df['거래처명_정규화'].nunique()}개")
+    # 이름만 비슷한 거래처(다른 지점/상호일 수 있음)는 묶지 않고 데이터품질 시트에 병합 후보로 보고
+    trader_quality = merge_proposal_report(df, TRADER_INDEX_FILE)
+    data_quality = pd.concat([data_quality, trader_quality], ignore_index=True)
+    if trader_quality['위반건수'].iloc[0]:
+        print(f"   거래처명 유사 후보: {trader_quality['위반건수'].iloc[0]:,}쌍 (병합하지 않음, 데이터품질 시트 참고)")
+
+# 2.7 계정 차원 (계정과목 → 계정코드 → 표준계정, 계정과목 마스터 인덱스 조회)
+account_master = load_account_master(OUTPUT_ROOT / "_cache")
+accounts = df[['계정과목', '계정코드']].drop_duplicates('계정과목').set_index('계정과목')
+accounts = accounts.join(lookup_accounts(account_master, accounts['계정코드']))
+
+# 2.8 슬라이스 인덱스 (데이터소스/증빙유형/손익분류/월별 행 위치, 이후 단계에서 재사용)
+slices = SliceIndex(df)
+
 print(f"   파생 컬럼 생성 완료")
 
 # ============================================================
-# 3. 기본 피벗 분석
+# 2-1. 큐브 집계 (월 단위 증분)
 # ============================================================
-print("3. 기본 피벗 분석 중...")
+print("2-1. 큐브 집계 중...")
 
-# 계정코드별 고유 매핑 생성 (정렬용)
-account_code_map = df.groupby('계정과목')['계정코드'].first().to_dict()
+# 큐브(월 파티션)만 증분: 지문이 바뀐 월만 다시 집계해 이전 상태와 병합
+# (로드/파생 컬럼/행 단위 시트는 전체 행으로 다시 계산, 큐브 기반 시트는 병합된 큐브에서 조회)
 
-pivot_basic = df.pivot_table(
-    index=['정렬순서', '손익분류', '계정과목'],
-    columns='소스유형',
-    values='순액',
-    aggfunc='sum',
-    fill_value=0
-)
+state = load_state(STATE_FILE) if INCREMENTAL else None
+state, changed_months, removed_months = update_state(state, df)
+cube = state['cube']
+if INCREMENTAL:
+    save_state(state, STATE_FILE)
 
-# 열 순서 정리 (분개장(vat), 분개장(일반), 분개장요약, 카드미반영, 총합계)
-base_cols = ['분개장(vat)', '분개장(일반)']
-pivot_basic = pivot_basic.reindex(columns=[c for c in base_cols if c in pivot_basic.columns], fill_value=0)
+print(f"   재집계 월: {', '.join(changed_months) if changed_months else '없음'}"
+      + (f" / 제거 월: {', '.join(removed_months)}" if removed_months else ""))
+print(f"   큐브: {len(cube)}셀")
 
-# 분개장 요약 컬럼 추가
-if '분개장(vat)' in pivot_basic.columns and '분개장(일반)' in pivot_basic.columns:
-    pivot_basic['분개장요약'] = pivot_basic['분개장(vat)'] + pivot_basic['분개장(일반)']
-elif '분개장(vat)' in pivot_basic.columns:
-    pivot_basic['분개장요약'] = pivot_basic['분개장(vat)']
-elif '분개장(일반)' in pivot_basic.columns:
-    pivot_basic['분개장요약'] = pivot_basic['분개장(일반)']
+# 큐브 조회기 (선언형 시트/단계 간 같은 조회는 메모이제이션된 결과 재사용)
+cube_query = CubeQuery(cube)
 
-# 카드미반영 컬럼 추가
-card_missing_sum = df[df['데이터소스'] == '카드미반영'].groupby(['정렬순서', '손익분류', '계정과목'])['순액'].sum()
-pivot_basic['카드미반영'] = card_missing_sum.reindex(pivot_basic.index, fill_value=0)
+# ============================================================
+# 3. 기본 피벗 분석
+# ============================================================
+print("3. 기본 피벗 분석 중...")
+
+# 계정코드별 고유 매핑 (정렬용)
+account_code_map = accounts['계정코드'].to_dict()
+
+# 시트 공통 정렬 코드 (정렬순서/손익분류/계정코드/거래처/증빙유형/월/소스유형)
+ordering = SheetOrdering(cube, account_code_map)
+
+def summarize_sources(pivot):
+    """소스유형 열 정리: 분개장(vat), 분개장(일반) → 분개장요약, 카드미반영 → 총합계"""
+    journal_cols = [c for c in ['분개장(vat)', '분개장(일반)'] if c in pivot.columns]
+    pivot['분개장요약'] = pivot[journal_cols].sum(axis=1) if journal_cols else 0
+    if '카드미반영' not in pivot.columns:
+        pivot['카드미반영'] = 0
+    pivot['총합계'] = pivot['분개장요약'] + pivot['카드미반영']
+    return pivot
+
+# 상세(계정과목) + 손익분류 소계를 한 번의 집계로 생성
+# (전체 총계는 수익/비용/자산/부채를 더한 값이라 의미가 없어 만들지 않음, 정렬순서는 정수 유지)
+pivot_basic = grouping_sets(
+    cube,
+    sets=[['정렬순서', '손익분류', '계정과목'], ['정렬순서', '손익분류']],
+    columns='소스유형'
+)
+pivot_basic = summarize_sources(pivot_basic)
 
-# 총합계
-pivot_basic['총합계'] = pivot_basic[['분개장요약', '카드미반영']].sum(axis=1)
+# 정렬: 정렬순서 → 손익분류(소계 먼저) → 계정코드
+pivot_basic['상세행'] = pivot_basic['집계수준'] == 0
+pivot_basic = ordering.sort(pivot_basic, ['정렬순서', '손익분류', '상세행', '계정코드'])
 
-# reset_index하여 정렬 (정렬순서 → 손익분류 → 계정코드 순)
-pivot_basic = pivot_basic.reset_index()
-pivot_basic['계정코드'] = pivot_basic['계정과목'].map(account_code_map)
-pivot_basic = pivot_basic.sort_values(['정렬순서', '손익분류', '계정코드'])
+# 소계 표시
+pivot_basic.loc[pivot_basic['집계수준'] == 1, '계정과목'] = '소계'
 
 # 컬럼 순서 정리 (계정코드는 제외)
 col_order = ['정렬순서', '손익분류', '계정과목', '분개장(vat)', '분개장(일반)', '분개장요약', '카드미반영', '총합계']
 pivot_basic = pivot_basic[[c for c in col_order if c in pivot_basic.columns]]
 
-print(f"   기본 피벗: {len(pivot_basic)}행")
+print(f"   기본 피벗: {len(pivot_basic)}행 (소계 포함)")
 
 # ============================================================
 # 3-2. 기본_거래처추가_피벗 (NEW)
 # ============================================================
 print("3-2. 기본_거래처추가_피벗 분석 중...")
 
-# 거래처명이 비어있으면 "(미지정)"으로 처리
-df['거래처명_filled'] = df['거래처명'].fillna('(미지정)').replace('', '(미지정)')
-
-pivot_trader = df.pivot_table(
-    index=['정렬순서', '손익분류', '계정과목', '거래처명_filled'],
-    columns='소스유형',
-    values='순액',
-    aggfunc='sum',
-    fill_value=0
+# 상세(거래처) + 계정과목 소계 + 손익분류 소계 (전체 총계 없음)
+pivot_trader = grouping_sets(
+    cube,
+    sets=[
+        ['정렬순서', '손익분류', '계정과목', '거래처명_filled'],
+        ['정렬순서', '손익분류', '계정과목'],
+        ['정렬순서', '손익분류'],
+    ],
+    columns='소스유형'
 )
-
-# 열 순서 정리 (분개장(vat), 분개장(일반))
-base_cols = ['분개장(vat)', '분개장(일반)']
-pivot_trader = pivot_trader.reindex(columns=[c for c in base_cols if c in pivot_trader.columns], fill_value=0)
-
-# 분개장 요약 컬럼 추가
-if '분개장(vat)' in pivot_trader.columns and '분개장(일반)' in pivot_trader.columns:
-    pivot_trader['분개장요약'] = pivot_trader['분개장(vat)'] + pivot_trader['분개장(일반)']
-elif '분개장(vat)' in pivot_trader.columns:
-    pivot_trader['분개장요약'] = pivot_trader['분개장(vat)']
-elif '분개장(일반)' in pivot_trader.columns:
-    pivot_trader['분개장요약'] = pivot_trader['분개장(일반)']
-else:
-    pivot_trader['분개장요약'] = 0
-
-# 카드미반영 컬럼 추가
-card_missing_trader = df[df['데이터소스'] == '카드미반영'].groupby(
-    ['정렬순서', '손익분류', '계정과목', '거래처명_filled']
-)['순액'].sum()
-pivot_trader['카드미반영'] = card_missing_trader.reindex(pivot_trader.index, fill_value=0)
-
-# 총합계
-pivot_trader['총합계'] = pivot_trader[['분개장요약', '카드미반영']].sum(axis=1)
-
-# 정렬: 정렬순서 → 손익분류 → 계정코드 → 분개장요약(내림차순)
-pivot_trader = pivot_trader.reset_index()
-pivot_trader['계정코드'] = pivot_trader['계정과목'].map(account_code_map)
-pivot_trader = pivot_trader.sort_values(
-    by=['정렬순서', '손익분류', '계정코드', '분개장요약'],
-    ascending=[True, True, True, False]
+pivot_trader = summarize_sources(pivot_trader)
+
+# 정렬: 정렬순서 → 손익분류(소계 먼저) → 계정코드(소계 먼저) → 분개장요약(내림차순)
+pivot_trader['계정행'] = pivot_trader['집계수준'] < 2
+pivot_trader['상세행'] = pivot_trader['집계수준'] == 0
+pivot_trader = ordering.sort(
+    pivot_trader,
+    by=['정렬순서', '손익분류', '계정행', '계정코드', '상세행', '분개장요약', '거래처명_filled'],
+    ascending=[True, True, True, True, True, False, True]
 )
 
+# 소계 표시
+pivot_trader.loc[pivot_trader['집계수준'] == 1, '거래처명_filled'] = '소계'
+pivot_trader.loc[pivot_trader['집계수준'] == 2, ['계정과목', '거래처명_filled']] = ['소계', '']
+
 # 컬럼명 변경 및 순서 정리 (계정코드 제외, MultiIndex 미사용)
 pivot_trader = pivot_trader.rename(columns={'거래처명_filled': '거래처'})
 col_order = ['정렬순서', '손익분류', '계정과목', '거래처', '분개장(vat)', '분개장(일반)', '분개장요약', '카드미반영', '총합계']
 pivot_trader = pivot_trader[[c for c in col_order if c in pivot_trader.columns]]
 
-print(f"   기본_거래처추가_피벗: {len(pivot_trader)}행")
+print(f"   기본_거래처추가_피벗: {len(pivot_trader)}행 (소계 포함)")
 
 # ============================================================
 # 3-3. 기본_거래처_증빙유형 (NEW)
 # ============================================================
 print("3-3. 기본_거래처_증빙유형 분석 중...")
 
-# 증빙유형 코드 순서 (0→1→5→40→86→87→88→88.5→89→90)
-ev_type_order = [0, 1, 5, 40, 86, 87, 88, 88.5, 89, 90]
+# 상세(증빙유형) + 거래처 소계를 한 번의 집계로 생성 (거래처 소계는 정렬 기준)
+trader_keys = ['정렬순서', '손익분류', '계정과목', '거래처명_filled']
+trader_ev_sets = grouping_sets(cube, sets=[trader_keys + ['증빙유형'], trader_keys], columns='소스유형')
+trader_ev_sets = summarize_sources(trader_ev_sets)
 
-# 기본 피벗 생성
-pivot_trader_ev = df.pivot_table(
-    index=['정렬순서', '손익분류', '계정과목', '거래처명_filled', '증빙유형'],
-    columns='소스유형',
-    values='순액',
-    aggfunc='sum',
-    fill_value=0
-)
-
-# 열 순서 정리 (분개장(vat), 분개장(일반))
-base_cols = ['분개장(vat)', '분개장(일반)']
-pivot_trader_ev = pivot_trader_ev.reindex(columns=[c for c in base_cols if c in pivot_trader_ev.columns], fill_value=0)
-
-# 분개장 요약 컬럼 추가
-if '분개장(vat)' in pivot_trader_ev.columns and '분개장(일반)' in pivot_trader_ev.columns:
-    pivot_trader_ev['분개장요약'] = pivot_trader_ev['분개장(vat)'] + pivot_trader_ev['분개장(일반)']
-elif '분개장(vat)' in pivot_trader_ev.columns:
-    pivot_trader_ev['분개장요약'] = pivot_trader_ev['분개장(vat)']
-elif '분개장(일반)' in pivot_trader_ev.columns:
-    pivot_trader_ev['분개장요약'] = pivot_trader_ev['분개장(일반)']
-else:
-    pivot_trader_ev['분개장요약'] = 0
-
-# 카드미반영 컬럼 추가
-card_missing_trader_ev = df[df['데이터소스'] == '카드미반영'].groupby(
-    ['정렬순서', '손익분류', '계정과목', '거래처명_filled', '증빙유형']
-)['순액'].sum()
-pivot_trader_ev['카드미반영'] = card_missing_trader_ev.reindex(pivot_trader_ev.index, fill_value=0)
-
-# 총합계
-pivot_trader_ev['총합계'] = pivot_trader_ev[['분개장요약', '카드미반영']].sum(axis=1)
-
-# reset_index for processing
-pivot_trader_ev = pivot_trader_ev.reset_index()
-
-# 거래처별 분개장요약 합계 계산 (정렬용)
-trader_summary = pivot_trader_ev.groupby(
-    ['정렬순서', '손익분류', '계정과목', '거래처명_filled']
-)['분개장요약'].sum().reset_index()
+# 거래처별 분개장요약 합계 (정렬용)
+trader_summary = trader_ev_sets.loc[trader_ev_sets['집계수준'] == 1, trader_keys + ['분개장요약']]
 trader_summary = trader_summary.rename(columns={'분개장요약': '거래처_분개장요약_합계'})
 
-# 거래처 합계 조인
-pivot_trader_ev = pivot_trader_ev.merge(trader_summary, on=['정렬순서', '손익분류', '계정과목', '거래처명_filled'])
-
-# 모든 (계정과목, 거래처) 조합에 대해 모든 증빙유형 행 생성
-unique_combinations = pivot_trader_ev[['정렬순서', '손익분류', '계정과목', '거래처명_filled', '거래처_분개장요약_합계']].drop_duplicates()
-
-# 모든 조합 × 모든 증빙유형
-from itertools import product
-all_ev_types = pd.DataFrame({'증빙유형': ev_type_order})
-full_index = pd.merge(unique_combinations.assign(key=1), all_ev_types.assign(key=1), on='key').drop('key', axis=1)
-
-# 기존 데이터와 병합 (없는 조합은 0으로 채움)
-pivot_trader_ev = full_index.merge(
-    pivot_trader_ev,
-    on=['정렬순서', '손익분류', '계정과목', '거래처명_filled', '증빙유형', '거래처_분개장요약_합계'],
-    how='left'
-).fillna(0)
-
-# 증빙유형 순서 매핑
-ev_type_sort_order = {v: i for i, v in enumerate(ev_type_order)}
-pivot_trader_ev['증빙유형_순서'] = pivot_trader_ev['증빙유형'].map(ev_type_sort_order).fillna(999)
-
-# 계정코드 추가 (정렬용)
-pivot_trader_ev['계정코드'] = pivot_trader_ev['계정과목'].map(account_code_map)
+trader_ev_cells = trader_ev_sets[trader_ev_sets['집계수준'] == 0]
+ev_value_cols = [c for c in ['분개장(vat)', '분개장(일반)', '분개장요약', '카드미반영', '총합계'] if c in trader_ev_sets.columns]
 
 # 정렬: 정렬순서 → 손익분류 → 계정코드 → 거래처(합계 내림차순) → 증빙유형(코드순)
-pivot_trader_ev = pivot_trader_ev.sort_values(
-    by=['정렬순서', '손익분류', '계정코드', '거래처_분개장요약_합계', '거래처명_filled', '증빙유형_순서'],
-    ascending=[True, True, True, False, True, True]
+trader_summary = ordering.sort(
+    trader_summary,
+    by=['정렬순서', '손익분류', '계정코드', '거래처_분개장요약_합계', '거래처명_filled'],
+    ascending=[True, True, True, False, True]
 )
 
-# 불필요한 컬럼 제거
-pivot_trader_ev = pivot_trader_ev.drop(columns=['거래처_분개장요약_합계', '증빙유형_순서', '계정코드'])
-
-# 증빙유형 dict 변환
-pivot_trader_ev['증빙유형'] = pivot_trader_ev['증빙유형'].map(evidence_names).fillna(pivot_trader_ev['증빙유형'].astype(str))
-
-# 인덱스 재설정 (컬럼명 변경)
-pivot_trader_ev = pivot_trader_ev.rename(columns={'거래처명_filled': '거래처'})
-
-# 컬럼 순서 정리
-col_order = ['정렬순서', '손익분류', '계정과목', '거래처', '증빙유형', '분개장(vat)', '분개장(일반)', '분개장요약', '카드미반영', '총합계']
-pivot_trader_ev = pivot_trader_ev[[c for c in col_order if c in pivot_trader_ev.columns]]
-
-# 인덱스 설정하지 않음 (MultiIndex merged cell 문제 방지)
-# pivot_trader_ev = pivot_trader_ev.set_index(['정렬순서', '손익분류', '계정과목', '거래처', '증빙유형'])
+# 모든 (계정과목, 거래처) × 모든 증빙유형 행은 희소 셀 저장소로 보관하고 시트에 쓸 때만 펼침
+# (값이 있는 셀만 메모리에 유지, COMPACT_TRADER_EV면 0인 행은 출력하지 않음)
+pivot_trader_ev = SparseCellStore(
+    groups=trader_summary[trader_keys].rename(columns={'거래처명_filled': '거래처'}),
+    cells=trader_ev_cells.rename(columns={'거래처명_filled': '거래처'}),
+    member_col='증빙유형',
+    members=EV_TYPE_ORDER,
+    labels=evidence_names,
+    value_cols=ev_value_cols,
+)
 
-print(f"   기본_거래처_증빙유형: {len(pivot_trader_ev)}행")
+print(f"   기본_거래처_증빙유형: {len(pivot_trader_ev)}행 (값 있는 셀 {pivot_trader_ev.nnz}개)")
 
 # ============================================================
 # 3-4. total_월별추이_가로 (Option B: 소스유형 × 월별 컬럼)
@@ -297,7 +372,7 @@ print(f"   기본_거래처_증빙유형: {len(pivot_trader_ev)}행")
 print("3-4. total_월별추이_가로 분석 중...")
 
 # 월별 + 소스유형별 피벗
-monthly_wide = df.pivot_table(
+monthly_wide = cube.pivot_table(
     index=['정렬순서', '손익분류', '계정과목', '거래처명_filled', '증빙유형'],
     columns=['월', '소스유형'],
     values='순액',
@@ -305,54 +380,29 @@ monthly_wide = df.pivot_table(
     fill_value=0
 )
 
-# 컬럼 평탄화 (01_분개장(vat), 01_분개장(일반), ...)
+# 월별 컬럼 순서 (소스유형별 그룹 → 월 순서) 후 평탄화
+# 결과: 01_vat, 02_vat, ..., 12_vat, 01_일반, 02_일반, ..., 12_일반, 01_카드미반영, ...
+monthly_wide = monthly_wide[ordering.order_columns(monthly_wide.columns, ['소스유형', '월'])]
 monthly_wide.columns = [f'{month}_{source}' for month, source in monthly_wide.columns]
+month_cols = list(monthly_wide.columns)
 monthly_wide = monthly_wide.reset_index()
 
-# 계정코드 추가하여 정렬
-monthly_wide['계정코드'] = monthly_wide['계정과목'].map(account_code_map)
-
-# 거래처별 합계 계산 (정렬용)
-value_cols = [c for c in monthly_wide.columns if c not in ['정렬순서', '손익분류', '계정과목', '거래처명_filled', '증빙유형', '계정코드']]
-monthly_wide['거래처_합계'] = monthly_wide[value_cols].sum(axis=1)
-
-# 증빙유형 순서 매핑
-monthly_wide['증빙유형_순서'] = monthly_wide['증빙유형'].map(ev_type_sort_order).fillna(999)
+# 합계 컬럼 추가
+monthly_wide['합계'] = monthly_wide[month_cols].sum(axis=1)
 
-# 정렬: 정렬순서 → 손익분류 → 계정코드 → 거래처합계(내림차순) → 증빙유형순서
-monthly_wide = monthly_wide.sort_values(
-    by=['정렬순서', '손익분류', '계정코드', '거래처_합계', '증빙유형_순서'],
-    ascending=[True, True, True, False, True]
+# 정렬: 정렬순서 → 손익분류 → 계정코드 → 합계(내림차순) → 증빙유형순서
+monthly_wide = ordering.sort(
+    monthly_wide,
+    by=['정렬순서', '손익분류', '계정코드', '합계', '거래처명_filled', '증빙유형'],
+    ascending=[True, True, True, False, True, True]
 )
 
-# 정리용 컬럼 제거
-monthly_wide = monthly_wide.drop(columns=['계정코드', '거래처_합계', '증빙유형_순서'])
-
 # 컬럼명 변경
 monthly_wide = monthly_wide.rename(columns={'거래처명_filled': '거래처'})
 
 # 증빙유형 dict 변환
 monthly_wide['증빙유형'] = monthly_wide['증빙유형'].map(evidence_names).fillna(monthly_wide['증빙유형'].astype(str))
 
-# 월별 컬럼 순서 정렬 (소스유형별 그룹 → 월 순서)
-# 결과: 01_vat, 02_vat, ..., 12_vat, 01_일반, 02_일반, ..., 12_일반, 01_카드미반영, ...
-base_cols = ['정렬순서', '손익분류', '계정과목', '거래처', '증빙유형']
-def get_col_sort_key(col_name):
-    month = col_name[:2]  # '01', '02', etc.
-    if 'vat' in col_name:
-        source_order = 0
-    elif '일반' in col_name:
-        source_order = 1
-    else:  # 카드미반영
-        source_order = 2
-    return (source_order, month)
-
-month_cols = sorted([c for c in monthly_wide.columns if c not in base_cols], key=get_col_sort_key)
-monthly_wide = monthly_wide[base_cols + month_cols]
-
-# 합계 컬럼 추가
-monthly_wide['합계'] = monthly_wide[month_cols].sum(axis=1)
-
 print(f"   total_월별추이_가로: {len(monthly_wide)}행, {len(monthly_wide.columns)}컬럼")
 
 # ============================================================
@@ -361,7 +411,7 @@ print(f"   total_월별추이_가로: {len(monthly_wide)}행, {len(monthly_wide.
 print("3-5. total_월별추이_세로 분석 중...")
 
 # 월별 + 소스유형별 피벗 (월을 행에 포함)
-monthly_long = df.pivot_table(
+monthly_long = cube.pivot_table(
     index=['정렬순서', '손익분류', '계정과목', '거래처명_filled', '증빙유형', '월'],
     columns='소스유형',
     values='순액',
@@ -369,42 +419,19 @@ monthly_long = df.pivot_table(
     fill_value=0
 ).reset_index()
 
-# 컬럼 순서 정리
-base_cols_long = ['분개장(vat)', '분개장(일반)']
-for col in base_cols_long:
+# 분개장(vat)/분개장(일반) 컬럼 보장 후 분개장요약/카드미반영/총합계
+for col in ['분개장(vat)', '분개장(일반)']:
     if col not in monthly_long.columns:
         monthly_long[col] = 0
-
-# 분개장요약
-monthly_long['분개장요약'] = monthly_long.get('분개장(vat)', 0) + monthly_long.get('분개장(일반)', 0)
-
-# 카드미반영 컬럼
-if '카드미반영' not in monthly_long.columns:
-    monthly_long['카드미반영'] = 0
-
-# 총합계
-monthly_long['총합계'] = monthly_long['분개장요약'] + monthly_long['카드미반영']
-
-# 계정코드 추가하여 정렬
-monthly_long['계정코드'] = monthly_long['계정과목'].map(account_code_map)
-
-# 거래처별 총합계 계산 (정렬용)
-trader_total = monthly_long.groupby(['정렬순서', '손익분류', '계정과목', '거래처명_filled'])['총합계'].sum().reset_index()
-trader_total = trader_total.rename(columns={'총합계': '거래처_총합계'})
-monthly_long = monthly_long.merge(trader_total, on=['정렬순서', '손익분류', '계정과목', '거래처명_filled'])
-
-# 증빙유형 순서 매핑
-monthly_long['증빙유형_순서'] = monthly_long['증빙유형'].map(ev_type_sort_order).fillna(999)
+monthly_long = summarize_sources(monthly_long)
 
 # 정렬: 정렬순서 → 손익분류 → 계정코드 → 거래처총합계(내림차순) → 증빙유형순서 → 월
-monthly_long = monthly_long.sort_values(
-    by=['정렬순서', '손익분류', '계정코드', '거래처_총합계', '거래처명_filled', '증빙유형_순서', '월'],
+monthly_long = ordering.sort(
+    monthly_long,
+    by=['정렬순서', '손익분류', '계정코드', ordering.trader_total(monthly_long, '순액'), '거래처명_filled', '증빙유형', '월'],
     ascending=[True, True, True, False, True, True, True]
 )
 
-# 정리용 컬럼 제거
-monthly_long = monthly_long.drop(columns=['계정코드', '거래처_총합계', '증빙유형_순서'])
-
 # 컬럼명 변경
 monthly_long = monthly_long.rename(columns={'거래처명_filled': '거래처'})
 
@@ -423,51 +450,36 @@ print(f"   total_월별추이_세로: {len(monthly_long)}행")
 print("3-6. total_월별추이_가로_빈도 분석 중...")
 
 # 월별 + 소스유형별 피벗 (거래 횟수)
-monthly_wide_cnt = df.pivot_table(
+monthly_wide_cnt = cube.pivot_table(
     index=['정렬순서', '손익분류', '계정과목', '거래처명_filled', '증빙유형'],
     columns=['월', '소스유형'],
-    values='순액',
-    aggfunc='count',
+    values='건수',
+    aggfunc='sum',
     fill_value=0
 )
 
-# 컬럼 평탄화
+# 월별 컬럼 순서 (소스유형별 그룹 → 월 순서) 후 평탄화
+monthly_wide_cnt = monthly_wide_cnt[ordering.order_columns(monthly_wide_cnt.columns, ['소스유형', '월'])]
 monthly_wide_cnt.columns = [f'{month}_{source}' for month, source in monthly_wide_cnt.columns]
+month_cols_cnt = list(monthly_wide_cnt.columns)
 monthly_wide_cnt = monthly_wide_cnt.reset_index()
 
-# 계정코드 추가하여 정렬
-monthly_wide_cnt['계정코드'] = monthly_wide_cnt['계정과목'].map(account_code_map)
-
-# 거래처별 합계 계산 (정렬용)
-value_cols_cnt = [c for c in monthly_wide_cnt.columns if c not in ['정렬순서', '손익분류', '계정과목', '거래처명_filled', '증빙유형', '계정코드']]
-monthly_wide_cnt['거래처_합계'] = monthly_wide_cnt[value_cols_cnt].sum(axis=1)
-
-# 증빙유형 순서 매핑
-monthly_wide_cnt['증빙유형_순서'] = monthly_wide_cnt['증빙유형'].map(ev_type_sort_order).fillna(999)
+# 합계 컬럼 추가
+monthly_wide_cnt['합계'] = monthly_wide_cnt[month_cols_cnt].sum(axis=1)
 
 # 정렬
-monthly_wide_cnt = monthly_wide_cnt.sort_values(
-    by=['정렬순서', '손익분류', '계정코드', '거래처_합계', '증빙유형_순서'],
-    ascending=[True, True, True, False, True]
+monthly_wide_cnt = ordering.sort(
+    monthly_wide_cnt,
+    by=['정렬순서', '손익분류', '계정코드', '합계', '거래처명_filled', '증빙유형'],
+    ascending=[True, True, True, False, True, True]
 )
 
-# 정리용 컬럼 제거
-monthly_wide_cnt = monthly_wide_cnt.drop(columns=['계정코드', '거래처_합계', '증빙유형_순서'])
-
 # 컬럼명 변경
 monthly_wide_cnt = monthly_wide_cnt.rename(columns={'거래처명_filled': '거래처'})
 
 # 증빙유형 dict 변환
 monthly_wide_cnt['증빙유형'] = monthly_wide_cnt['증빙유형'].map(evidence_names).fillna(monthly_wide_cnt['증빙유형'].astype(str))
 
-# 월별 컬럼 순서 정렬 (소스유형별 그룹 → 월 순서)
-base_cols_cnt = ['정렬순서', '손익분류', '계정과목', '거래처', '증빙유형']
-month_cols_cnt = sorted([c for c in monthly_wide_cnt.columns if c not in base_cols_cnt], key=get_col_sort_key)
-monthly_wide_cnt = monthly_wide_cnt[base_cols_cnt + month_cols_cnt]
-
-# 합계 컬럼 추가
-monthly_wide_cnt['합계'] = monthly_wide_cnt[month_cols_cnt].sum(axis=1)
-
 print(f"   total_월별추이_가로_빈도: {len(monthly_wide_cnt)}행, {len(monthly_wide_cnt.columns)}컬럼")
 
 # ============================================================
@@ -476,49 +488,27 @@ print(f"   total_월별추이_가로_빈도: {len(monthly_wide_cnt)}행, {len(mo
 print("3-7. total_월별추이_세로_빈도 분석 중...")
 
 # 월별 + 소스유형별 피벗 (거래 횟수, 월을 행에 포함)
-monthly_long_cnt = df.pivot_table(
+monthly_long_cnt = cube.pivot_table(
     index=['정렬순서', '손익분류', '계정과목', '거래처명_filled', '증빙유형', '월'],
     columns='소스유형',
-    values='순액',
-    aggfunc='count',
+    values='건수',
+    aggfunc='sum',
     fill_value=0
 ).reset_index()
 
-# 컬럼 순서 정리
+# 분개장(vat)/분개장(일반) 컬럼 보장 후 분개장요약/카드미반영/총합계
 for col in ['분개장(vat)', '분개장(일반)']:
     if col not in monthly_long_cnt.columns:
         monthly_long_cnt[col] = 0
-
-# 분개장요약
-monthly_long_cnt['분개장요약'] = monthly_long_cnt.get('분개장(vat)', 0) + monthly_long_cnt.get('분개장(일반)', 0)
-
-# 카드미반영 컬럼
-if '카드미반영' not in monthly_long_cnt.columns:
-    monthly_long_cnt['카드미반영'] = 0
-
-# 총합계
-monthly_long_cnt['총합계'] = monthly_long_cnt['분개장요약'] + monthly_long_cnt['카드미반영']
-
-# 계정코드 추가하여 정렬
-monthly_long_cnt['계정코드'] = monthly_long_cnt['계정과목'].map(account_code_map)
-
-# 거래처별 총합계 계산 (정렬용)
-trader_total_cnt = monthly_long_cnt.groupby(['정렬순서', '손익분류', '계정과목', '거래처명_filled'])['총합계'].sum().reset_index()
-trader_total_cnt = trader_total_cnt.rename(columns={'총합계': '거래처_총합계'})
-monthly_long_cnt = monthly_long_cnt.merge(trader_total_cnt, on=['정렬순서', '손익분류', '계정과목', '거래처명_filled'])
-
-# 증빙유형 순서 매핑
-monthly_long_cnt['증빙유형_순서'] = monthly_long_cnt['증빙유형'].map(ev_type_sort_order).fillna(999)
+monthly_long_cnt = summarize_sources(monthly_long_cnt)
 
 # 정렬
-monthly_long_cnt = monthly_long_cnt.sort_values(
-    by=['정렬순서', '손익분류', '계정코드', '거래처_총합계', '거래처명_filled', '증빙유형_순서', '월'],
+monthly_long_cnt = ordering.sort(
+    monthly_long_cnt,
+    by=['정렬순서', '손익분류', '계정코드', ordering.trader_total(monthly_long_cnt, '건수'), '거래처명_filled', '증빙유형', '월'],
     ascending=[True, True, True, False, True, True, True]
 )
 
-# 정리용 컬럼 제거
-monthly_long_cnt = monthly_long_cnt.drop(columns=['계정코드', '거래처_총합계', '증빙유형_순서'])
-
 # 컬럼명 변경
 monthly_long_cnt = monthly_long_cnt.rename(columns={'거래처명_filled': '거래처'})
 
@@ -532,474 +522,365 @@ monthly_long_cnt = monthly_long_cnt[[c for c in col_order_long_cnt if c in month
 print(f"   total_월별추이_세로_빈도: {len(monthly_long_cnt)}행")
 
 # ============================================================
-# 4. 거래처별 분석 (판관비 중심)
+# 3-8. 표준계정별 (계정과목 마스터의 표준계정 계층으로 롤업)
 # ============================================================
-print("4. 거래처별 분석 중...")
+print("3-8. 표준계정별 분석 중...")
 
-df_pangwan = df[df['손익분류'] == '판관비'].copy()
+cube_std = cube.assign(
+    표준계정코드=cube['계정과목'].map(accounts['표준계정코드']),
+    표준계정=cube['계정과목'].map(accounts['표준계정명']),
+)
+std_keys = ['정렬순서', '손익분류', '표준계정코드', '표준계정']
+std_account = grouping_sets(cube_std, sets=[std_keys + ['계정과목'], std_keys], values=['순액', '건수'])
 
-# 계정과목별 거래처 TOP 10
-trade_top = df_pangwan.groupby(['계정과목', '거래처명'])['순액'].sum().reset_index()
-trade_top = trade_top.sort_values(['계정과목', '순액'], ascending=[True, False])
-trade_top['rank'] = trade_top.groupby('계정과목')['순액'].rank(method='first', ascending=False)
-trade_top10 = trade_top[trade_top['rank'] <= 10].drop(columns=['rank'])
+# 정렬: 정렬순서 → 손익분류 → 표준계정코드(소계 먼저) → 계정코드
+std_account['상세행'] = std_account['집계수준'] == 0
+std_account = ordering.sort(std_account, ['정렬순서', '손익분류', '표준계정코드', '표준계정', '상세행', '계정코드'])
+std_account['계정코드'] = std_account['계정과목'].map(account_code_map)
+std_account.loc[std_account['집계수준'] == 1, ['계정과목', '계정코드']] = ['소계', '']
 
-print(f"   거래처 분석: {len(trade_top10)}건 (TOP 10 per 계정)")
+col_order_std = ['정렬순서', '손익분류', '표준계정코드', '표준계정', '계정과목', '계정코드', '순액', '건수']
+std_account = std_account[col_order_std]
+
+print(f"   표준계정별: {len(std_account)}행 (표준계정 소계 포함)")
 
 # ============================================================
-# 5. 증빙유형별 분석
+# 4. 거래처별 분석 (판관비 중심)
 # ============================================================
-print("5. 증빙유형별 분석 중...")
+def stage_trader_top(log):
+    # 계정과목별 거래처 TOP 10 (판관비 큐브 셀에서 계정과목별 부분 선택)
+    trade_top10 = top_n(cube[cube['손익분류'] == '판관비'], ['계정과목'], '거래처명_filled', 10)
+    trade_top10 = trade_top10.rename(columns={'거래처명_filled': '거래처명'})[['계정과목', '거래처명', '순액']]
 
-evidence_analysis = df.pivot_table(
-    index=['손익분류', '계정과목'],
-    columns='증빙유형명',
-    values='순액',
-    aggfunc='sum',
-    fill_value=0
-)
-
-evidence_analysis['합계'] = evidence_analysis.sum(axis=1)
-
-# 증빙률 계산 (세금계산서+카드+현금영수증 / 전체)
-vat_cols = ['세금계산서', '카드', '현금영수증']
-evidence_analysis['증빙금액'] = evidence_analysis[[c for c in vat_cols if c in evidence_analysis.columns]].sum(axis=1)
-evidence_analysis['증빙률'] = (evidence_analysis['증빙금액'] / evidence_analysis['합계'].replace(0, 1) * 100).round(1)
+    log(f"   거래처 분석: {len(trade_top10)}건 (TOP 10 per 계정)")
 
-print(f"   증빙유형 분석: {len(evidence_analysis)}행")
+    return {'거래처TOP': trade_top10}
 
 # ============================================================
-# 6. 월별 추이 분석
+# 5. 증빙유형별 분석
 # ============================================================
-print("6. 월별 추이 분석 중...")
+def stage_evidence(log):
+    evidence_analysis = df.pivot_table(
+        index=['손익분류', '계정과목'],
+        columns='증빙유형명',
+        values='순액',
+        aggfunc='sum',
+        fill_value=0
+    )
 
-monthly_trend = df.pivot_table(
-    index='손익분류',
-    columns='월',
-    values='순액',
-    aggfunc='sum',
-    fill_value=0
-)
+    evidence_analysis['합계'] = evidence_analysis.sum(axis=1)
+
+    # 증빙률 계산 (세금계산서+카드+현금영수증 / 전체)
+    vat_cols = ['세금계산서', '카드', '현금영수증']
+    evidence_analysis['증빙금액'] = evidence_analysis[[c for c in vat_cols if c in evidence_analysis.columns]].sum(axis=1)
+    evidence_analysis['증빙률'] = (evidence_analysis['증빙금액'] / evidence_analysis['합계'].replace(0, 1) * 100).round(1)
+
+    log(f"   증빙유형 분석: {len(evidence_analysis)}행")
 
-monthly_trend['합계'] = monthly_trend.sum(axis=1)
-monthly_trend['평균'] = monthly_trend.iloc[:, :-1].mean(axis=1).round(0)
+    return {'증빙유형별': evidence_analysis}
 
-# 정렬순서 기준으로 정렬
-sort_order = df.groupby('손익분류')['정렬순서'].first().sort_values()
-monthly_trend = monthly_trend.reindex(sort_order.index)
+# ============================================================
+# 6. 선언형 시트 (월별 추이, 계정과목별 월별 상세 등 REPORT_SHEETS)
+# ============================================================
+def stage_report_sheets(log):
+    tables = {}
+    for name, spec in REPORT_SHEETS.items():
+        tables[name] = build_sheet(cube_query, spec)
+        log(f"   {name}: {len(tables[name])}행")
 
-print(f"   월별 추이: {len(monthly_trend)}행")
+    return tables
 
 # ============================================================
 # 7. 카드 현황 분석
 # ============================================================
-print("7. 카드 현황 분석 중...")
+def stage_card_status(log):
+    df_card = slices.take(df, {'증빙유형': [88, 88.5]}).copy()
 
-df_card = df[df['증빙유형'].isin([88, 88.5])].copy()
+    if len(df_card) > 0:
+        df_card['전표상태'] = df_card['전표상태'].fillna('없음')
+        df_card['공제구분'] = df_card['공제구분'].fillna('없음')
 
-if len(df_card) > 0:
-    df_card['전표상태'] = df_card['전표상태'].fillna('없음')
-    df_card['공제구분'] = df_card['공제구분'].fillna('없음')
+        card_status = df_card.pivot_table(
+            index='계정과목',
+            columns=['공제구분', '전표상태'],
+            values='순액',
+            aggfunc='sum',
+            fill_value=0
+        )
+        log(f"   카드 현황: {len(card_status)}행")
+    else:
+        card_status = pd.DataFrame()
+        log("   카드 데이터 없음")
 
-    card_status = df_card.pivot_table(
-        index='계정과목',
-        columns=['공제구분', '전표상태'],
-        values='순액',
-        aggfunc='sum',
-        fill_value=0
-    )
-    print(f"   카드 현황: {len(card_status)}행")
-else:
-    card_status = pd.DataFrame()
-    print("   카드 데이터 없음")
+    return {'카드현황': card_status}
 
 # ============================================================
 # 8. 카드미반영 상세
 # ============================================================
-print("8. 카드미반영 상세 분석 중...")
+def stage_card_missing(log):
+    df_card_missing = slices.take(df, {'증빙유형': 88.5}).copy()
+
+    if len(df_card_missing) > 0:
+        # 컬럼 목록 (업태, 업종을 계정과목 다음에 배치)
+        detail_cols = ['회계일자', '거래처명', '순액', '공제구분', '전표상태', '계정과목']
+        # 업태, 업종 컬럼이 있으면 추가
+        if '업태' in df_card_missing.columns:
+            detail_cols.insert(detail_cols.index('계정과목') + 1, '업태')
+        if '업종' in df_card_missing.columns:
+            detail_cols.insert(detail_cols.index('업태') + 1 if '업태' in detail_cols else detail_cols.index('계정과목') + 1, '업종')
+
+        # 존재하는 컬럼만 선택
+        available_cols = [c for c in detail_cols if c in df_card_missing.columns]
+        card_missing_detail = df_card_missing[available_cols].copy()
 
-df_card_missing = df[df['증빙유형'] == 88.5].copy()
+        # 업태, 업종 컬럼이 없으면 빈 컬럼 추가
+        if '업태' not in card_missing_detail.columns:
+            card_missing_detail.insert(card_missing_detail.columns.get_loc('계정과목') + 1, '업태', '')
+        if '업종' not in card_missing_detail.columns:
+            card_missing_detail.insert(card_missing_detail.columns.get_loc('업태') + 1, '업종', '')
 
-if len(df_card_missing) > 0:
-    # 컬럼 목록 (업태, 업종을 계정과목 다음에 배치)
-    detail_cols = ['회계일자', '거래처명', '순액', '공제구분', '전표상태', '계정과목']
-    # 업태, 업종 컬럼이 있으면 추가
-    if '업태' in df_card_missing.columns:
-        detail_cols.insert(detail_cols.index('계정과목') + 1, '업태')
-    if '업종' in df_card_missing.columns:
-        detail_cols.insert(detail_cols.index('업태') + 1 if '업태' in detail_cols else detail_cols.index('계정과목') + 1, '업종')
+        card_missing_detail = card_missing_detail.sort_values('회계일자')
+        log(f"   카드미반영: {len(card_missing_detail)}건, 총 {card_missing_detail['순액'].sum():,.0f}원")
+    else:
+        card_missing_detail = pd.DataFrame()
+        log("   카드미반영 없음")
 
-    # 존재하는 컬럼만 선택
-    available_cols = [c for c in detail_cols if c in df_card_missing.columns]
-    card_missing_detail = df_card_missing[available_cols].copy()
+    return {'카드미반영': card_missing_detail}
 
-    # 업태, 업종 컬럼이 없으면 빈 컬럼 추가
-    if '업태' not in card_missing_detail.columns:
-        card_missing_detail.insert(card_missing_detail.columns.get_loc('계정과목') + 1, '업태', '')
-    if '업종' not in card_missing_detail.columns:
-        card_missing_detail.insert(card_missing_detail.columns.get_loc('업태') + 1, '업종', '')
+# ============================================================
+# 8-1. 카드 대사 (카드미반영 88.5 ↔ 반영 카드 전표 88)
+# ============================================================
+def stage_card_matching(log):
+    card_pending = slices.take(df, {'증빙유형': 88.5})
+
+    if len(card_pending) > 0:
+        card_matching = reconcile_cards(card_pending, slices.take(df, {'증빙유형': 88}))
+        counts = card_matching['대사결과'].value_counts()
+        log(f"   카드 대사: " + ", ".join(f"{status} {counts.get(status, 0)}건" for status in ['매칭', '모호', '미매칭']))
+    else:
+        card_matching = pd.DataFrame()
+        log("   카드미반영 없음 (대사 생략)")
 
-    card_missing_detail = card_missing_detail.sort_values('회계일자')
-    print(f"   카드미반영: {len(card_missing_detail)}건, 총 {card_missing_detail['순액'].sum():,.0f}원")
-else:
-    card_missing_detail = pd.DataFrame()
-    print("   카드미반영 없음")
+    return {'카드대사': card_matching}
 
 # ============================================================
 # 9. 요일별 패턴 분석 (NEW)
 # ============================================================
-print("9. 요일별 패턴 분석 중...")
+def stage_weekday(log):
+    # 요일별 × 손익분류
+    weekday_pattern = df.pivot_table(
+        index='요일명',
+        columns='손익분류',
+        values='순액',
+        aggfunc=['sum', 'count'],
+        fill_value=0
+    )
 
-# 요일별 × 손익분류
-weekday_pattern = df.pivot_table(
-    index='요일명',
-    columns='손익분류',
-    values='순액',
-    aggfunc=['sum', 'count'],
-    fill_value=0
-)
+    # 요일 순서대로 정렬
+    weekday_order = ['월', '화', '수', '목', '금', '토', '일']
+    weekday_pattern = weekday_pattern.reindex([d for d in weekday_order if d in weekday_pattern.index])
 
-# 요일 순서대로 정렬
-weekday_order = ['월', '화', '수', '목', '금', '토', '일']
-weekday_pattern = weekday_pattern.reindex([d for d in weekday_order if d in weekday_pattern.index])
+    # 요일별 총계
+    weekday_summary = df.groupby('요일명').agg({
+        '순액': ['sum', 'count', 'mean']
+    }).reset_index()
+    weekday_summary.columns = ['요일', '총금액', '건수', '평균금액']
+    weekday_summary['요일순서'] = weekday_summary['요일'].map({d: i for i, d in enumerate(weekday_order)})
+    weekday_summary = weekday_summary.sort_values('요일순서').drop(columns=['요일순서'])
 
-# 요일별 총계
-weekday_summary = df.groupby('요일명').agg({
-    '순액': ['sum', 'count', 'mean']
-}).reset_index()
-weekday_summary.columns = ['요일', '총금액', '건수', '평균금액']
-weekday_summary['요일순서'] = weekday_summary['요일'].map({d: i for i, d in enumerate(weekday_order)})
-weekday_summary = weekday_summary.sort_values('요일순서').drop(columns=['요일순서'])
+    log(f"   요일별 패턴: {len(weekday_summary)}행")
 
-print(f"   요일별 패턴: {len(weekday_summary)}행")
+    return {'요일별': weekday_summary}
 
 # ============================================================
-# 10. 금액구간별 분석 (NEW)
+# 9-1. 입력 지연 분석 (입력지연일수 분포, 증빙유형별 지연 패턴)
 # ============================================================
-print("10. 금액구간별 분석 중...")
+def stage_entry_lag(log):
+    entry_lag_summary = lag_summary(lags, df['증빙유형명'])
 
-# 금액구간 × 손익분류
-amount_range_analysis = df.pivot_table(
-    index='금액구간',
-    columns='손익분류',
-    values='순액',
-    aggfunc=['sum', 'count'],
-    fill_value=0
-)
-
-# 금액구간별 요약
-amount_summary = df.groupby('금액구간').agg({
-    '순액': ['sum', 'count', 'mean']
-}).reset_index()
-amount_summary.columns = ['금액구간', '총금액', '건수', '평균금액']
-amount_summary = amount_summary.sort_values('금액구간')
+    log(f"   입력지연: {len(entry_lag_summary)}행")
 
-print(f"   금액구간별: {len(amount_summary)}행")
+    return {'입력지연': entry_lag_summary}
 
 # ============================================================
-# 11. 계정과목별 월별 상세 (NEW)
+# 10. 금액구간별 분석 (NEW)
 # ============================================================
-print("11. 계정과목별 월별 상세 분석 중...")
+def stage_amount_range(log):
+    # 금액구간 × 손익분류
+    amount_range_analysis = df.pivot_table(
+        index='금액구간',
+        columns='손익분류',
+        values='순액',
+        aggfunc=['sum', 'count'],
+        fill_value=0
+    )
 
-account_monthly = df.pivot_table(
-    index=['정렬순서', '손익분류', '계정과목'],
-    columns='월',
-    values='순액',
-    aggfunc='sum',
-    fill_value=0
-)
+    # 금액구간별 요약
+    amount_summary = df.groupby('금액구간').agg({
+        '순액': ['sum', 'count', 'mean']
+    }).reset_index()
+    amount_summary.columns = ['금액구간', '총금액', '건수', '평균금액']
+    amount_summary = amount_summary.sort_values('금액구간')
 
-account_monthly['합계'] = account_monthly.sum(axis=1)
-account_monthly = account_monthly.sort_index(level=0)
+    log(f"   금액구간별: {len(amount_summary)}행")
 
-print(f"   계정월별: {len(account_monthly)}행")
+    return {'금액구간별': amount_summary}
 
 # ============================================================
 # 12. 이상 거래 탐지 (NEW)
 # ============================================================
-print("12. 이상 거래 탐지 중...")
-
-anomalies = []
-
-# 12.1 금액 이상 탐지 (계정과목별 Z-score)
-account_stats = df.groupby('계정과목')['순액'].agg(['mean', 'std'])
+def stage_anomalies(log):
+    anomalies = []
+
+    # 12.1 금액 이상 탐지 (계정과목별 Z-score)
+    # 월별 통계를 병합해 계정별 평균/표준편차를 구하고,
+    # 월 최소/최대가 3σ를 벗어나는 (계정과목, 월) 파티션의 행만 검사
+    account_stats = merge_account_stats(state['account_stats'])
+    account_stats = account_stats[account_stats['std'] > 0]
+
+    month_stats = state['account_stats'].join(account_stats[['mean', 'std']], on='계정과목', how='inner')
+    z_min = (month_stats['최소'] - month_stats['mean']) / month_stats['std']
+    z_max = (month_stats['최대'] - month_stats['mean']) / month_stats['std']
+    suspect = month_stats.loc[(z_min.abs() > 3) | (z_max.abs() > 3), ['계정과목', '월']]
+
+    candidates = df[pd.MultiIndex.from_frame(df[['계정과목', '월']]).isin(pd.MultiIndex.from_frame(suspect))]
+    cand_mean = candidates['계정과목'].map(account_stats['mean'])
+    cand_z = (candidates['순액'] - cand_mean) / candidates['계정과목'].map(account_stats['std'])
+    outliers = candidates.assign(평균=cand_mean, z_score=cand_z)[cand_z.abs() > 3]
+    outliers = outliers.sort_values('계정과목', kind='stable')
+
+    for _, row in outliers.iterrows():
+        z_score = row['z_score']
+        anomalies.append({
+            '유형': '금액이상',
+            '계정과목': row['계정과목'],
+            '거래처명': row.get('거래처명', ''),
+            '회계일자': row.get('회계일자', ''),
+            '금액': row['순액'],
+            '평균': round(row['평균'], 0),
+            'Z-score': round(z_score, 2),
+            '비고': f'평균 대비 {abs(z_score):.1f}σ 이탈'
+        })
+
+    # 12.2 마이너스 금액 탐지 (비용에서 음수)
+    expense_categories = ['판관비', '매출원가', '영업외비용']
+    expense_rows = slices.take(df, {'손익분류': expense_categories})
+    negative_expenses = expense_rows[expense_rows['순액'] < 0]
+
+    for _, row in negative_expenses.iterrows():
+        anomalies.append({
+            '유형': '마이너스',
+            '계정과목': row['계정과목'],
+            '거래처명': row.get('거래처명', ''),
+            '회계일자': row.get('회계일자', ''),
+            '금액': row['순액'],
+            '평균': 0,
+            'Z-score': 0,
+            '비고': '비용 계정에서 음수 (환불?)'
+        })
+
+    # 12.3 월별 급변 탐지
+    monthly_by_account = cube.groupby(['계정과목', '월'])['순액'].sum().reset_index()
+    monthly_by_account = monthly_by_account.sort_values(['계정과목', '월'])
+
+    for account in monthly_by_account['계정과목'].unique():
+        acc_data = monthly_by_account[monthly_by_account['계정과목'] == account].copy()
+        if len(acc_data) < 2:
+            continue
 
-for account in account_stats.index:
-    mean_val = account_stats.loc[account, 'mean']
-    std_val = account_stats.loc[account, 'std']
+        acc_data['prev'] = acc_data['순액'].shift(1)
+        acc_data['change_rate'] = (acc_data['순액'] - acc_data['prev']) / acc_data['prev'].replace(0, 1)
 
-    if std_val > 0:
-        account_data = df[df['계정과목'] == account]
-        for _, row in account_data.iterrows():
-            z_score = (row['순액'] - mean_val) / std_val
-            if abs(z_score) > 3:  # 3 표준편차 초과
+        for _, row in acc_data.iterrows():
+            if pd.isna(row['change_rate']):
+                continue
+            if row['change_rate'] > 2:  # 200% 이상 급증
                 anomalies.append({
-                    '유형': '금액이상',
+                    '유형': '급증',
                     '계정과목': account,
-                    '거래처명': row.get('거래처명', ''),
-                    '회계일자': row.get('회계일자', ''),
+                    '거래처명': '',
+                    '회계일자': f"{fiscal_year}{row['월']}",
                     '금액': row['순액'],
-                    '평균': round(mean_val, 0),
-                    'Z-score': round(z_score, 2),
-                    '비고': f'평균 대비 {abs(z_score):.1f}σ 이탈'
+                    '평균': row['prev'],
+                    'Z-score': 0,
+                    '비고': f"전월 대비 {row['change_rate']*100:.0f}% 증가"
+                })
+            elif row['change_rate'] < -0.5:  # 50% 이상 급감
+                anomalies.append({
+                    '유형': '급감',
+                    '계정과목': account,
+                    '거래처명': '',
+                    '회계일자': f"{fiscal_year}{row['월']}",
+                    '금액': row['순액'],
+                    '평균': row['prev'],
+                    'Z-score': 0,
+                    '비고': f"전월 대비 {row['change_rate']*100:.0f}% 감소"
                 })
 
-# 12.2 마이너스 금액 탐지 (비용에서 음수)
-expense_categories = ['판관비', '매출원가', '영업외비용']
-negative_expenses = df[(df['손익분류'].isin(expense_categories)) & (df['순액'] < 0)]
-
-for _, row in negative_expenses.iterrows():
-    anomalies.append({
-        '유형': '마이너스',
-        '계정과목': row['계정과목'],
-        '거래처명': row.get('거래처명', ''),
-        '회계일자': row.get('회계일자', ''),
-        '금액': row['순액'],
-        '평균': 0,
-        'Z-score': 0,
-        '비고': '비용 계정에서 음수 (환불?)'
-    })
-
-# 12.3 월별 급변 탐지
-monthly_by_account = df.groupby(['계정과목', '월'])['순액'].sum().reset_index()
-monthly_by_account = monthly_by_account.sort_values(['계정과목', '월'])
-
-for account in monthly_by_account['계정과목'].unique():
-    acc_data = monthly_by_account[monthly_by_account['계정과목'] == account].copy()
-    if len(acc_data) < 2:
-        continue
-
-    acc_data['prev'] = acc_data['순액'].shift(1)
-    acc_data['change_rate'] = (acc_data['순액'] - acc_data['prev']) / acc_data['prev'].replace(0, 1)
-
-    for _, row in acc_data.iterrows():
-        if pd.isna(row['change_rate']):
-            continue
-        if row['change_rate'] > 2:  # 200% 이상 급증
-            anomalies.append({
-                '유형': '급증',
-                '계정과목': account,
-                '거래처명': '',
-                '회계일자': f"2024{row['월']}",
-                '금액': row['순액'],
-                '평균': row['prev'],
-                'Z-score': 0,
-                '비고': f"전월 대비 {row['change_rate']*100:.0f}% 증가"
-            })
-        elif row['change_rate'] < -0.5:  # 50% 이상 급감
-            anomalies.append({
-                '유형': '급감',
-                '계정과목': account,
-                '거래처명': '',
-                '회계일자': f"2024{row['월']}",
-                '금액': row['순액'],
-                '평균': row['prev'],
-                'Z-score': 0,
-                '비고': f"전월 대비 {row['change_rate']*100:.0f}% 감소"
-            })
-
-anomaly_df = pd.DataFrame(anomalies) if anomalies else pd.DataFrame()
-print(f"   이상 거래: {len(anomaly_df)}건 탐지")
-
-# ============================================================
-# 13. Excel 출력
-# ============================================================
-print("13. Excel 출력 중...")
-
-from openpyxl.utils import get_column_letter
-from openpyxl.styles import numbers
-
-# 파일명에 타임스탬프 추가 (mm-dd-hh-mm)
-timestamp = datetime.now().strftime("%m-%d-%H-%M")
-excel_path = OUTPUT_DIR / f"분석결과_{timestamp}.xlsx"
-
-with pd.ExcelWriter(excel_path, engine='openpyxl') as writer:
-    # 원본 데이터 (맨 앞)
-    df_original.to_excel(writer, sheet_name='원본데이터', index=False)
-
-    # 1. 기본 피벗 - index=False로 병합 셀 문제 방지
-    pivot_basic.to_excel(writer, sheet_name='기본피벗', index=False)
-
-    # 1-2. 기본_거래처추가_피벗 (NEW) - index=False로 병합 셀 문제 방지
-    pivot_trader.to_excel(writer, sheet_name='기본_거래처추가_피벗', index=False)
-
-    # 1-3. 기본_거래처_증빙유형 (NEW) - index=False로 병합 셀 문제 방지
-    pivot_trader_ev.to_excel(writer, sheet_name='기본_거래처_증빙유형', index=False)
-
-    # 1-4. total_월별추이_가로 (소스유형 × 월별 컬럼)
-    monthly_wide.to_excel(writer, sheet_name='total_월별추이_가로', index=False)
-
-    # 1-5. total_월별추이_세로 (월을 행으로)
-    monthly_long.to_excel(writer, sheet_name='total_월별추이_세로', index=False)
-
-    # 1-6. total_월별추이_가로_빈도 (거래 횟수)
-    monthly_wide_cnt.to_excel(writer, sheet_name='total_월별추이_가로_빈도', index=False)
-
-    # 1-7. total_월별추이_세로_빈도 (거래 횟수)
-    monthly_long_cnt.to_excel(writer, sheet_name='total_월별추이_세로_빈도', index=False)
-
-    # 2. 월별 추이
-    monthly_trend.to_excel(writer, sheet_name='월별추이')
-
-    # 3. 계정월별상세
-    account_monthly.to_excel(writer, sheet_name='계정월별')
-
-    # 4. 거래처 TOP 10
-    trade_top10.to_excel(writer, sheet_name='거래처TOP', index=False)
-
-    # 5. 증빙유형별
-    evidence_analysis.to_excel(writer, sheet_name='증빙유형별')
-
-    # 6. 카드 현황
-    if len(card_status) > 0:
-        card_status.to_excel(writer, sheet_name='카드현황')
-
-    # 7. 카드미반영 상세
-    if len(card_missing_detail) > 0:
-        card_missing_detail.to_excel(writer, sheet_name='카드미반영', index=False)
-
-    # 8. 요일별 패턴
-    weekday_summary.to_excel(writer, sheet_name='요일별', index=False)
-
-    # 9. 금액구간별
-    amount_summary.to_excel(writer, sheet_name='금액구간별', index=False)
-
-    # 10. 이상 거래
-    if len(anomaly_df) > 0:
-        anomaly_df.to_excel(writer, sheet_name='이상거래', index=False)
-
-    # 서식 적용: 열너비 자동 조정 + 금액 형식
-    workbook = writer.book
-
-    # 금액 관련 컬럼명 (이 컬럼들에 #,##0 형식 적용)
-    money_keywords = ['금액', '순액', '합계', '평균', '총금액', '평균금액', '분개장', '카드미반영', '총합계',
-                      '증빙금액', '세금계산서', '카드', '현금영수증', '수기', '결산분개', '원천세',
-                      '영세율', '통장자동', '현금조정']
-
-    for sheet_name in workbook.sheetnames:
-        ws = workbook[sheet_name]
-
-        # 열너비 자동 조정
-        for col_idx, column_cells in enumerate(ws.columns, 1):
-            max_length = 0
-            column_letter = get_column_letter(col_idx)
-
-            for cell in column_cells:
-                try:
-                    cell_value = str(cell.value) if cell.value is not None else ""
-                    cell_length = len(cell_value.encode('utf-8'))  # 한글 고려
-                    # 한글은 2바이트로 계산
-                    adjusted_length = sum(2 if ord(c) > 127 else 1 for c in cell_value)
-                    if adjusted_length > max_length:
-                        max_length = adjusted_length
-                except:
-                    pass
-
-            # 최소 8, 최대 50
-            adjusted_width = min(max(max_length + 2, 8), 50)
-            ws.column_dimensions[column_letter].width = adjusted_width
-
-        # 금액 형식 적용 (#,##0)
-        # 첫 번째 행(헤더) 확인
-        header_row = list(ws.iter_rows(min_row=1, max_row=1, values_only=True))[0]
-
-        for col_idx, header in enumerate(header_row, 1):
-            if header is None:
-                continue
-
-            # 금액 관련 컬럼인지 확인
-            is_money_col = any(kw in str(header) for kw in money_keywords)
-
-            if is_money_col:
-                column_letter = get_column_letter(col_idx)
-                for row_idx in range(2, ws.max_row + 1):
-                    cell = ws[f"{column_letter}{row_idx}"]
-                    if isinstance(cell.value, (int, float)):
-                        cell.number_format = '#,##0'
-
-print(f"   Excel 저장: {excel_path}")
-
-# ============================================================
-# 14. JSON 출력
-# ============================================================
-print("14. JSON 출력 중...")
-
-def df_to_dict(df):
-    """DataFrame을 JSON 직렬화 가능한 dict로 변환"""
-    result = df.copy()
-    if isinstance(result.index, pd.MultiIndex):
-        result = result.reset_index()
-    for col in result.columns:
-        if result[col].dtype in ['int64', 'float64']:
-            result[col] = result[col].apply(
-                lambda x: int(x) if pd.notna(x) and x == int(x)
-                else float(x) if pd.notna(x) else None
-            )
-    return result.to_dict(orient='records')
-
-json_output = {
-    "meta": {
-        "회사명": COMPANY_NAME,
-        "기간": "2024",
-        "총건수": len(df),
-        "생성일시": datetime.now().isoformat()
+    # 12.4 중복 전표 의심 (거래처 해시 블록 + 정렬 이웃 탐색, 일자/금액 허용 오차)
+    duplicates = find_duplicates(df)
+    for _, pair in duplicates.iterrows():
+        original, row = df.loc[pair['원행']], df.loc[pair['중복행']]
+        anomalies.append({
+            '유형': '중복의심',
+            '계정과목': row['계정과목'],
+            '거래처명': row.get('거래처명', ''),
+            '회계일자': row.get('회계일자', ''),
+            '금액': row['순액'],
+            '평균': original['순액'],
+            'Z-score': 0,
+            '비고': (f"{pair['구분']} 중복: {original['데이터소스']} {original['전표번호']} ({original['회계일자']}) ↔ "
+                   f"{row['데이터소스']} {row['전표번호']}, {pair['일자차']}일/{pair['금액차']:,.0f}원 차이")
+        })
+
+    anomaly_df = pd.DataFrame(anomalies) if anomalies else pd.DataFrame()
+    log(f"   이상 거래: {len(anomaly_df)}건 탐지")
+
+    return {'이상거래': anomaly_df}
+
+# ============================================================
+# 4~12. 분석 단계 실행 (서로 독립, 파생 프레임/큐브는 읽기만 함)
+# ============================================================
+analysis_stages = {
+    '4. 거래처별 분석': (stage_trader_top, []),
+    '5. 증빙유형별 분석': (stage_evidence, []),
+    '6. 선언형 시트': (stage_report_sheets, []),
+    '7. 카드 현황 분석': (stage_card_status, []),
+    '8. 카드미반영 상세 분석': (stage_card_missing, []),
+    '8-1. 카드 대사': (stage_card_matching, []),
+    '9. 요일별 패턴 분석': (stage_weekday, []),
+    '9-1. 입력 지연 분석': (stage_entry_lag, []),
+    '10. 금액구간별 분석': (stage_amount_range, []),
+    '12. 이상 거래 탐지': (stage_anomalies, []),
+}
+workers = STAGE_WORKERS or default_workers(len(analysis_stages))
+print(f"4~12. 분석 단계 실행 중... (작업 스레드 {workers}개, GIL {'활성' if gil_enabled() else '비활성'})")
+
+stage_tables = run_stages(analysis_stages, max_workers=workers)
+
+# ============================================================
+# 12-1. 결과 저장 (결과 캐시)
+# ============================================================
+results = {
+    'meta': {'총건수': len(df), '년도': fiscal_year, '시작월': df['월'].min(), '종료월': df['월'].max()},
+    'cube': cube,
+    'tables': {
+        '원본데이터': df_original,
+        '기본피벗': pivot_basic,
+        '기본_거래처추가_피벗': pivot_trader,
+        '기본_거래처_증빙유형': pivot_trader_ev,
+        'total_월별추이_가로': monthly_wide,
+        'total_월별추이_세로': monthly_long,
+        'total_월별추이_가로_빈도': monthly_wide_cnt,
+        'total_월별추이_세로_빈도': monthly_long_cnt,
+        '표준계정별': std_account,
+        '데이터품질': data_quality,
+        **stage_tables,  # 4~12단계: 거래처TOP, 증빙유형별, 선언형 시트(월별추이, 계정월별 등), 카드현황, 카드미반영, 카드대사, 요일별, 입력지연, 금액구간별, 이상거래
     },
-    "기본피벗": df_to_dict(pivot_basic.reset_index()),
-    "기본_거래처추가_피벗": df_to_dict(pivot_trader.reset_index()),
-    "기본_거래처_증빙유형": df_to_dict(pivot_trader_ev.reset_index()),
-    "월별추이": df_to_dict(monthly_trend.reset_index()),
-    "계정월별": df_to_dict(account_monthly.reset_index()),
-    "거래처TOP": df_to_dict(trade_top10),
-    "증빙유형별": df_to_dict(evidence_analysis.reset_index()),
-    "요일별": df_to_dict(weekday_summary),
-    "금액구간별": df_to_dict(amount_summary),
-    "카드미반영": df_to_dict(card_missing_detail) if len(card_missing_detail) > 0 else [],
-    "이상거래": df_to_dict(anomaly_df) if len(anomaly_df) > 0 else []
 }
+if RESULT_CACHE:
+    save_results(RESULT_CACHE_DIR, result_cache_key, results)
 
-json_path = OUTPUT_DIR / f"분석결과_{timestamp}.json"
-with open(json_path, 'w', encoding='utf-8') as f:
-    json.dump(json_output, f, ensure_ascii=False, indent=2)
-
-print(f"   JSON 저장: {json_path}")
-
-# ============================================================
-# 15. 요약 출력
-# ============================================================
-print("\n" + "="*60)
-print("분석 완료! (10가지 분석)")
-print("="*60)
-
-print(f"\n[데이터 요약]")
-print(f"  - 총 건수: {len(df):,}건")
-print(f"  - 기간: 2024년 {df['월'].min()}월 ~ {df['월'].max()}월")
-
-print(f"\n[손익 요약]")
-for idx, row in monthly_trend.iterrows():
-    print(f"  - {idx}: {row['합계']:,.0f}원")
-
-print(f"\n[분석 결과]")
-print(f"  - 기본 피벗: {len(pivot_basic)}행")
-print(f"  - 기본_거래처추가_피벗: {len(pivot_trader)}행")
-print(f"  - 기본_거래처_증빙유형: {len(pivot_trader_ev)}행")
-print(f"  - 월별 추이: {len(monthly_trend)}행")
-print(f"  - 계정월별: {len(account_monthly)}행")
-print(f"  - 거래처 TOP: {len(trade_top10)}건")
-print(f"  - 증빙유형별: {len(evidence_analysis)}행")
-print(f"  - 카드미반영: {len(card_missing_detail)}건")
-print(f"  - 요일별: {len(weekday_summary)}행")
-print(f"  - 금액구간별: {len(amount_summary)}행")
-print(f"  - 이상 거래: {len(anomaly_df)}건")
-
-print(f"\n[출력 파일]")
-print(f"  - Excel: {excel_path}")
-print(f"  - JSON: {json_path}")
-
-print(f"\n[Excel 시트 목록]")
-sheets = [
-    "원본데이터", "기본피벗", "기본_거래처추가_피벗", "기본_거래처_증빙유형",
-    "월별추이", "계정월별", "거래처TOP", "증빙유형별", "카드현황", "카드미반영",
-    "요일별", "금액구간별", "이상거래"
-]
-for i, sheet in enumerate(sheets, 1):
-    print(f"  {i:2}. {sheet}")
+# 13~15. Excel / 컬럼 형식 / JSON 출력, 요약 표시
+if not args.no_export:
+    export_results(results, OUTPUT_DIR, COMPANY_NAME, **EXPORT_OPTIONS)
@@ -0,0 +1,139 @@
+"""
+달력 차원 / 입력 지연 분석
+- 회계일자는 고유 날짜(연간 최대 366개)만 파싱해 달력 테이블을 만들고, 행에는 정수 코드로 결합
+- 평일공휴일은 Smart-A 휴일 플래그(yn_holiday: 0=평일, 1=일요일/공휴일, 2=토요일)에서 날짜 단위로 판정
+  (원본 플래그 컬럼은 덮어쓰지 않음)
+- 입력일시/SP_dt_modify/전송일자도 고유값만 파싱해 회계일자 대비 지연일수를 벡터 연산으로 계산
+- 값이 있는데 날짜로 읽히지 않는 행은 지연 분석에서 빠지므로 데이터품질 시트에 따로 보고
+"""
+import numpy as np
+import pandas as pd
+
+WEEKDAY_NAMES = {0: '월', 1: '화', 2: '수', 3: '목', 4: '금', 5: '토', 6: '일'}
+
+# 휴일 플래그 컬럼 (앞에서부터 값이 있는 첫 컬럼 사용: 분개장 → 신용카드 → 매입매출전표)
+HOLIDAY_FLAG_COLS = ['공휴일여부', '휴일여부', 'SP_yn_holiday']
+
+# 지연 분석 대상: 지연구분 → (컬럼, 날짜 형식)
+# - 일시는 밀리초 유무가 섞여 있음 (2025-10-20T09:49:04 / 2025-10-20T09:49:04.309) → ISO8601
+LAG_SOURCES = {
+    '입력지연일수': ('입력일시', 'ISO8601'),
+    '수정지연일수': ('SP_dt_modify', 'ISO8601'),
+    '전송지연일수': ('전송일자', '%Y%m%d'),
+}
+
+# 지연일수 구간 (일)
+LAG_BINS = [-np.inf, -1, 0, 7, 30, 90, np.inf]
+LAG_LABELS = ['회계일자 이전', '당일', '1~7일', '8~30일', '31~90일', '90일 초과']
+
+
+def parse_unique(values: pd.Series, fmt: str) -> np.ndarray:
+    """고유값만 파싱해서 행으로 펼친 datetime64 배열 (빈값/형식 오류는 NaT)"""
+    codes, uniques = pd.factorize(values)
+    parsed = pd.to_datetime(pd.Series(uniques, dtype=object).astype(str), format=fmt, errors='coerce').to_numpy()
+    return np.where(codes >= 0, parsed[codes], np.datetime64('NaT'))
+
+
+def build_calendar(df: pd.DataFrame, date_col: str = '회계일자'):
+    """달력 차원 생성
+
+    Returns:
+        (행별 날짜 코드 배열, 달력 DataFrame(코드 인덱스))
+        달력 컬럼: 일자, 요일, 요일명, 주말, 평일공휴일, 분기, 반기
+    """
+    codes, uniques = pd.factorize(df[date_col])
+    dates = pd.to_datetime(pd.Series(uniques, dtype=object).astype(str), format='%Y%m%d', errors='coerce')
+
+    calendar = pd.DataFrame({'일자': dates})
+    calendar['요일'] = dates.dt.dayofweek
+    calendar['요일명'] = calendar['요일'].map(WEEKDAY_NAMES)
+    calendar['주말'] = calendar['요일'] >= 5
+    calendar['분기'] = dates.dt.quarter
+    calendar['반기'] = np.where(dates.dt.month <= 6, 1, 2)
+    calendar.loc[dates.isna(), '반기'] = np.nan
+
+    # 휴일 플래그: 날짜별로 1(일요일/공휴일)이 하나라도 있으면 휴일, 평일이면 공휴일
+    flag_cols = [c for c in HOLIDAY_FLAG_COLS if c in df.columns]
+    holiday = pd.Series(False, index=calendar.index)
+    if flag_cols:
+        flags = pd.to_numeric(df[flag_cols[0]], errors='coerce')
+        for col in flag_cols[1:]:
+            flags = flags.fillna(pd.to_numeric(df[col], errors='coerce'))
+        flagged = pd.Series(flags.to_numpy() == 1).groupby(codes).any()
+        holiday = flagged.reindex(calendar.index, fill_value=False)
+    calendar['평일공휴일'] = holiday.to_numpy() & ~calendar['주말'].to_numpy()
+
+    return codes, calendar
+
+
+def join_calendar(df: pd.DataFrame, codes: np.ndarray, calendar: pd.DataFrame, cols: list) -> pd.DataFrame:
+    """달력 컬럼을 날짜 코드로 행에 결합 (날짜가 없는 행은 결측)"""
+    valid = codes >= 0
+    for col in cols:
+        values = calendar[col].to_numpy()
+        column = pd.Series(values[np.where(valid, codes, 0)], index=df.index)
+        df[col] = column.where(valid)
+    return df
+
+
+def entry_lags(df: pd.DataFrame, date_values: np.ndarray) -> pd.DataFrame:
+    """회계일자 대비 입력/수정/전송 지연일수 (Int64, 값이 없으면 결측)
+
+    Args:
+        date_values: 행별 회계일자 datetime64 배열
+    """
+    base = date_values.astype('datetime64[D]')
+    lags = pd.DataFrame(index=df.index)
+    for name, (col, fmt) in LAG_SOURCES.items():
+        if col not in df.columns:
+            continue
+        stamps = parse_unique(df[col], fmt).astype('datetime64[D]')
+        days = (stamps - base).astype('timedelta64[D]')
+        lags[name] = pd.array(np.where(np.isnat(days), 0, days.astype(np.int64)), dtype='Int64')
+        lags.loc[np.isnat(days), name] = pd.NA
+    return lags
+
+
+def lag_parse_report(df: pd.DataFrame, sample_rows: int = 5) -> pd.DataFrame:
+    """지연 기준 일시 컬럼의 파싱 실패 행 (데이터품질 시트 형식)
+
+    값이 있는데(빈값/공백 제외) 날짜로 읽히지 않는 행을 컬럼별로 집계한다.
+    """
+    rows = []
+    for col, fmt in LAG_SOURCES.values():
+        if col not in df.columns:
+            continue
+        values = df[col]
+        present = (values.notna() & values.astype(str).str.strip().ne('')).to_numpy()
+        failed = np.flatnonzero(present & np.isnat(parse_unique(values, fmt)))
+        target = int(present.sum())
+        slips = df['전표번호'].iloc[failed[:sample_rows]].astype(str) if '전표번호' in df.columns else []
+        rows.append({
+            '규칙': '날짜형식', '조건': '값 있음', '컬럼': col,
+            '대상건수': target, '위반건수': len(failed),
+            '위반율': round(len(failed) / target * 100, 1) if target else 0.0,
+            '비고': f"형식 {fmt}, 예: {values.iloc[failed[0]]} (지연 분석 제외)" if len(failed) else '',
+            '예시행': ', '.join(str(p) for p in failed[:sample_rows]),
+            '예시전표': ', '.join(s for s in slips if s not in ('', 'nan')),
+        })
+    return pd.DataFrame(rows)
+
+
+def lag_summary(lags: pd.DataFrame, by: pd.Series) -> pd.DataFrame:
+    """지연구분 × 그룹별 지연일수 분포 (건수, 평균, 중앙값, 최대, 구간별 건수)"""
+    long = lags.assign(**{by.name: by.to_numpy()}).melt(id_vars=by.name, var_name='지연구분', value_name='지연일수')
+    long = long.dropna(subset=['지연일수'])
+    if long.empty:
+        return pd.DataFrame(columns=['지연구분', by.name, '건수', '평균', '중앙값', '최대'] + LAG_LABELS)
+    long['지연일수'] = long['지연일수'].astype(np.int64)
+
+    keys = ['지연구분', by.name]
+    stats = long.groupby(keys)['지연일수'].agg(건수='size', 평균='mean', 중앙값='median', 최대='max')
+    stats['평균'] = stats['평균'].round(1)
+    buckets = pd.cut(long['지연일수'], bins=LAG_BINS, labels=LAG_LABELS)
+    dist = long.groupby(keys + [buckets], observed=False).size().unstack(fill_value=0)
+    summary = stats.join(dist[LAG_LABELS]).reset_index()
+
+    order = {name: i for i, name in enumerate(LAG_SOURCES)}
+    summary = summary.sort_values(['지연구분', '건수'], key=lambda s: s.map(order) if s.name == '지연구분' else -s)
+    return summary.reset_index(drop=True)
@@ -0,0 +1,100 @@
+"""
+카드미반영(88.5) ↔ 반영 카드 전표(88) 대사
+- 1차: (전표번호, 거래처, 순액)이 같은 반영 전표와 연결 (매칭키 '전표번호')
+- 2차: 남은 행을 (거래처, 순액) 키별로 회계일자 정렬 후 as-of 조인 (±MATCH_WINDOW_DAYS일 중 가장 가까운 반영 전표)
+  후보 수는 (키, 일자) 정렬 배열의 이진 탐색으로 계산 - 중첩 루프 없이 O((n + m) log m)
+- 결과: 매칭(후보 1건이고 다른 행과 겹치지 않음) / 모호(후보 여러 건이거나 같은 반영 전표를 여러 행이 가리킴) / 미매칭(후보 없음)
+"""
+import numpy as np
+import pandas as pd
+
+# 일자 허용 범위 (일) - 카드 사용일과 장부 반영일 차이
+MATCH_WINDOW_DAYS = 7
+
+# 대사 결과 순서 (확인이 필요한 행부터)
+STATUS_ORDER = ['미매칭', '모호', '매칭']
+
+DETAIL_COLS = ['회계일자', '거래처명', '순액', '계정과목', '전표번호']
+
+
+def _days(values: pd.Series) -> np.ndarray:
+    return values.to_numpy().astype('datetime64[D]').astype(np.int64)
+
+
+def reconcile_cards(pending: pd.DataFrame, booked: pd.DataFrame, trader_col: str = '거래처명_filled',
+                    date_col: str = '회계일자_dt', window: int = MATCH_WINDOW_DAYS) -> pd.DataFrame:
+    """카드미반영 행별 대사 결과
+
+    Args:
+        pending: 카드미반영(88.5) 행
+        booked: 반영 카드 전표(88) 행
+
+    Returns:
+        DataFrame [대사결과, 매칭키, 후보수, 일자차, 회계일자, 거래처명, 순액, 계정과목, 전표번호,
+                   반영_회계일자, 반영_전표번호, 반영_계정과목] - 카드미반영 1행당 1행
+    """
+    pending = pending.assign(_p=np.arange(len(pending)))
+    booked = booked[booked[date_col].notna()].assign(_b=np.arange(int(booked[date_col].notna().sum())))
+    match = pd.DataFrame({
+        '_p': pending['_p'].to_numpy(), '_b': -1, '후보수': 0, '매칭키': '',
+    }).set_index('_p')
+
+    # 1차: 전표번호 연결 (카드미반영 행이 반영 전표를 가리키는 경우)
+    keys = ['전표번호', trader_col, '순액']
+    linked = pending[keys + ['_p']].merge(booked[keys + ['_b']], on=keys)
+    linked = linked.drop_duplicates('_p').drop_duplicates('_b')
+    match.loc[linked['_p'], '_b'] = linked['_b'].to_numpy()
+    match.loc[linked['_p'], '후보수'] = 1
+    match.loc[linked['_p'], '매칭키'] = '전표번호'
+
+    # 2차: 남은 행끼리 (거래처, 순액) 키 + 일자 as-of 조인
+    rest_p = pending[~pending['_p'].isin(linked['_p']) & pending[date_col].notna()]
+    rest_b = booked[~booked['_b'].isin(linked['_b'])]
+    if len(rest_p) > 0 and len(rest_b) > 0:
+        codes, _ = pd.factorize(pd.MultiIndex.from_frame(
+            pd.concat([rest_p[[trader_col, '순액']], rest_b[[trader_col, '순액']]], ignore_index=True)
+        ))
+        code_p, code_b = codes[:len(rest_p)], codes[len(rest_p):]
+        day_p, day_b = _days(rest_p[date_col]), _days(rest_b[date_col])
+
+        # 후보 수: (키, 일자)를 정수 하나로 합쳐 정렬 후 [일자-window, 일자+window] 구간 이진 탐색
+        origin = min(day_p.min(), day_b.min()) - window
+        span = max(day_p.max(), day_b.max()) - origin + window + 1
+        sorted_b = np.sort(code_b * span + (day_b - origin))
+        target = code_p * span + (day_p - origin)
+        counts = np.searchsorted(sorted_b, target + window, 'right') - np.searchsorted(sorted_b, target - window, 'left')
+
+        # 가장 가까운 후보: 키별 as-of 조인
+        left = pd.DataFrame({'키': code_p, '일자': day_p, '_p': rest_p['_p'].to_numpy()}).sort_values('일자')
+        right = pd.DataFrame({'키': code_b, '일자': day_b, '_b': rest_b['_b'].to_numpy()}).sort_values('일자')
+        nearest = pd.merge_asof(left, right, on='일자', by='키', direction='nearest', tolerance=window)
+        nearest = nearest.set_index('_p')['_b'].reindex(rest_p['_p']).fillna(-1).astype(int)
+
+        match.loc[rest_p['_p'], '_b'] = nearest.to_numpy()
+        match.loc[rest_p['_p'], '후보수'] = counts
+        match.loc[rest_p['_p'], '매칭키'] = np.where(counts > 0, '거래처+금액+일자', '')
+
+    # 같은 반영 전표를 여러 카드미반영 행이 가리키면 모호
+    claimed = match['_b'].where(match['_b'] >= 0)
+    contested = claimed.map(claimed.value_counts()).fillna(0) > 1
+    match['대사결과'] = np.select(
+        [match['_b'] < 0, (match['후보수'] == 1) & ~contested],
+        ['미매칭', '매칭'], default='모호'
+    )
+
+    result = pending.set_index('_p')[DETAIL_COLS].copy()
+    target = booked.set_index('_b').reindex(match['_b'])
+    # 미매칭 행은 반영 전표 정보가 없으므로 빈 문자열, 일자차는 결측(Int64)
+    for col in ['회계일자', '전표번호', '계정과목']:
+        result[f'반영_{col}'] = target[col].fillna('').to_numpy()
+    result['일자차'] = (
+        pd.Series(target[date_col].to_numpy(), index=match.index) - pending.set_index('_p')[date_col]
+    ).dt.days.astype('Int64')
+    result.insert(0, '후보수', match['후보수'])
+    result.insert(0, '매칭키', match['매칭키'])
+    result.insert(0, '대사결과', match['대사결과'])
+
+    result['대사결과'] = pd.Categorical(result['대사결과'], categories=STATUS_ORDER, ordered=True)
+    result = result.sort_values(['대사결과', '회계일자'], kind='stable').reset_index(drop=True)
+    result['대사결과'] = result['대사결과'].astype(str)
+    return result
@@ -0,0 +1,102 @@
+"""
+희소 셀 저장소 (그룹 × 고정 항목 목록 시트용)
+- 값이 있는 셀만 보관하고, 0인 행은 시트에 쓸 때 청크 단위로만 펼침
+- compact 모드는 0인 행을 아예 펼치지 않음
+- 예: 기본_거래처_증빙유형 = (계정과목, 거래처) × 증빙유형 코드 10개
+"""
+import numpy as np
+import pandas as pd
+
+# 시트에 쓸 때 한 번에 펼치는 그룹 수
+CHUNK_GROUPS = 5000
+
+
+class SparseCellStore:
+    """정렬된 그룹 행 × 항목 목록의 희소 셀
+
+    Args:
+        groups: 그룹 키 DataFrame (시트 출력 순서대로 정렬된 상태)
+        cells: 그룹 키 + 항목 컬럼 + 값 컬럼 (값이 있는 셀만)
+        member_col: 항목 컬럼명 (예: '증빙유형')
+        members: 항목 코드 목록 (출력 순서), 목록에 없는 코드의 셀은 버림
+        labels: 항목 코드 → 표시명
+        value_cols: 값 컬럼 목록
+    """
+
+    def __init__(self, groups: pd.DataFrame, cells: pd.DataFrame, member_col: str,
+                 members: list, labels: dict, value_cols: list):
+        self.key_cols = list(groups.columns)
+        self.member_col = member_col
+        self.value_cols = list(value_cols)
+        self.groups = groups.reset_index(drop=True)
+        self.member_labels = np.array([labels.get(m, str(m)) for m in members], dtype=object)
+
+        # 셀 → (그룹 번호, 항목 번호) → 펼친 행 위치
+        group_no = pd.Series(np.arange(len(self.groups)), index=pd.MultiIndex.from_frame(self.groups))
+        cell_group = group_no.reindex(pd.MultiIndex.from_frame(cells[self.key_cols])).to_numpy()
+        cell_member = cells[member_col].map({m: i for i, m in enumerate(members)}).to_numpy()
+        valid = ~(pd.isna(cell_group) | pd.isna(cell_member))
+
+        position = cell_group[valid].astype(np.int64) * len(members) + cell_member[valid].astype(np.int64)
+        order = np.argsort(position, kind='stable')
+        self.positions = position[order]
+        self.values = cells.loc[valid, self.value_cols].to_numpy()[order]
+        self.width = len(members)
+
+    def __len__(self):
+        """펼친 시트 행 수 (그룹 수 × 항목 수)"""
+        return len(self.groups) * self.width
+
+    @property
+    def nnz(self):
+        """값이 있는 셀 수"""
+        return len(self.positions)
+
+    def group_rows(self, compact: bool = False) -> np.ndarray:
+        """그룹별 출력 행 수 (compact면 값이 있는 셀 수)"""
+        if compact:
+            return np.bincount(self.positions // self.width, minlength=len(self.groups))
+        return np.full(len(self.groups), self.width)
+
+    def iter_frames(self, compact: bool = False, chunk_groups: int = CHUNK_GROUPS, first: int = 0, last: int = None):
+        """시트 출력 순서대로 청크 DataFrame 생성 ('index'는 펼친 시트의 행 번호)
+
+        first/last: 출력할 그룹 범위 (시트 분할용)
+        """
+        last = len(self.groups) if last is None else last
+        for start in range(first, last, chunk_groups):
+            stop = min(start + chunk_groups, last)
+            lo, hi = np.searchsorted(self.positions, [start * self.width, stop * self.width])
+
+            if compact:
+                rows = self.positions[lo:hi]
+                values = self.values[lo:hi]
+            else:
+                rows = np.arange(start * self.width, stop * self.width)
+                values = np.zeros((len(rows), len(self.value_cols)), dtype=self.values.dtype)
+                values[self.positions[lo:hi] - start * self.width] = self.values[lo:hi]
+
+            frame = self.groups.iloc[rows // self.width].reset_index(drop=True)
+            frame.insert(0, 'index', rows)
+            frame[self.member_col] = self.member_labels[rows % self.width]
+            frame[self.value_cols] = values
+            yield frame
+
+    def to_frame(self, compact: bool = False) -> pd.DataFrame:
+        """전체 시트 DataFrame (JSON 출력 등 작은 결과용)"""
+        frames = list(self.iter_frames(compact))
+        if not frames:
+            return pd.DataFrame(columns=['index'] + self.key_cols + [self.member_col] + self.value_cols)
+        return pd.concat(frames, ignore_index=True)
+
+    def to_excel(self, writer, sheet_name: str, compact: bool = False, first: int = 0, last: int = None):
+        """청크 단위로 같은 시트에 이어 쓰기 ('index' 컬럼 제외)"""
+        startrow = 0
+        for frame in self.iter_frames(compact, first=first, last=last):
+            frame.drop(columns='index').to_excel(
+                writer, sheet_name=sheet_name, index=False,
+                startrow=startrow, header=startrow == 0
+            )
+            startrow += len(frame) + (startrow == 0)
+        if startrow == 0:
+            self.to_frame().drop(columns='index').to_excel(writer, sheet_name=sheet_name, index=False)
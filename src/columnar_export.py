@@ -0,0 +1,106 @@
+"""
+컬럼 형식(Parquet / Arrow IPC) 결과 테이블 출력
+- Excel 시트 목록과 같은 테이블을 분석결과_{시각}_columnar/ 아래 테이블별 파일로 출력
+- BI 도구는 JSON/xlsx를 다시 파싱하지 않고 dtype을 유지한 채 메모리 매핑/컬럼 필터로 읽음
+- manifest.json 에 테이블별 파일명, 행 수, 컬럼/타입 기록
+- pyarrow가 필요 (설치되어 있지 않으면 출력을 건너뜀)
+"""
+import importlib.util
+import json
+from pathlib import Path
+
+import pandas as pd
+
+from cell_store import SparseCellStore
+
+# 파일 형식별 확장자 ('arrow'는 Arrow IPC 파일 = Feather v2)
+COLUMNAR_SUFFIX = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+
+def columnar_available() -> bool:
+    """pyarrow 설치 여부"""
+    return importlib.util.find_spec('pyarrow') is not None
+
+
+def _flat_frame(frame: pd.DataFrame, index: bool) -> pd.DataFrame:
+    """인덱스는 컬럼으로, MultiIndex 컬럼은 '_'로 이어 붙인 단일 컬럼명으로"""
+    if index:
+        frame = frame.reset_index()
+    if isinstance(frame.columns, pd.MultiIndex):
+        frame.columns = ['_'.join(str(level) for level in col if str(level) != '') for col in frame.columns]
+    frame.columns = [str(col) for col in frame.columns]
+
+    # 혼합 타입 object 컬럼(예: 원본데이터의 숫자/문자 혼재)은 문자열로 통일
+    for col in frame.columns[frame.dtypes.eq(object)]:
+        values = frame[col].dropna()
+        if values.map(type).nunique() > 1:
+            frame[col] = frame[col].astype('string')
+    return frame
+
+
+def _frames(table, index: bool, compact: bool):
+    """출력 청크 (SparseCellStore는 그룹 청크 단위로 펼침)"""
+    if isinstance(table, SparseCellStore):
+        for frame in table.iter_frames(compact):
+            yield frame.drop(columns='index')
+    else:
+        yield _flat_frame(table.copy(), index)
+
+
+def _write_table(path: Path, table, index: bool, compact: bool, fmt: str) -> dict:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    writer, schema, rows = None, None, 0
+    try:
+        for frame in _frames(table, index, compact):
+            batch = pa.Table.from_pandas(frame, preserve_index=False)
+            if writer is None:
+                schema = batch.schema
+                writer = pq.ParquetWriter(path, schema) if fmt == 'parquet' else pa.ipc.new_file(path, schema)
+            writer.write_table(batch.cast(schema))
+            rows += len(frame)
+    finally:
+        if writer is not None:
+            writer.close()
+
+    if writer is None:
+        # 빈 SparseCellStore: 컬럼만 있는 빈 테이블
+        frame = table.to_frame().drop(columns='index')
+        schema = pa.Table.from_pandas(frame, preserve_index=False).schema
+        if fmt == 'parquet':
+            pq.write_table(schema.empty_table(), path)
+        else:
+            with pa.ipc.new_file(path, schema) as empty:
+                empty.write_table(schema.empty_table())
+
+    return {
+        '파일': path.name,
+        '행수': rows,
+        '컬럼': [{'이름': field.name, '타입': str(field.type)} for field in schema],
+    }
+
+
+def export_columnar(out_dir: Path, sheets: list, fmt: str = 'parquet') -> dict:
+    """결과 테이블을 테이블별 Parquet/Arrow 파일 + manifest.json 으로 출력
+
+    Args:
+        out_dir: 출력 디렉토리 (없으면 생성)
+        sheets: [(테이블명, DataFrame 또는 SparseCellStore, index 포함 여부, compact)] - Excel 시트 목록과 같은 형식
+        fmt: 'parquet' 또는 'arrow'
+
+    Returns:
+        manifest {'형식', '테이블': [{이름, 파일, 행수, 컬럼: [{이름, 타입}]}]}
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    suffix = COLUMNAR_SUFFIX[fmt]
+
+    tables = []
+    for name, table, index, compact in sheets:
+        entry = _write_table(out_dir / f"{name}{suffix}", table, index, compact, fmt)
+        tables.append({'이름': name, **entry})
+
+    manifest = {'형식': fmt, '테이블': tables}
+    with open(out_dir / 'manifest.json', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
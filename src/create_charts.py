@@ -19,12 +19,25 @@ from datetime import datetime
 
 import matplotlib.pyplot as plt
 import matplotlib.font_manager as fm
+from matplotlib.cbook import boxplot_stats
 import seaborn as sns
 import pandas as pd
 import numpy as np
 
+from calendar_dim import build_calendar, join_calendar
+from cube import top_n
+from loader import coerce_money, ledger_year
+from result_cache import load_results, result_key, save_results
+from slice_index import SliceIndex
+from trader_names import INDEX_VERSION as TRADER_INDEX_VERSION, canonical_trader_names
+
 warnings.filterwarnings('ignore')
 
+# 차트 집계 캐시: 차트별 집계 결과를 output/{회사명}/_results/chart_series_{키}.pkl 에 저장
+# - 키: 입력 파일 + 거래처명 매핑(trader_names.pkl) 내용 + 매핑 버전 + CHART_SERIES_VERSION
+# - 차트의 집계 로직을 바꾸면 CHART_SERIES_VERSION을 올림
+CHART_SERIES_VERSION = 1
+
 # ============================================================
 # 한글 폰트 설정 (디자인 전문가)
 # ============================================================
@@ -108,13 +121,16 @@ def load_data(json_path: Path) -> pd.DataFrame:
     with open(json_path, 'r', encoding='utf-8') as f:
         data = json.load(f)
 
-    df = pd.DataFrame(data['data'])
+    df = coerce_money(pd.DataFrame(data['data']))
 
     # 기본 전처리
     df['월'] = df['월'].astype(int)
-    df['회계일자'] = pd.to_datetime(df['회계일자'], format='%Y%m%d', errors='coerce')
-    df['요일'] = df['회계일자'].dt.dayofweek
-    df['요일명'] = df['요일'].map({0:'월', 1:'화', 2:'수', 3:'목', 4:'금', 5:'토', 6:'일'})
+
+    # 달력 차원 (고유 회계일자만 파싱 → 날짜 코드로 결합)
+    date_codes, calendar = build_calendar(df)
+    df['회계일자'] = calendar['일자'].to_numpy()[date_codes]
+    df.loc[date_codes < 0, '회계일자'] = pd.NaT
+    df = join_calendar(df, date_codes, calendar, ['요일', '요일명', '주말', '평일공휴일'])
 
     # 증빙유형명
     df['증빙유형명'] = df['증빙유형'].map(EVIDENCE_NAMES).fillna('기타')
@@ -157,14 +173,46 @@ def format_krw_full(value):
 # ============================================================
 
 class ChartGenerator:
-    """차트 생성 클래스"""
+    """차트 생성 클래스
 
-    def __init__(self, df: pd.DataFrame, output_dir: Path):
+    차트별 집계 결과(시리즈/피벗/수치)는 series()로 이름 단위 메모이제이션 →
+    캐시된 집계(cached)를 넘기면 행 데이터 없이(df=None) 그리기만 한다.
+    """
+
+    def __init__(self, df: pd.DataFrame, output_dir: Path, cached: dict = None):
         self.df = df
+        self.slices = SliceIndex(df) if df is not None else None  # 손익분류/증빙유형 등 자주 쓰는 필터의 행 위치
+        self.cached = dict(cached or {})
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
         self.chart_count = 0
 
+    def series(self, name: str, compute):
+        """차트 집계 결과 (처음 요청 시 compute()로 계산, 이후 재사용)"""
+        if name not in self.cached:
+            if self.df is None:
+                raise KeyError(f"캐시에 없는 차트 집계: {name}")
+            self.cached[name] = compute()
+        return self.cached[name]
+
+    def pl_totals(self) -> tuple:
+        """(매출, 매출원가, 판관비) 순액 합계"""
+        return self.series('손익분류_합계', lambda: tuple(
+            self.subset('손익분류', pl)['순액'].sum() for pl in ['매출', '매출원가', '판관비']))
+
+    def monthly_pl(self) -> pd.DataFrame:
+        """월 × 손익분류 순액 합계"""
+        return self.series('월별_손익분류', lambda: self.df.groupby(['월', '손익분류'])['순액'].sum().unstack(fill_value=0))
+
+    def top_traders(self, pl: str, n: int) -> pd.Series:
+        """손익분류의 거래처 TOP n 순액 (거래처명 인덱스)"""
+        return self.series(f'거래처TOP_{pl}_{n}', lambda: top_n(
+            self.subset('손익분류', pl), [], '거래처명_filled', n).set_index('거래처명_filled')['순액'])
+
+    def subset(self, dim: str, values) -> pd.DataFrame:
+        """슬라이스 인덱스로 행 선택 (values는 값 또는 값 리스트)"""
+        return self.slices.take(self.df, {dim: values})
+
     def save_chart(self, fig, name: str):
         """차트 저장"""
         self.chart_count += 1
@@ -181,7 +229,8 @@ class ChartGenerator:
         """손익분류별 총액 개요"""
         fig, ax = plt.subplots(figsize=(12, 6))
 
-        data = self.df.groupby('손익분류')['순액'].sum().sort_values(ascending=True)
+        data = self.series('손익분류별_총액',
+                           lambda: self.df.groupby('손익분류')['순액'].sum().sort_values(ascending=True))
         colors = [PL_COLORS.get(x, COLORS['primary']) for x in data.index]
 
         bars = ax.barh(data.index, data.values, color=colors)
@@ -201,9 +250,7 @@ class ChartGenerator:
         """매출 vs 비용 비교"""
         fig, ax = plt.subplots(figsize=(10, 6))
 
-        revenue = self.df[self.df['손익분류'] == '매출']['순액'].sum()
-        cost = self.df[self.df['손익분류'] == '매출원가']['순액'].sum()
-        expense = self.df[self.df['손익분류'] == '판관비']['순액'].sum()
+        revenue, cost, expense = self.pl_totals()
 
         categories = ['매출', '매출원가', '판관비']
         values = [revenue, cost, expense]
@@ -232,14 +279,18 @@ class ChartGenerator:
         """판관비 세부 항목 (도넛 차트)"""
         fig, ax = plt.subplots(figsize=(10, 8))
 
-        expense_df = self.df[self.df['손익분류'] == '판관비']
-        data = expense_df.groupby('계정과목')['순액'].sum().sort_values(ascending=False)
+        def compute():
+            expense_df = self.subset('손익분류', '판관비')
+            data = expense_df.groupby('계정과목')['순액'].sum().sort_values(ascending=False)
 
-        # 상위 10개 + 기타
-        top10 = data.head(10)
-        if len(data) > 10:
-            others = data[10:].sum()
-            top10['기타'] = others
+            # 상위 10개 + 기타
+            top10 = data.head(10)
+            if len(data) > 10:
+                others = data[10:].sum()
+                top10['기타'] = others
+            return top10, expense_df['순액'].sum()
+
+        top10, total = self.series('판관비_구성', compute)
 
         colors = sns.color_palette('husl', len(top10))
         wedges, texts, autotexts = ax.pie(top10.values, labels=top10.index, autopct='%1.1f%%',
@@ -252,7 +303,6 @@ class ChartGenerator:
         ax.set_title('판관비 구성 (상위 10개 항목)', fontsize=14, fontweight='bold')
 
         # 중앙에 총액 표시
-        total = expense_df['순액'].sum()
         ax.text(0, 0, f'총 판관비\n{format_krw_full(total)}', ha='center', va='center', fontsize=11)
 
         plt.tight_layout()
@@ -262,8 +312,8 @@ class ChartGenerator:
         """매출원가 구조"""
         fig, ax = plt.subplots(figsize=(10, 6))
 
-        cost_df = self.df[self.df['손익분류'] == '매출원가']
-        data = cost_df.groupby('계정과목')['순액'].sum().sort_values(ascending=False)
+        data = self.series('매출원가_항목별', lambda: self.subset('손익분류', '매출원가')
+                           .groupby('계정과목')['순액'].sum().sort_values(ascending=False))
 
         colors = sns.color_palette('Reds_r', len(data))
         bars = ax.barh(data.index, data.values, color=colors)
@@ -283,7 +333,7 @@ class ChartGenerator:
         """월별 이익률 추이"""
         fig, ax = plt.subplots(figsize=(12, 6))
 
-        monthly = self.df.groupby(['월', '손익분류'])['순액'].sum().unstack(fill_value=0)
+        monthly = self.monthly_pl()
 
         revenue = monthly.get('매출', pd.Series([0]*12))
         cost = monthly.get('매출원가', pd.Series([0]*12))
@@ -314,7 +364,7 @@ class ChartGenerator:
         """월별 매출/비용 추이"""
         fig, ax = plt.subplots(figsize=(14, 6))
 
-        monthly = self.df.groupby(['월', '손익분류'])['순액'].sum().unstack(fill_value=0)
+        monthly = self.monthly_pl()
 
         x = np.arange(1, 13)
         width = 0.25
@@ -345,8 +395,8 @@ class ChartGenerator:
         """월별 매출 상세"""
         fig, ax = plt.subplots(figsize=(12, 6))
 
-        revenue_df = self.df[self.df['손익분류'] == '매출']
-        monthly = revenue_df.groupby(['월', '계정과목'])['순액'].sum().unstack(fill_value=0)
+        monthly = self.series('월별_매출_구성', lambda: self.subset('손익분류', '매출')
+                              .groupby(['월', '계정과목'])['순액'].sum().unstack(fill_value=0))
 
         monthly.plot(kind='bar', stacked=True, ax=ax, colormap='Blues')
 
@@ -364,13 +414,17 @@ class ChartGenerator:
         """월별 판관비 상세"""
         fig, ax = plt.subplots(figsize=(14, 6))
 
-        expense_df = self.df[self.df['손익분류'] == '판관비']
-        monthly = expense_df.groupby(['월', '계정과목'])['순액'].sum().unstack(fill_value=0)
+        def compute():
+            expense_df = self.subset('손익분류', '판관비')
+            monthly = expense_df.groupby(['월', '계정과목'])['순액'].sum().unstack(fill_value=0)
+
+            # 상위 5개 계정 + 기타
+            top_accounts = monthly.sum().nlargest(5).index.tolist()
+            monthly_top = monthly[top_accounts].copy()
+            monthly_top['기타'] = monthly[[c for c in monthly.columns if c not in top_accounts]].sum(axis=1)
+            return monthly_top
 
-        # 상위 5개 계정 + 기타
-        top_accounts = monthly.sum().nlargest(5).index.tolist()
-        monthly_top = monthly[top_accounts].copy()
-        monthly_top['기타'] = monthly[[c for c in monthly.columns if c not in top_accounts]].sum(axis=1)
+        monthly_top = self.series('월별_판관비_구성', compute)
 
         monthly_top.plot(kind='bar', stacked=True, ax=ax, colormap='Oranges')
 
@@ -388,7 +442,7 @@ class ChartGenerator:
         """월별 거래 건수"""
         fig, ax = plt.subplots(figsize=(12, 6))
 
-        monthly_count = self.df.groupby('월').size()
+        monthly_count = self.series('월별_거래건수', lambda: self.df.groupby('월').size())
 
         bars = ax.bar(monthly_count.index, monthly_count.values, color=COLORS['info'])
         ax.set_xlabel('월')
@@ -412,7 +466,7 @@ class ChartGenerator:
         """월별 평균 거래 금액"""
         fig, ax = plt.subplots(figsize=(12, 6))
 
-        monthly_avg = self.df.groupby('월')['순액'].mean()
+        monthly_avg = self.series('월별_평균거래금액', lambda: self.df.groupby('월')['순액'].mean())
 
         ax.plot(monthly_avg.index, monthly_avg.values, marker='o',
                 color=COLORS['primary'], linewidth=2, markersize=8)
@@ -435,8 +489,7 @@ class ChartGenerator:
         """판관비 거래처 TOP 10"""
         fig, ax = plt.subplots(figsize=(12, 7))
 
-        expense_df = self.df[self.df['손익분류'] == '판관비']
-        top_traders = expense_df.groupby('거래처명_filled')['순액'].sum().nlargest(10)
+        top_traders = self.top_traders('판관비', 10)
 
         colors = sns.color_palette('YlOrRd_r', len(top_traders))
         bars = ax.barh(top_traders.index, top_traders.values, color=colors)
@@ -456,8 +509,7 @@ class ChartGenerator:
         """매출 거래처 TOP 10"""
         fig, ax = plt.subplots(figsize=(12, 7))
 
-        revenue_df = self.df[self.df['손익분류'] == '매출']
-        top_traders = revenue_df.groupby('거래처명_filled')['순액'].sum().nlargest(10)
+        top_traders = self.top_traders('매출', 10)
 
         colors = sns.color_palette('Blues_r', len(top_traders))
         bars = ax.barh(top_traders.index, top_traders.values, color=colors)
@@ -477,12 +529,10 @@ class ChartGenerator:
         """거래처 집중도 (파레토)"""
         fig, ax1 = plt.subplots(figsize=(14, 6))
 
-        expense_df = self.df[self.df['손익분류'] == '판관비']
-        trader_sum = expense_df.groupby('거래처명_filled')['순액'].sum().sort_values(ascending=False)
-
-        # 상위 20개만
-        top20 = trader_sum.head(20)
-        cumsum = top20.cumsum() / trader_sum.sum() * 100
+        # 상위 20개만 (누적비중은 전체 판관비 대비 %)
+        pareto = self.series('거래처_파레토', lambda: top_n(self.subset('손익분류', '판관비'), [], '거래처명_filled', 20))
+        top20 = pareto['순액']
+        cumsum = pareto['누적비중']
 
         ax1.bar(range(len(top20)), top20.values, color=COLORS['primary'], alpha=0.7)
         ax1.set_xlabel('거래처 (순위)')
@@ -506,8 +556,8 @@ class ChartGenerator:
         """계정과목별 거래처 수"""
         fig, ax = plt.subplots(figsize=(12, 8))
 
-        expense_df = self.df[self.df['손익분류'] == '판관비']
-        trader_count = expense_df.groupby('계정과목')['거래처명_filled'].nunique().sort_values(ascending=True)
+        trader_count = self.series('계정과목별_거래처수', lambda: self.subset('손익분류', '판관비')
+                                   .groupby('계정과목')['거래처명_filled'].nunique().sort_values(ascending=True))
 
         colors = sns.color_palette('viridis', len(trader_count))
         bars = ax.barh(trader_count.index, trader_count.values, color=colors)
@@ -524,12 +574,13 @@ class ChartGenerator:
         """주요 거래처 월별 패턴"""
         fig, ax = plt.subplots(figsize=(14, 8))
 
-        expense_df = self.df[self.df['손익분류'] == '판관비']
-        top5_traders = expense_df.groupby('거래처명_filled')['순액'].sum().nlargest(5).index
+        def compute():
+            expense_df = self.subset('손익분류', '판관비')
+            top5_traders = top_n(expense_df, [], '거래처명_filled', 5)['거래처명_filled']
+            return {trader: expense_df[expense_df['거래처명_filled'] == trader].groupby('월')['순액'].sum()
+                    for trader in top5_traders}
 
-        for trader in top5_traders:
-            trader_data = expense_df[expense_df['거래처명_filled'] == trader]
-            monthly = trader_data.groupby('월')['순액'].sum()
+        for trader, monthly in self.series('주요거래처_월별패턴', compute).items():
             ax.plot(monthly.index, monthly.values, marker='o', label=trader[:15], linewidth=2)
 
         ax.set_xlabel('월')
@@ -550,9 +601,8 @@ class ChartGenerator:
         """증빙유형별 금액 현황"""
         fig, ax = plt.subplots(figsize=(12, 6))
 
-        data = self.df.groupby('증빙유형명')['순액'].sum().sort_values(ascending=True)
-        colors = [EVIDENCE_COLORS.get(k, COLORS['light']) for k in
-                  self.df.groupby('증빙유형명')['증빙유형'].first().reindex(data.index)]
+        data = self.series('증빙유형별_금액',
+                           lambda: self.df.groupby('증빙유형명')['순액'].sum().sort_values(ascending=True))
 
         bars = ax.barh(data.index, data.values, color=sns.color_palette('Set2', len(data)))
         ax.set_xlabel('금액')
@@ -570,7 +620,7 @@ class ChartGenerator:
         """증빙유형별 거래 건수"""
         fig, ax = plt.subplots(figsize=(10, 6))
 
-        data = self.df['증빙유형명'].value_counts()
+        data = self.series('증빙유형별_건수', lambda: self.df['증빙유형명'].value_counts())
 
         colors = sns.color_palette('Set2', len(data))
         wedges, texts, autotexts = ax.pie(data.values, labels=data.index, autopct='%1.1f%%',
@@ -584,8 +634,8 @@ class ChartGenerator:
         """손익분류별 증빙유형 분포"""
         fig, ax = plt.subplots(figsize=(14, 7))
 
-        pivot = self.df.pivot_table(index='손익분류', columns='증빙유형명',
-                                     values='순액', aggfunc='sum', fill_value=0)
+        pivot = self.series('손익분류별_증빙유형', lambda: self.df.pivot_table(
+            index='손익분류', columns='증빙유형명', values='순액', aggfunc='sum', fill_value=0))
 
         pivot.plot(kind='bar', stacked=True, ax=ax, colormap='tab20')
 
@@ -603,8 +653,8 @@ class ChartGenerator:
         """월별 증빙유형 추이"""
         fig, ax = plt.subplots(figsize=(14, 6))
 
-        pivot = self.df.pivot_table(index='월', columns='증빙유형명',
-                                     values='순액', aggfunc='count', fill_value=0)
+        pivot = self.series('월별_증빙유형_추이', lambda: self.df.pivot_table(
+            index='월', columns='증빙유형명', values='순액', aggfunc='count', fill_value=0))
 
         pivot.plot(kind='line', marker='o', ax=ax, linewidth=2)
 
@@ -625,13 +675,22 @@ class ChartGenerator:
         """카드 vs 현금 거래 비교"""
         fig, axes = plt.subplots(1, 2, figsize=(14, 6))
 
-        # 금액 기준 (절대값 사용 - 파이차트는 음수 불가)
-        card_amount = abs(self.df[self.df['증빙유형'] == 88]['순액'].sum())
-        cash_amount = abs(self.df[self.df['증빙유형'] == 89]['순액'].sum())
-        tax_amount = abs(self.df[self.df['증빙유형'] == 86]['순액'].sum())
-        other_amount = abs(self.df[~self.df['증빙유형'].isin([88, 89, 86])]['순액'].sum())
-
-        amounts = [card_amount, cash_amount, tax_amount, other_amount]
+        def compute():
+            # 금액 기준 (절대값 사용 - 파이차트는 음수 불가)
+            card_amount = abs(self.subset('증빙유형', 88)['순액'].sum())
+            cash_amount = abs(self.subset('증빙유형', 89)['순액'].sum())
+            tax_amount = abs(self.subset('증빙유형', 86)['순액'].sum())
+            other_amount = abs(self.df['순액'].sum() - self.subset('증빙유형', [88, 89, 86])['순액'].sum())
+
+            # 건수 기준
+            card_count = self.slices.count({'증빙유형': 88})
+            cash_count = self.slices.count({'증빙유형': 89})
+            tax_count = self.slices.count({'증빙유형': 86})
+            other_count = len(self.df) - self.slices.count({'증빙유형': [88, 89, 86]})
+            return ([card_amount, cash_amount, tax_amount, other_amount],
+                    [card_count, cash_count, tax_count, other_count])
+
+        amounts, counts = self.series('결제수단별_비교', compute)
         labels = ['카드', '현금영수증', '세금계산서', '기타']
         colors = [COLORS['warning'], COLORS['success'], COLORS['primary'], COLORS['light']]
 
@@ -642,14 +701,7 @@ class ChartGenerator:
             axes[0].pie(amounts_nz, labels=labels_nz, autopct='%1.1f%%', colors=colors_nz)
         axes[0].set_title('결제수단별 금액 비율', fontsize=12, fontweight='bold')
 
-        # 건수 기준
-        card_count = len(self.df[self.df['증빙유형'] == 88])
-        cash_count = len(self.df[self.df['증빙유형'] == 89])
-        tax_count = len(self.df[self.df['증빙유형'] == 86])
-        other_count = len(self.df[~self.df['증빙유형'].isin([88, 89, 86])])
-
-        counts = [card_count, cash_count, tax_count, other_count]
-        # 0인 값 필터링
+        # 건수 기준 (0인 값 필터링)
         non_zero_cnt = [(c, l, co) for c, l, co in zip(counts, labels, colors) if c > 0]
         if non_zero_cnt:
             counts_nz, labels_nz, colors_nz = zip(*non_zero_cnt)
@@ -664,11 +716,16 @@ class ChartGenerator:
         """카드미반영 현황"""
         fig, axes = plt.subplots(1, 2, figsize=(14, 6))
 
-        card_missing = self.df[self.df['증빙유형'] == 88.5]
+        def compute():
+            card_missing = self.subset('증빙유형', 88.5)
+            monthly = card_missing.groupby('월')['순액'].sum()
+            top_traders = top_n(card_missing, [], '거래처명_filled', 10).set_index('거래처명_filled')['순액']
+            return len(card_missing), card_missing['순액'].sum(), monthly, top_traders
+
+        missing_count, missing_amount, monthly, top_traders = self.series('카드미반영_분석', compute)
 
-        if len(card_missing) > 0:
+        if missing_count > 0:
             # 월별 카드미반영
-            monthly = card_missing.groupby('월')['순액'].sum()
             axes[0].bar(monthly.index, monthly.values, color=COLORS['danger'])
             axes[0].set_xlabel('월')
             axes[0].set_ylabel('금액')
@@ -677,7 +734,6 @@ class ChartGenerator:
             axes[0].set_xticks(range(1, 13))
 
             # 거래처별 TOP 10
-            top_traders = card_missing.groupby('거래처명_filled')['순액'].sum().nlargest(10)
             axes[1].barh(top_traders.index, top_traders.values, color=COLORS['danger'])
             axes[1].set_xlabel('금액')
             axes[1].set_title('카드미반영 거래처 TOP 10', fontsize=12, fontweight='bold')
@@ -687,7 +743,7 @@ class ChartGenerator:
             axes[0].text(0.5, 0.5, '카드미반영 데이터 없음', ha='center', va='center', fontsize=12)
             axes[1].text(0.5, 0.5, '카드미반영 데이터 없음', ha='center', va='center', fontsize=12)
 
-        plt.suptitle(f'카드미반영 분석 (총 {len(card_missing)}건, {format_krw_full(card_missing["순액"].sum())})',
+        plt.suptitle(f'카드미반영 분석 (총 {missing_count}건, {format_krw_full(missing_amount)})',
                     fontsize=14, fontweight='bold', y=1.02)
         plt.tight_layout()
         return self.save_chart(fig, '카드미반영_분석')
@@ -696,12 +752,16 @@ class ChartGenerator:
         """카드 공제/불공제 현황"""
         fig, ax = plt.subplots(figsize=(10, 6))
 
-        card_df = self.df[self.df['증빙유형'] == 88]
-
-        if '공제구분' in card_df.columns and len(card_df) > 0:
+        def compute():
+            card_df = self.subset('증빙유형', 88)
+            if '공제구분' not in card_df.columns or len(card_df) == 0:
+                return None
             deduction = card_df.groupby('공제구분')['순액'].sum().abs()  # 절대값 사용
-            deduction = deduction[deduction > 0]  # 0보다 큰 값만
+            return deduction[deduction > 0]  # 0보다 큰 값만
+
+        deduction = self.series('카드_공제구분', compute)
 
+        if deduction is not None:
             if len(deduction) > 0:
                 colors = [COLORS['success'], COLORS['danger'], COLORS['light']][:len(deduction)]
                 wedges, texts, autotexts = ax.pie(deduction.values, labels=deduction.index,
@@ -722,9 +782,24 @@ class ChartGenerator:
         """이상치 탐지 (박스플롯)"""
         fig, axes = plt.subplots(1, 2, figsize=(14, 6))
 
+        # 박스플롯 통계(사분위/수염/이상치)만 집계해서 그림 (행 데이터 불필요)
+        def compute():
+            expense_df = self.subset('손익분류', ['판관비', '매출원가'])
+            by_pl = [boxplot_stats(group.to_numpy(), labels=[str(key)])[0]
+                     for key, group in expense_df.groupby('손익분류')['순액']]
+            by_month = [boxplot_stats(group.to_numpy(), labels=[str(key)])[0]
+                        for key, group in self.df.groupby('월')['순액']]
+            return by_pl, by_month
+
+        by_pl, by_month = self.series('이상치_박스플롯', compute)
+
+        # 기존 pandas DataFrame.boxplot 모양과 같은 회색조 (상자/수염 진회색, 중앙값 연회색, 캡 검정)
+        style = dict(boxprops={'color': '0.12156862745098039'}, whiskerprops={'color': '0.12156862745098039'},
+                     medianprops={'color': '0.7058823529411765'}, capprops={'color': 'k'})
+
         # 손익분류별 박스플롯
-        expense_df = self.df[self.df['손익분류'].isin(['판관비', '매출원가'])]
-        expense_df.boxplot(column='순액', by='손익분류', ax=axes[0])
+        axes[0].bxp(by_pl, **style)
+        axes[0].grid(True)
         axes[0].set_title('손익분류별 금액 분포', fontsize=12)
         axes[0].set_xlabel('손익분류')
         axes[0].set_ylabel('금액')
@@ -733,7 +808,8 @@ class ChartGenerator:
         plt.xticks(rotation=0)
 
         # 월별 박스플롯
-        self.df.boxplot(column='순액', by='월', ax=axes[1])
+        axes[1].bxp(by_month, **style)
+        axes[1].grid(True)
         axes[1].set_title('월별 금액 분포', fontsize=12)
         axes[1].set_xlabel('월')
         axes[1].set_ylabel('금액')
@@ -747,10 +823,14 @@ class ChartGenerator:
         """고액 거래 분석"""
         fig, ax = plt.subplots(figsize=(14, 7))
 
-        # 상위 1% 거래
-        threshold = self.df['순액'].abs().quantile(0.99)
-        large_trans = self.df[self.df['순액'].abs() >= threshold].copy()
-        large_trans = large_trans.sort_values('순액', ascending=False).head(20)
+        def compute():
+            # 상위 1% 거래
+            threshold = self.df['순액'].abs().quantile(0.99)
+            large_trans = self.df[self.df['순액'].abs() >= threshold]
+            large_trans = large_trans.sort_values('순액', ascending=False).head(20)
+            return threshold, large_trans[['계정과목', '거래처명_filled', '순액']].reset_index(drop=True)
+
+        threshold, large_trans = self.series('고액거래_TOP20', compute)
 
         colors = ['green' if x > 0 else 'red' for x in large_trans['순액']]
         y_labels = [f"{row['계정과목'][:10]} - {row['거래처명_filled'][:10]}"
@@ -773,21 +853,24 @@ class ChartGenerator:
         """주말 거래 분석"""
         fig, axes = plt.subplots(1, 2, figsize=(14, 6))
 
-        weekend = self.df[self.df['요일'].isin([5, 6])]  # 토, 일
-        weekday = self.df[~self.df['요일'].isin([5, 6])]
+        def compute():
+            weekend = self.df[self.df['요일'].isin([5, 6])]  # 토, 일
+            weekday = self.df[~self.df['요일'].isin([5, 6])]
+
+            # 요일별 건수
+            daily_count = self.df.groupby('요일명').size()
+            order = ['월', '화', '수', '목', '금', '토', '일']
+            return [weekday['순액'].sum(), weekend['순액'].sum()], daily_count.reindex(order)
+
+        amounts, daily_count = self.series('주말평일_거래분석', compute)
 
         # 금액 비교
-        amounts = [weekday['순액'].sum(), weekend['순액'].sum()]
         labels = ['평일', '주말']
         axes[0].pie(amounts, labels=labels, autopct='%1.1f%%',
                    colors=[COLORS['primary'], COLORS['warning']])
         axes[0].set_title('평일 vs 주말 금액 비율', fontsize=12, fontweight='bold')
 
         # 요일별 건수
-        daily_count = self.df.groupby('요일명').size()
-        order = ['월', '화', '수', '목', '금', '토', '일']
-        daily_count = daily_count.reindex(order)
-
         colors = [COLORS['primary']]*5 + [COLORS['warning']]*2
         axes[1].bar(daily_count.index, daily_count.values, color=colors)
         axes[1].set_xlabel('요일')
@@ -819,9 +902,9 @@ class ChartGenerator:
             else:
                 return '500만 이상'
 
-        self.df['금액구간'] = self.df['순액'].apply(get_range)
         range_order = ['10만 미만', '10~50만', '50~100만', '100~500만', '500만 이상']
-        range_count = self.df['금액구간'].value_counts().reindex(range_order)
+        range_count = self.series('금액구간별_분포',
+                                  lambda: self.df['순액'].apply(get_range).value_counts().reindex(range_order))
 
         colors = sns.color_palette('YlOrRd', len(range_count))
         bars = ax.bar(range_count.index, range_count.values, color=colors)
@@ -841,8 +924,8 @@ class ChartGenerator:
         """소스유형별 비교"""
         fig, axes = plt.subplots(1, 2, figsize=(14, 6))
 
-        source_amount = self.df.groupby('소스유형')['순액'].sum()
-        source_count = self.df.groupby('소스유형').size()
+        source_amount, source_count = self.series('소스유형별_비교', lambda: (
+            self.df.groupby('소스유형')['순액'].sum(), self.df.groupby('소스유형').size()))
 
         colors = [COLORS['primary'], COLORS['secondary'], COLORS['warning']]
 
@@ -860,13 +943,16 @@ class ChartGenerator:
         """계정과목 × 월 히트맵"""
         fig, ax = plt.subplots(figsize=(14, 10))
 
-        expense_df = self.df[self.df['손익분류'] == '판관비']
-        pivot = expense_df.pivot_table(index='계정과목', columns='월', values='순액',
-                                        aggfunc='sum', fill_value=0)
+        def compute():
+            expense_df = self.subset('손익분류', '판관비')
+            pivot = expense_df.pivot_table(index='계정과목', columns='월', values='순액',
+                                            aggfunc='sum', fill_value=0)
 
-        # 총액 기준 상위 15개
-        top_accounts = pivot.sum(axis=1).nlargest(15).index
-        pivot = pivot.loc[top_accounts]
+            # 총액 기준 상위 15개
+            top_accounts = pivot.sum(axis=1).nlargest(15).index
+            return pivot.loc[top_accounts]
+
+        pivot = self.series('계정과목_월별_히트맵', compute)
 
         sns.heatmap(pivot / 1e6, annot=True, fmt='.1f', cmap='YlOrRd', ax=ax,
                    cbar_kws={'label': '금액 (백만원)'})
@@ -883,10 +969,13 @@ class ChartGenerator:
         """누적 금액 추이"""
         fig, ax = plt.subplots(figsize=(14, 6))
 
-        for pl_type in ['매출', '매출원가', '판관비']:
-            pl_df = self.df[self.df['손익분류'] == pl_type]
-            monthly = pl_df.groupby('월')['순액'].sum().reindex(range(1, 13), fill_value=0)
-            cumsum = monthly.cumsum()
+        cumulative = self.series('누적금액_추이', lambda: {
+            pl_type: self.subset('손익분류', pl_type).groupby('월')['순액'].sum()
+            .reindex(range(1, 13), fill_value=0).cumsum()
+            for pl_type in ['매출', '매출원가', '판관비']
+        })
+
+        for pl_type, cumsum in cumulative.items():
             ax.plot(cumsum.index, cumsum.values, marker='o', label=pl_type, linewidth=2)
 
         ax.set_xlabel('월')
@@ -910,9 +999,7 @@ class ChartGenerator:
 
         # 1. 손익 요약 (KPI)
         ax1 = fig.add_subplot(gs[0, 0])
-        revenue = self.df[self.df['손익분류'] == '매출']['순액'].sum()
-        cost = self.df[self.df['손익분류'] == '매출원가']['순액'].sum()
-        expense = self.df[self.df['손익분류'] == '판관비']['순액'].sum()
+        revenue, cost, expense = self.pl_totals()
         profit = revenue - cost - expense
 
         ax1.text(0.5, 0.8, '매출', ha='center', fontsize=10, color='gray')
@@ -927,7 +1014,7 @@ class ChartGenerator:
 
         # 2. 월별 추이
         ax2 = fig.add_subplot(gs[0, 1:])
-        monthly = self.df.groupby(['월', '손익분류'])['순액'].sum().unstack(fill_value=0)
+        monthly = self.monthly_pl()
         if '매출' in monthly.columns:
             ax2.plot(monthly.index, monthly['매출'], marker='o', label='매출', linewidth=2)
         if '판관비' in monthly.columns:
@@ -939,21 +1026,20 @@ class ChartGenerator:
 
         # 3. 손익분류별 비율
         ax3 = fig.add_subplot(gs[1, 0])
-        pl_sum = self.df.groupby('손익분류')['순액'].sum().abs()
+        pl_sum = self.series('손익분류_비율', lambda: self.df.groupby('손익분류')['순액'].sum().abs())
         ax3.pie(pl_sum.values, labels=pl_sum.index, autopct='%1.0f%%', textprops={'fontsize': 8})
         ax3.set_title('손익분류 비율', fontsize=12, fontweight='bold')
 
         # 4. 증빙유형별 건수
         ax4 = fig.add_subplot(gs[1, 1])
-        ev_count = self.df['증빙유형명'].value_counts().head(5)
+        ev_count = self.series('증빙유형별_건수', lambda: self.df['증빙유형명'].value_counts()).head(5)
         ax4.barh(ev_count.index, ev_count.values, color=COLORS['info'])
         ax4.set_title('증빙유형 TOP 5', fontsize=12, fontweight='bold')
         ax4.invert_yaxis()
 
         # 5. 거래처 TOP 5
         ax5 = fig.add_subplot(gs[1, 2])
-        expense_df = self.df[self.df['손익분류'] == '판관비']
-        top_traders = expense_df.groupby('거래처명_filled')['순액'].sum().nlargest(5)
+        top_traders = self.top_traders('판관비', 5)
         ax5.barh([t[:12] for t in top_traders.index], top_traders.values, color=COLORS['warning'])
         ax5.set_title('판관비 거래처 TOP 5', fontsize=12, fontweight='bold')
         ax5.xaxis.set_major_formatter(plt.FuncFormatter(format_krw))
@@ -961,13 +1047,13 @@ class ChartGenerator:
 
         # 6. 데이터 요약
         ax6 = fig.add_subplot(gs[2, :])
-        summary_text = (
+        summary_text = self.series('데이터_요약', lambda: (
             f"총 거래 건수: {len(self.df):,}건  |  "
-            f"기간: 2024년 1월 ~ 12월  |  "
+            f"기간: {ledger_year(self.df)}년 {self.df['월'].min()}월 ~ {self.df['월'].max()}월  |  "
             f"거래처 수: {self.df['거래처명_filled'].nunique():,}개  |  "
             f"계정과목 수: {self.df['계정과목'].nunique():,}개  |  "
-            f"카드미반영: {len(self.df[self.df['증빙유형'] == 88.5]):,}건"
-        )
+            f"카드미반영: {self.slices.count({'증빙유형': 88.5}):,}건"
+        ))
         ax6.text(0.5, 0.5, summary_text, ha='center', va='center', fontsize=11,
                 bbox=dict(boxstyle='round', facecolor='lightgray', alpha=0.5))
         ax6.axis('off')
@@ -1050,8 +1136,25 @@ def main():
     # 2. 데이터 로드
     print("\n2. 데이터 로드...")
     json_path = Path('input_merged_datas/더제이의원/result_2024_v01_20260106_225407.json')
-    df = load_data(json_path)
-    print(f"   총 {len(df):,}건 로드 완료")
+
+    # 차트별 집계 결과는 결과 캐시에서 재사용 (입력 파일/거래처명 매핑이 같으면 파싱/파생 컬럼/집계 모두 생략)
+    cache_dir = Path('output/더제이의원/_results')
+    trader_index_file = Path('output/더제이의원/trader_names.pkl')
+
+    def series_key():
+        return result_key([json_path, trader_index_file],
+                          settings={'chart_series': CHART_SERIES_VERSION, 'trader_index': TRADER_INDEX_VERSION})
+
+    cached = load_results(cache_dir, series_key(), kind='chart_series')
+    df = None
+    if cached is None:
+        df = load_data(json_path)
+
+        # 거래처명 정규화 (분석 스크립트와 같은 회사별 대표명 매핑 사용)
+        df['거래처명_filled'] = canonical_trader_names(df, trader_index_file).fillna('(미지정)')
+        print(f"   총 {len(df):,}건 로드 완료")
+    else:
+        print("   캐시된 차트 집계 사용 (데이터 로드/집계 생략)")
 
     # 3. 출력 디렉토리 설정
     timestamp = datetime.now().strftime('%m-%d-%H-%M')
@@ -1059,9 +1162,13 @@ def main():
 
     # 4. 차트 생성
     print("\n3. 차트 생성...")
-    generator = ChartGenerator(df, output_dir)
+    generator = ChartGenerator(df, output_dir, cached)
     generator.generate_all_charts()
 
+    # 매핑 파일은 정규화 중에 새로 만들어질 수 있으므로 키는 집계 후에 다시 계산
+    if df is not None:
+        save_results(cache_dir, series_key(), generator.cached, kind='chart_series')
+
     print("\n" + "=" * 60)
     print("완료!")
     print("=" * 60)
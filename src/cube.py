@@ -0,0 +1,133 @@
+"""
+7D 기본 큐브 생성 (IMPLEMENTATION_GUIDE §3.1)
+- 월 단위로 파티션되는 집계 테이블 (순액 합계/건수)
+- 계정과목 × 월 통계 (Z-score 이상거래 탐지용)
+"""
+import numpy as np
+import pandas as pd
+
+# 큐브 차원: 기본피벗/거래처/증빙유형/월별추이 시트가 모두 이 차원의 부분집합
+CUBE_DIMS = ['정렬순서', '손익분류', '계정과목', '거래처명_filled', '증빙유형', '소스유형', '월']
+
+
+def build_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """행 단위 데이터를 큐브 셀(순액 합계, 건수)로 집계"""
+    cube = df.groupby(CUBE_DIMS)['순액'].agg(['sum', 'count']).reset_index()
+    return cube.rename(columns={'sum': '순액', 'count': '건수'})
+
+
+def build_account_stats(df: pd.DataFrame) -> pd.DataFrame:
+    """계정과목 × 월 단위 통계 (건수, 합계, 편차제곱합, 최소, 최대)
+
+    편차제곱합(M2)을 보관하므로 월 파티션을 합쳐도 연간 표준편차를 정확히 복원할 수 있다.
+    """
+    grouped = df.groupby(['계정과목', '월'])['순액']
+    stats = grouped.agg(['count', 'sum', 'min', 'max'])
+    deviation = df['순액'] - grouped.transform('mean')
+    stats['M2'] = (deviation ** 2).groupby([df['계정과목'], df['월']]).sum()
+    stats = stats.rename(columns={'count': '건수', 'sum': '합계', 'min': '최소', 'max': '최대'})
+    return stats.reset_index()
+
+
+def merge_account_stats(account_stats: pd.DataFrame) -> pd.DataFrame:
+    """월별 통계를 계정과목 단위로 병합 (평균, 표본 표준편차)
+
+    병렬 분산 공식: M2 = Σ M2_i + Σ n_i × (평균_i - 평균)²
+    """
+    totals = account_stats.groupby('계정과목')[['건수', '합계']].sum()
+    n = totals['건수']
+    mean = totals['합계'] / n
+
+    month_mean = account_stats['합계'] / account_stats['건수']
+    deviation = month_mean - account_stats['계정과목'].map(mean)
+    m2 = (account_stats['M2'] + account_stats['건수'] * deviation ** 2).groupby(account_stats['계정과목']).sum()
+
+    # pandas std(ddof=1)와 동일하게 1건뿐인 계정은 NaN
+    std = np.sqrt(m2 / (n - 1).where(n > 1))
+    return pd.DataFrame({'건수': n, 'mean': mean, 'std': std})
+
+
+def grouping_sets(cube: pd.DataFrame, sets: list, values='순액', columns: str = None) -> pd.DataFrame:
+    """SQL GROUPING SETS: 상세/소계/총계 행을 한 번의 큐브 집계로 생성
+
+    큐브는 가장 세밀한 집합 기준으로 한 번만 스캔하고,
+    나머지 집합은 그 결과(상세 집계)를 다시 접어서 만든다.
+
+    Args:
+        cube: build_cube() 결과
+        sets: 차원 리스트의 리스트 (첫 번째가 가장 세밀한 집합, 나머지는 그 부분집합)
+        values: 집계할 측정값 컬럼 ('순액', '건수' 또는 둘의 리스트)
+        columns: 가로로 펼칠 차원 (예: '소스유형')
+
+    Returns:
+        차원 + 측정값 + '집계수준' (접힌 차원 수: 0=상세, len(sets[0])=총계)
+        접힌 차원 값은 NaN
+    """
+    finest = list(sets[0])
+    keys = finest + ([columns] if columns else [])
+    detail = cube.groupby(keys)[values].sum()
+    if columns:
+        detail = detail.unstack(columns, fill_value=0)
+        detail.columns.name = None
+    elif isinstance(detail, pd.Series):
+        detail = detail.to_frame()
+
+    frames = []
+    for dims in sets:
+        dims = list(dims)
+        if dims == finest:
+            part = detail
+        elif dims:
+            part = detail.groupby(level=dims).sum()
+        else:
+            part = detail.sum().to_frame().T
+        part = part.reset_index(drop=not dims)
+        part['집계수준'] = len(finest) - len(dims)
+        frames.append(part)
+
+    return pd.concat(frames, ignore_index=True)[finest + list(detail.columns) + ['집계수준']]
+
+
+def top_n(frame: pd.DataFrame, by: list, item: str, n: int, value: str = '순액', other: str = None) -> pd.DataFrame:
+    """그룹별 상위 N 항목 (부분 선택, 그룹 전체 정렬 없음)
+
+    Args:
+        frame: 큐브 또는 행 단위 데이터 (by + item 기준으로 먼저 합계)
+        by: 그룹 차원 리스트 (빈 리스트면 전체에서 상위 N)
+        item: 순위를 매길 차원 (예: '거래처명_filled')
+        n: 그룹별로 남길 항목 수
+        value: 측정값 컬럼
+        other: 지정하면 상위 N 밖의 항목을 이 이름의 나머지 행 하나로 합침 (예: '기타')
+
+    Returns:
+        by + [item, value, '순위', '비중', '누적비중'] (비중/누적비중은 그룹 합계 대비 %)
+        나머지 행의 순위는 NaN, 그룹 안에서 맨 뒤
+    """
+    by = list(by)
+    keys = by or ['_전체']
+    if not by:
+        frame = frame.assign(_전체=0)
+
+    totals = frame.groupby(keys + [item])[value].sum()
+    grouped = totals.groupby(level=keys)
+    group_sum = grouped.sum()
+
+    # SeriesGroupBy.nlargest: 그룹마다 부분 선택 후 상위 N개만 정렬
+    top = totals.groupby(level=keys, group_keys=False).nlargest(n)
+    top_grouped = top.groupby(level=keys, sort=False)
+    result = top.reset_index()
+    result['순위'] = top_grouped.cumcount().to_numpy() + 1
+    result['누적비중'] = top_grouped.cumsum().to_numpy()
+
+    if other is not None:
+        rest = (group_sum - top.groupby(level=keys).sum()).to_frame(value)
+        rest = rest[(grouped.size() - top_grouped.size()) > 0].reset_index()
+        rest[item] = other
+        result = pd.concat([result, rest], ignore_index=True).sort_values(keys, kind='stable', ignore_index=True)
+
+    total = result.set_index(keys).index.map(group_sum).to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        result['비중'] = result[value].to_numpy() / total * 100
+        result['누적비중'] = np.where(result['순위'].isna(), 100.0, result['누적비중'].to_numpy() / total * 100)
+
+    return result[by + [item, value, '순위', '비중', '누적비중']]
@@ -0,0 +1,135 @@
+"""
+큐브 조회 API (IMPLEMENTATION_GUIDE §3 7D 큐브)
+- query(dimensions, filters, measures, columns): 큐브 차원의 임의 부분집합으로 집계
+- 조회 결과는 정규화된 조회 키(차원/필터 값 정렬)로 LRU 메모이제이션 (스레드 안전, 최대 QUERY_CACHE_SIZE개)
+- 선언형 시트: 조회 정의 + 합계/평균 컬럼 + 행 순서만으로 시트 생성 (build_sheet)
+"""
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+from cube import CUBE_DIMS
+
+# 측정값: 큐브 셀 값을 합산 (순액 = 금액 합계, 건수 = 행 수)
+MEASURES = ['순액', '건수']
+
+# 메모이제이션 최대 항목 수
+QUERY_CACHE_SIZE = 256
+
+
+def _as_list(values) -> list:
+    if values is None:
+        return []
+    if isinstance(values, (list, tuple, set)):
+        return list(values)
+    return [values]
+
+
+class CubeQuery:
+    """큐브 조회기
+
+    Args:
+        cube: build_cube() 결과 (CUBE_DIMS + 순액, 건수)
+        maxsize: 메모이제이션 최대 항목 수
+        dims: 조회 가능한 차원 (다년도 큐브는 CUBE_DIMS + ['년도'])
+    """
+
+    def __init__(self, cube: pd.DataFrame, maxsize: int = QUERY_CACHE_SIZE, dims: list = CUBE_DIMS):
+        self.cube = cube
+        self.maxsize = maxsize
+        self.dims = list(dims)
+        self.memo = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, dimensions: list, filters: dict, measures: list, columns: list) -> tuple:
+        """정규화된 조회 키 (필터는 차원명/값 순서와 무관)"""
+        for dim in dimensions + columns + list(filters):
+            if dim not in self.dims:
+                raise ValueError(f"큐브 차원이 아님: {dim} (사용 가능: {', '.join(self.dims)})")
+        for measure in measures:
+            if measure not in MEASURES:
+                raise ValueError(f"측정값이 아님: {measure} (사용 가능: {', '.join(MEASURES)})")
+        normalized_filters = tuple(sorted(
+            (dim, tuple(sorted(set(_as_list(values)), key=str))) for dim, values in filters.items()
+        ))
+        return tuple(dimensions), normalized_filters, tuple(measures), tuple(columns)
+
+    def query(self, dimensions: list, filters: dict = None, measures=('순액',), columns: list = None) -> pd.DataFrame:
+        """차원별 측정값 합계
+
+        Args:
+            dimensions: 행 차원 (빈 리스트면 전체 합계 1행)
+            filters: {차원: 값 또는 값 리스트} (리스트는 OR, 차원 간은 AND)
+            measures: 측정값 리스트 (순액, 건수)
+            columns: 열로 펼칠 차원 (예: ['월']) - 측정값이 하나면 열은 차원 값, 여러 개면 (측정값, 값)
+
+        Returns:
+            행 차원을 인덱스로 하는 DataFrame (호출자가 수정해도 되는 복사본)
+        """
+        dimensions, measures, columns = list(dimensions), _as_list(measures), _as_list(columns)
+        filters = filters or {}
+        key = self._key(dimensions, filters, measures, columns)
+
+        with self.lock:
+            if key in self.memo:
+                self.memo.move_to_end(key)
+                self.hits += 1
+                return self.memo[key].copy()
+            self.misses += 1
+
+        result = self._compute(dimensions, filters, measures, columns)
+
+        with self.lock:
+            self.memo[key] = result
+            while len(self.memo) > self.maxsize:
+                self.memo.popitem(last=False)
+        return result.copy()
+
+    def _compute(self, dimensions, filters, measures, columns) -> pd.DataFrame:
+        cube = self.cube
+        for dim, values in filters.items():
+            cube = cube[cube[dim].isin(_as_list(values))]
+
+        by = dimensions + columns
+        if not by:
+            return cube[measures].sum().to_frame().T
+
+        values = measures[0] if len(measures) == 1 and columns else measures
+        result = cube.groupby(by)[values].sum()
+        if columns:
+            result = result.unstack(columns, fill_value=0)
+        return result
+
+
+def build_sheet(cq: CubeQuery, spec: dict) -> pd.DataFrame:
+    """선언형 시트 생성
+
+    Args:
+        spec: {
+            'dimensions': 행 차원, 'columns': 열 차원, 'measure': 측정값(기본 순액), 'filters': 필터,
+            'totals': ['합계', '평균'] 중 추가할 컬럼 (값 컬럼 기준, 평균은 반올림),
+            'order': 행 순서 기준 차원 (예: '정렬순서' - 행마다 해당 차원의 최소값 순, 없으면 차원 값 순)
+        }
+    """
+    dimensions = spec['dimensions']
+    filters = spec.get('filters')
+    table = cq.query(dimensions, filters, [spec.get('measure', '순액')], spec.get('columns'))
+
+    value_cols = list(table.columns)
+    totals = spec.get('totals', [])
+    if '합계' in totals:
+        table['합계'] = table[value_cols].sum(axis=1)
+    if '평균' in totals:
+        table['평균'] = table[value_cols].mean(axis=1).round(0)
+
+    order = spec.get('order')
+    if order:
+        cube = cq.cube
+        for dim, values in (filters or {}).items():
+            cube = cube[cube[dim].isin(_as_list(values))]
+        rank = cube.groupby(dimensions)[order].min().sort_values(kind='stable')
+        table = table.reindex(rank.index)
+    return table
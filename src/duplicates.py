@@ -0,0 +1,104 @@
+"""
+중복 전표 탐지 (이상거래 중복의심)
+- 같은 거래가 두 번 입력된 경우: 분개장 + 다른 전표번호의 카드미반영(88.5), 카드 전표 이중 입력 등
+- 거래처명을 해시한 블록 키로 묶고, 블록 안에서 (금액, 일자) / (일자, 금액) 두 가지 정렬 순서로
+  앞뒤 NEIGHBORS행만 비교하는 정렬 이웃 탐색 (행 수 n에 대해 O(n log n + n·NEIGHBORS), 쌍 전체 비교 없음)
+- 일자 차 DATE_WINDOW_DAYS일 이내, 금액 차 AMOUNT_TOLERANCE(비율) 이내면 중복 의심
+- (거래처, 순액, 회계일자) 복합키 해시가 같으면 '정확', 허용 오차 안에서만 같으면 '근접'
+- 제외: 거래처 미지정, 순액 0, 같은 전표(데이터소스+전표번호)의 분개 라인끼리 (한 전표의 여러 라인은 이중 입력이 아님)
+- 카드미반영 등 분개장 외 행에 같은 (전표번호, 거래처, 순액)의 분개장 행이 있으면 '카드미반영-분개장' 쌍으로 바로 보고
+  (분개장에 반영된 카드 거래가 카드미반영에도 남은 이중 입력), 이웃 탐색에는 분개장 행만 남겨 같은 쌍을 다시 찾지 않음
+"""
+import numpy as np
+import pandas as pd
+
+# 일자 허용 범위 (일)
+DATE_WINDOW_DAYS = 3
+
+# 금액 허용 오차 (두 금액 중 큰 절대값 대비 비율, 0이면 같은 금액만)
+AMOUNT_TOLERANCE = 0.01
+
+# 정렬 후 비교할 이웃 행 수
+NEIGHBORS = 5
+
+# 중복 판정에서 제외하는 거래처명
+UNKNOWN_TRADER = '(미지정)'
+
+# 분개장과 같은 (전표번호, 거래처, 순액)인 다른 데이터소스 행의 구분
+CROSS_SOURCE_LABEL = '카드미반영-분개장'
+
+
+def _hash(frame: pd.DataFrame) -> np.ndarray:
+    """복합키 해시 (uint64)"""
+    return pd.util.hash_pandas_object(frame, index=False).to_numpy()
+
+
+def find_duplicates(df: pd.DataFrame, trader_col: str = '거래처명_filled', date_col: str = '회계일자_dt',
+                    date_window: int = DATE_WINDOW_DAYS, amount_tolerance: float = AMOUNT_TOLERANCE,
+                    neighbors: int = NEIGHBORS) -> pd.DataFrame:
+    """중복 의심 쌍
+
+    Returns:
+        DataFrame [원행, 중복행, 구분, 일자차, 금액차] - 원행/중복행은 df 인덱스 라벨
+        (구분 정확/근접: 중복행이 같거나 늦은 일자, 카드미반영-분개장: 원행이 분개장 행)
+    """
+    columns = ['원행', '중복행', '구분', '일자차', '금액차']
+    valid = (df[trader_col] != UNKNOWN_TRADER) & (df['순액'] != 0) & df[date_col].notna()
+    rows = df[valid]
+
+    # 분개장 행과 (전표번호, 거래처, 순액)이 같은 다른 데이터소스 행 → 분개장 첫 행과 쌍
+    link_keys = ['전표번호', trader_col, '순액']
+    journal = rows['데이터소스'] == '분개장'
+    anchors = rows[journal].reset_index(names='원행').drop_duplicates(link_keys)
+    twins = rows[~journal].reset_index(names='중복행').merge(anchors, on=link_keys, suffixes=('', '_분개장'))
+    cross = pd.DataFrame({
+        '원행': twins['원행'],
+        '중복행': twins['중복행'],
+        '구분': CROSS_SOURCE_LABEL,
+        '일자차': (twins[date_col] - twins[f'{date_col}_분개장']).dt.days.to_numpy(),
+        '금액차': 0.0,
+    }, columns=columns)
+    rows = rows.drop(index=twins['중복행'])
+    if len(rows) < 2:
+        return cross.reset_index(drop=True)
+
+    block = _hash(rows[[trader_col]])
+    exact = _hash(rows[[trader_col, '순액', '회계일자']])
+    amount = rows['순액'].to_numpy(dtype=float)
+    day = rows[date_col].to_numpy().astype('datetime64[D]').astype(np.int64)
+    # 같은 전표 식별 (전표번호가 없는 행은 서로 다른 전표로 봄)
+    slip = rows['전표번호'].astype(str).str.strip()
+    has_slip = (~slip.isin(['', 'nan', 'None'])).to_numpy()
+    voucher = _hash(rows[['데이터소스', '전표번호']].astype(str))
+
+    pairs = []
+    # 다중 패스: 금액 우선 정렬은 같은 금액의 가까운 일자를, 일자 우선 정렬은 비슷한 금액의 같은 날짜를 이웃으로 모음
+    for order in (np.lexsort((day, amount, block)), np.lexsort((amount, day, block))):
+        for k in range(1, neighbors + 1):
+            a, b = order[:-k], order[k:]
+            day_diff = np.abs(day[a] - day[b])
+            amount_diff = np.abs(amount[a] - amount[b])
+            match = (
+                (block[a] == block[b])
+                & (day_diff <= date_window)
+                & (amount_diff <= amount_tolerance * np.maximum(np.abs(amount[a]), np.abs(amount[b])))
+                & ~(has_slip[a] & has_slip[b] & (voucher[a] == voucher[b]))
+            )
+            a, b = a[match], b[match]
+            # 원행 = 일자가 빠른 행 (같으면 앞 위치)
+            swap = (day[b] < day[a]) | ((day[b] == day[a]) & (b < a))
+            pairs.append(np.column_stack([np.where(swap, b, a), np.where(swap, a, b)]))
+
+    pairs = np.unique(np.concatenate(pairs), axis=0)
+    first, second = pairs[:, 0], pairs[:, 1]
+
+    result = pd.DataFrame({
+        '원행': rows.index[first],
+        '중복행': rows.index[second],
+        '구분': np.where(exact[first] == exact[second], '정확', '근접'),
+        '일자차': day[second] - day[first],
+        '금액차': amount[second] - amount[first],
+    })
+    if len(cross):
+        result = pd.concat([result, cross], ignore_index=True)
+    return result.sort_values(['원행', '중복행'], kind='stable').reset_index(drop=True)
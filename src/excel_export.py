@@ -0,0 +1,167 @@
+"""
+Excel 출력 (시트 분할 / 보조 통합문서)
+- 시트 행 수가 Excel 한도(1,048,576행)를 넘으면 행 범위별 보조 통합문서(분석결과_{시각}_{시트}_{n}.xlsx)로 분할
+- SparseCellStore 시트는 그룹(계정과목 × 거래처) 경계에서만 분할
+- 기본 통합문서와 보조 통합문서는 서로 독립이므로 프로세스 풀(fork)로 동시에 작성
+  (openpyxl 셀 작성은 순수 파이썬이라 스레드로는 GIL 때문에 병렬이 되지 않음)
+- 분석결과_{시각}_index.json 에 시트별 파일/시트명/행 범위 기록
+"""
+import json
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from openpyxl.utils import get_column_letter
+
+from cell_store import SparseCellStore
+
+# Excel 시트 최대 행 수 (헤더 포함)
+EXCEL_MAX_ROWS = 1_048_576
+
+# 통합문서 동시 작성 방식: 분석 스크립트가 최상위 코드라 spawn/forkserver는 스크립트 전체를 다시 실행하므로 fork만 사용
+# (fork가 없는 플랫폼이나 통합문서가 하나뿐이면 순차 작성)
+FORK_AVAILABLE = 'fork' in multiprocessing.get_all_start_methods()
+
+# 금액 관련 컬럼명 (이 컬럼들에 #,##0 형식 적용)
+MONEY_KEYWORDS = ['금액', '순액', '합계', '평균', '총금액', '평균금액', '분개장', '카드미반영', '총합계',
+                  '증빙금액', '세금계산서', '카드', '현금영수증', '수기', '결산분개', '원천세',
+                  '영세율', '통장자동', '현금조정']
+
+
+def format_workbook(workbook):
+    """서식 적용: 열너비 자동 조정 + 금액 형식"""
+    for sheet_name in workbook.sheetnames:
+        ws = workbook[sheet_name]
+
+        # 열너비 자동 조정
+        for col_idx, column_cells in enumerate(ws.columns, 1):
+            max_length = 0
+            column_letter = get_column_letter(col_idx)
+
+            for cell in column_cells:
+                cell_value = str(cell.value) if cell.value is not None else ""
+                # 한글은 2바이트로 계산
+                adjusted_length = sum(2 if ord(c) > 127 else 1 for c in cell_value)
+                if adjusted_length > max_length:
+                    max_length = adjusted_length
+
+            # 최소 8, 최대 50
+            ws.column_dimensions[column_letter].width = min(max(max_length + 2, 8), 50)
+
+        # 금액 형식 적용 (#,##0): 첫 번째 행(헤더)으로 금액 컬럼 판정
+        header_row = list(ws.iter_rows(min_row=1, max_row=1, values_only=True))[0]
+
+        for col_idx, header in enumerate(header_row, 1):
+            if header is None or not any(kw in str(header) for kw in MONEY_KEYWORDS):
+                continue
+            column_letter = get_column_letter(col_idx)
+            for row_idx in range(2, ws.max_row + 1):
+                cell = ws[f"{column_letter}{row_idx}"]
+                if isinstance(cell.value, (int, float)):
+                    cell.number_format = '#,##0'
+
+
+def _header_rows(table, index: bool) -> int:
+    """시트 헤더 행 수 (MultiIndex 컬럼 + 인덱스 출력이면 인덱스명 행 추가)"""
+    if isinstance(table, SparseCellStore):
+        return 1
+    levels = table.columns.nlevels
+    return levels + (1 if index and levels > 1 else 0)
+
+
+def _split_ranges(table, index: bool, compact: bool, max_rows: int) -> list:
+    """시트별 (시작, 끝, 행수) 범위 목록 (DataFrame은 행, SparseCellStore는 그룹 범위)"""
+    limit = max_rows - _header_rows(table, index)
+
+    if isinstance(table, SparseCellStore):
+        rows = table.group_rows(compact)
+        ends = np.cumsum(rows)
+        ranges, first = [], 0
+        while first < len(rows):
+            base = ends[first - 1] if first else 0
+            # 한 그룹이 한도보다 클 수는 없으므로 최소 1그룹씩 진행
+            last = max(int(np.searchsorted(ends, base + limit, side='right')), first + 1)
+            ranges.append((first, last, int(ends[last - 1] - base)))
+            first = last
+        return ranges or [(0, 0, 0)]
+
+    n = len(table)
+    return [(start, min(start + limit, n), min(start + limit, n) - start)
+            for start in range(0, n, limit)] or [(0, 0, 0)]
+
+
+def _write_table(writer, sheet_name: str, table, index: bool, compact: bool, first: int, last: int):
+    if isinstance(table, SparseCellStore):
+        table.to_excel(writer, sheet_name=sheet_name, compact=compact, first=first, last=last)
+    else:
+        table.iloc[first:last].to_excel(writer, sheet_name=sheet_name, index=index)
+
+
+def _slice_part(part: tuple) -> tuple:
+    """DataFrame 조각은 행 범위만 잘라 (시작 0, 끝 행수)로 (SparseCellStore는 그대로)"""
+    sheet_name, table, index, compact, first, last = part
+    if isinstance(table, SparseCellStore):
+        return part
+    return sheet_name, table.iloc[first:last], index, compact, 0, last - first
+
+
+def _write_workbook(path: Path, parts: list) -> Path:
+    """parts: [(시트명, 테이블, index, compact, 시작, 끝)]"""
+    with pd.ExcelWriter(path, engine='openpyxl') as writer:
+        for sheet_name, table, index, compact, first, last in parts:
+            _write_table(writer, sheet_name, table, index, compact, first, last)
+        format_workbook(writer.book)
+    return path
+
+
+def export_workbooks(excel_path: Path, sheets: list, max_rows: int = EXCEL_MAX_ROWS, max_workers: int = None) -> dict:
+    """시트 목록을 Excel로 출력 (한도 초과 시트는 보조 통합문서로 분할)
+
+    Args:
+        excel_path: 기본 통합문서 경로
+        sheets: [(시트명, DataFrame 또는 SparseCellStore, index 출력 여부, compact)] (출력 순서)
+        max_rows: 시트당 최대 행 수 (헤더 포함)
+
+    Returns:
+        시트 인덱스 {'기본파일', '최대행수', '시트': [{시트, 파일, 시트명, 조각, 시작행, 끝행, 행수}]}
+        (행 번호는 헤더 제외 1부터, 같은 시트의 조각은 이어지는 범위)
+    """
+    main_parts, companions, entries = [], [], []
+
+    for sheet_name, table, index, compact in sheets:
+        ranges = _split_ranges(table, index, compact, max_rows)
+        offset = 0
+        for part, (first, last, rows) in enumerate(ranges, 1):
+            if len(ranges) == 1:
+                path = excel_path
+                main_parts.append((sheet_name, table, index, compact, first, last))
+            else:
+                path = excel_path.with_name(f"{excel_path.stem}_{sheet_name}_{part}.xlsx")
+                companions.append((path, [(sheet_name, table, index, compact, first, last)]))
+            entries.append({
+                '시트': sheet_name, '파일': path.name, '시트명': sheet_name, '조각': part,
+                '시작행': offset + 1, '끝행': offset + rows, '행수': rows,
+            })
+            offset += rows
+
+    # 통합문서끼리는 공유 상태가 없으므로 별도 프로세스에서 동시에 작성
+    # (DataFrame은 담당 행 범위만 잘라 넘겨 피클 크기를 줄임)
+    jobs = [(path, [_slice_part(part) for part in parts]) for path, parts in companions]
+    if main_parts:
+        jobs.append((excel_path, main_parts))
+    if len(jobs) > 1 and FORK_AVAILABLE:
+        context = multiprocessing.get_context('fork')
+        with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as pool:
+            for future in [pool.submit(_write_workbook, path, parts) for path, parts in jobs]:
+                future.result()
+    else:
+        for path, parts in jobs:
+            _write_workbook(path, parts)
+
+    sheet_index = {'기본파일': excel_path.name, '최대행수': max_rows, '시트': entries}
+    index_path = excel_path.with_name(f"{excel_path.stem}_index.json")
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(sheet_index, f, ensure_ascii=False, indent=2)
+    return sheet_index
@@ -0,0 +1,84 @@
+"""
+증분 집계 상태 관리
+- 월별 지문(fingerprint)으로 신규/변경 월 식별 (월 + 데이터키 기준)
+- 변경된 월만 다시 집계하여 이전 실행의 월 파티션과 병합
+- 상태는 output/{회사명}/ 아래 pickle로 보관
+- 증분 대상은 큐브/계정 통계 집계(groupby)뿐: 입력 로드, 파생 컬럼, 행 단위 시트(증빙유형별, 카드, 요일별,
+  금액구간별, 이상거래 행 스캔 등)는 매 실행 전체 행으로 다시 계산 (큐브 기반 시트는 병합된 큐브에서 조회)
+"""
+from pathlib import Path
+
+import pandas as pd
+
+from cube import CUBE_DIMS, build_cube, build_account_stats
+
+# 집계 로직이 바뀌면 올려서 기존 상태를 무효화
+STATE_VERSION = 1
+
+# 월 단위로 파티션되는 상태 테이블
+PARTITION_TABLES = {
+    'cube': build_cube,
+    'account_stats': build_account_stats,
+}
+
+# 지문 계산 대상 컬럼 (이 값이 바뀌지 않으면 해당 월의 집계도 바뀌지 않음)
+FINGERPRINT_COLS = ['데이터키', '입력순서', '순액'] + [c for c in CUBE_DIMS if c != '월']
+
+
+def month_fingerprints(df: pd.DataFrame) -> dict:
+    """월별 지문: 행 해시의 합(순서 무관) + 건수"""
+    cols = [c for c in FINGERPRINT_COLS if c in df.columns]
+    row_hash = pd.util.hash_pandas_object(df[cols].astype(str), index=False)
+    grouped = row_hash.groupby(df['월'])
+    sums = grouped.sum()
+    counts = grouped.size()
+    return {month: f"{counts[month]}:{int(sums[month]):016x}" for month in sums.index}
+
+
+def load_state(path: Path):
+    """이전 실행 상태 로드 (없거나 버전이 다르면 None)"""
+    if not path.exists():
+        return None
+    state = pd.read_pickle(path)
+    if state.get('version') != STATE_VERSION:
+        return None
+    return state
+
+
+def save_state(state: dict, path: Path):
+    """상태 저장"""
+    pd.to_pickle(state, path)
+
+
+def update_state(state, df: pd.DataFrame):
+    """신규/변경 월만 다시 집계하여 상태에 반영
+
+    Returns:
+        (갱신된 상태, 다시 집계한 월 목록, 제거된 월 목록)
+    """
+    fingerprints = month_fingerprints(df)
+
+    if state is None:
+        previous = {}
+        state = {'version': STATE_VERSION}
+    else:
+        previous = state['fingerprints']
+
+    changed = sorted(m for m, fp in fingerprints.items() if previous.get(m) != fp)
+    removed = sorted(m for m in previous if m not in fingerprints)
+    stale = set(changed) | set(removed)
+
+    if not stale and all(name in state for name in PARTITION_TABLES):
+        return state, changed, removed
+
+    df_changed = df[df['월'].isin(changed)]
+    for name, build in PARTITION_TABLES.items():
+        parts = [build(df_changed)] if changed else []
+        if name in state:
+            parts.insert(0, state[name][~state[name]['월'].isin(stale)])
+        merged = pd.concat(parts, ignore_index=True)
+        key_cols = [c for c in merged.columns if c in CUBE_DIMS]
+        state[name] = merged.sort_values(key_cols, ignore_index=True)
+
+    state['fingerprints'] = fingerprints
+    return state, changed, removed
@@ -0,0 +1,60 @@
+"""
+섹션 단위 JSON Lines 출력 (임의 접근용)
+- 분석결과 JSON의 섹션(기본피벗, 이상거래 등)을 한 파일에 섹션 순서대로 1행 1레코드로 기록
+- 분석결과_{시각}_sections.json 인덱스에 섹션별 행 수와 바이트 오프셋(시작/끝, 페이지 시작) 기록
+- 포털은 인덱스만 읽고 seek 해서 섹션 하나 또는 한 페이지만 파싱
+"""
+import json
+from pathlib import Path
+
+# 페이지 크기 (행), 페이지마다 시작 오프셋을 인덱스에 기록
+PAGE_SIZE = 500
+
+
+def write_sections(jsonl_path: Path, sections: dict, page_size: int = PAGE_SIZE) -> dict:
+    """섹션별 레코드를 JSON Lines로 쓰고 오프셋 인덱스 생성
+
+    Args:
+        jsonl_path: 출력 경로 (.jsonl)
+        sections: {섹션명: 레코드 리스트 또는 dict} (dict는 1행으로 기록, 예: meta)
+
+    Returns:
+        인덱스 {'파일', '페이지크기', '섹션': {섹션명: {행수, 시작, 끝, 페이지}}}
+        (시작/끝은 바이트 오프셋, 끝은 미포함, 페이지는 페이지별 시작 오프셋)
+    """
+    index = {'파일': jsonl_path.name, '페이지크기': page_size, '섹션': {}}
+    offset = 0
+
+    with open(jsonl_path, 'wb') as f:
+        for name, records in sections.items():
+            rows = records if isinstance(records, list) else [records]
+            start, pages = offset, []
+            for i, record in enumerate(rows):
+                if i % page_size == 0:
+                    pages.append(offset)
+                line = (json.dumps(record, ensure_ascii=False, allow_nan=False) + '\n').encode('utf-8')
+                f.write(line)
+                offset += len(line)
+            index['섹션'][name] = {'행수': len(rows), '시작': start, '끝': offset, '페이지': pages}
+
+    index_path = jsonl_path.with_name(f"{jsonl_path.stem}_sections.json")
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    return index
+
+
+def read_section(jsonl_path: Path, index: dict, name: str, page: int = None) -> list:
+    """섹션 전체 또는 한 페이지(0부터)만 읽기 (다른 섹션은 파싱하지 않음)"""
+    entry = index['섹션'][name]
+    start, end = entry['시작'], entry['끝']
+    if page is not None:
+        pages = entry['페이지']
+        if page >= len(pages):
+            return []
+        start = pages[page]
+        end = pages[page + 1] if page + 1 < len(pages) else entry['끝']
+
+    with open(jsonl_path, 'rb') as f:
+        f.seek(start)
+        chunk = f.read(end - start)
+    return [json.loads(line) for line in chunk.decode('utf-8').splitlines()]
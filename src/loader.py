@@ -0,0 +1,279 @@
+"""
+데이터 로더
+- 병합 결과(result_*.json / .xlsx) 로드
+- Smart-A 원본 필드명 export를 column_name_dict.json 기준으로 바로 읽기
+  (파싱 단계에서 필요한 컬럼만 선택/이름 변경하여 중간 병합 JSON 생략)
+- 금액 컬럼은 로드 시점에 정수(원 단위)로 변환 ("" → 결측)
+- 기본 키 인덱스: 데이터키 + 입력순서 해시 한 번으로 키 조회/중복 탐지, 같은 키·같은 내용의 행(이중 병합)은 제거 가능
+"""
+import json
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from calendar_dim import HOLIDAY_FLAG_COLS, LAG_SOURCES
+
+BASE_DIR = Path(__file__).parent.parent
+COLUMN_DICT_FILE = BASE_DIR / "new_docs" / "guide" / "column_name_dict.json"
+
+# 분석에 사용하는 컬럼 (IMPLEMENTATION_GUIDE 핵심/조건부 필수 컬럼 + 분석 스크립트 사용 컬럼)
+ANALYSIS_COLUMNS = [
+    # 기본 큐브
+    '데이터소스', '손익/재무구분', '손익분류', '정렬순서', '계정과목', '계정코드',
+    '증빙유형', '전표유형구분', '거래처명', '거래처코드', '월', '년도', '순액',
+    # 행 식별/정렬
+    '데이터키', '입력순서', '전표번호', '회계일자', '입력일시',
+    '차변금액', '대변금액',
+    # 증빙/카드 관련
+    '유형코드', '매입매출구분', '사업자등록번호', '품명', '전송일자', '국세청승인번호',
+    '전표상태', '공제구분', '관련거래처', '공급가액', '부가세', '총금액',
+    '카드미반영_예측', 'AI추천_차변후보수', '불공제사유코드', '업태', '업종',
+]
+# 달력/입력지연 (calendar_dim이 읽는 휴일 플래그와 지연 기준 일시 컬럼)
+ANALYSIS_COLUMNS += [
+    col for col in HOLIDAY_FLAG_COLS + [col for col, _ in LAG_SOURCES.values()]
+    if col not in ANALYSIS_COLUMNS
+]
+
+# 금액 컬럼 (원 단위 정수로 변환)
+MONEY_COLUMNS = [
+    '순액', '차변금액', '대변금액',
+    '공급가액', '부가세', '총금액', '합계금액',
+    '카드매출금액', '카드부가세', 'SP_mn_serve', 'CARD_mn_service',
+]
+
+
+@lru_cache(maxsize=None)
+def compile_projection(columns: tuple = tuple(ANALYSIS_COLUMNS), dict_file: Path = COLUMN_DICT_FILE) -> tuple:
+    """column_name_dict.json → 컬럼 투영 계획
+
+    Returns:
+        ((한글 컬럼명, (후보 필드명, ...)), ...)
+        후보는 이미 변환된 한글명 → 분개장 → 매입매출전표(SP_) → 신용카드(CARD_) 순
+    """
+    with open(dict_file, 'r', encoding='utf-8') as f:
+        sections = json.load(f)
+
+    candidates = {col: [col] for col in columns}
+    for section, mapping in sections.items():
+        if section.startswith('_'):
+            continue
+        for raw_name, korean_name in mapping.items():
+            if korean_name in candidates and raw_name not in candidates[korean_name]:
+                candidates[korean_name].append(raw_name)
+
+    return tuple((col, tuple(raws)) for col, raws in candidates.items())
+
+
+def _project_record(plan: tuple, record: dict) -> dict:
+    """레코드 하나를 투영 (후보 중 값이 있는 첫 필드, 모두 비어 있으면 첫 후보 값)"""
+    row = {}
+    for col, raws in plan:
+        value = None
+        for raw in raws:
+            candidate = record.get(raw)
+            if candidate is not None and candidate != '':
+                value = candidate
+                break
+            if value is None:
+                value = candidate
+        row[col] = value
+    return row
+
+
+def load_raw_export(path: Path, columns: list = None) -> pd.DataFrame:
+    """원본 필드명 export 로드 (파싱 중 필요한 컬럼만 선택/이름 변경)
+
+    JSON은 레코드 단위 object_hook에서 바로 투영하므로 불필요한 필드는 메모리에 남지 않는다.
+    """
+    plan = compile_projection(tuple(columns or ANALYSIS_COLUMNS))
+    target_cols = [col for col, _ in plan]
+
+    if path.suffix == '.xlsx':
+        wanted = {raw for _, raws in plan for raw in raws}
+        raw_df = pd.read_excel(path, usecols=lambda c: c in wanted)
+        df = pd.DataFrame(index=raw_df.index)
+        for col, raws in plan:
+            present = [raw_df[r].mask(raw_df[r] == '') for r in raws if r in raw_df.columns]
+            if not present:
+                df[col] = None
+                continue
+            merged = present[0]
+            for other in present[1:]:
+                merged = merged.combine_first(other)
+            df[col] = merged
+        return df
+
+    def hook(obj):
+        # 최상위 {"tot": N, "data": [...]} 는 그대로 통과
+        if 'data' in obj and isinstance(obj['data'], list):
+            return obj
+        return _project_record(plan, obj)
+
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f, object_hook=hook)
+
+    records = raw['data'] if isinstance(raw, dict) else raw
+    return pd.DataFrame(records, columns=target_cols)
+
+
+def is_raw_export(path: Path) -> bool:
+    """원본 필드명(da_date 등) export인지 확인 (JSON은 파일 앞부분만 확인)"""
+    if path.suffix == '.xlsx':
+        header = pd.read_excel(path, nrows=0).columns
+        return 'da_date' in header and '회계일자' not in header
+    with open(path, 'r', encoding='utf-8') as f:
+        head = f.read(65536)
+    return '"da_date"' in head and '"회계일자"' not in head
+
+
+def coerce_money(df: pd.DataFrame) -> pd.DataFrame:
+    """금액 컬럼을 정수 dtype으로 변환
+
+    - "" / None → 결측
+    - 결측이 없으면 int64, 있으면 nullable Int64
+    - 소수점이 있는 값이 섞인 컬럼은 반올림하지 않고 float64로 둔다
+    """
+    for col in MONEY_COLUMNS:
+        if col not in df.columns:
+            continue
+        values = df[col]
+        if values.dtype == object or pd.api.types.is_string_dtype(values):
+            values = values.mask(values.eq(''))
+        values = pd.to_numeric(values, errors='coerce')
+
+        valid = values.dropna()
+        if not (valid == valid.round()).all():
+            df[col] = values
+        elif values.isna().any():
+            df[col] = values.astype('Int64')
+        else:
+            df[col] = values.astype('int64')
+    return df
+
+
+def load_ledger(path: Path, project: bool = False) -> pd.DataFrame:
+    """장부 데이터 로드
+
+    Args:
+        path: result_*.json / .xlsx (병합 결과) 또는 원본 필드명 export
+        project: True면 분석 컬럼만 파싱 (원본 필드명도 한글명으로 변환)
+    """
+    if project or is_raw_export(path):
+        return coerce_money(load_raw_export(path))
+
+    if path.suffix == '.xlsx':
+        return coerce_money(pd.read_excel(path))
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    return coerce_money(pd.DataFrame(raw['data']))
+
+
+def ledger_year(df: pd.DataFrame) -> str:
+    """장부 회계연도 (년도 컬럼의 최빈값, 년도가 비어 있으면 회계일자 앞 4자리의 최빈값, 둘 다 없으면 '')"""
+    for col, values in [('년도', lambda s: s), ('회계일자', lambda s: s.astype(str).str[:4])]:
+        if col not in df.columns:
+            continue
+        years = pd.to_numeric(values(df[col].dropna()), errors='coerce').dropna()
+        years = years[(years >= 1900) & (years <= 2999)]
+        if len(years):
+            return str(int(years.mode().iloc[0]))
+    return ''
+
+
+def row_keys(df: pd.DataFrame) -> pd.DataFrame:
+    """행 기본 키 [키, 보조키]
+
+    데이터키 + 입력순서, 데이터키가 없는 행(카드미반영)은 데이터소스 + 전표번호
+    """
+    data_key = df['데이터키'].fillna('').astype(str).str.strip()
+    has_key = data_key.ne('')
+    return pd.DataFrame({
+        '키': data_key.where(has_key, df['데이터소스'].astype(str)),
+        '보조키': df['입력순서'].astype(str).where(has_key, df['전표번호'].astype(str)),
+    }, index=df.index)
+
+
+class KeyIndex:
+    """기본 키 인덱스 (키 해시 → 행 위치)
+
+    Attributes:
+        hashes: 행별 키 해시 (uint64)
+        occurrence: 같은 키 안에서의 등장 순번 (0부터, 키 충돌/완전 중복 행은 1 이상)
+        duplicates: 완전 중복 행(키와 모든 값이 앞 행과 같음)의 원래 위치
+        collapsed: 완전 중복 행을 제거했는지 (True면 hashes/occurrence/conflicts는 남은 행 기준)
+        conflicts: 키는 같고 내용이 다른 행의 위치 (유지)
+    """
+
+    def __init__(self, hashes: np.ndarray, duplicates: np.ndarray = None, collapsed: bool = False,
+                 n_loaded: int = None):
+        self.hashes = hashes
+        self.occurrence = pd.Series(hashes).groupby(hashes).cumcount().to_numpy()
+        self.duplicates = duplicates if duplicates is not None else np.array([], dtype=int)
+        self.collapsed = collapsed
+        repeated = self.occurrence > 0
+        if not collapsed:
+            repeated[self.duplicates] = False
+        self.conflicts = np.flatnonzero(repeated)
+        self.n_loaded = n_loaded if n_loaded is not None else len(hashes)
+        first = np.flatnonzero(self.occurrence == 0)
+        self._lookup = pd.Index(hashes[first])
+        self._positions = first
+
+    def locate(self, keys: pd.DataFrame) -> np.ndarray:
+        """[키, 보조키] 행들의 위치 (없으면 -1, 키 충돌이면 첫 행)"""
+        found = self._lookup.get_indexer(pd.util.hash_pandas_object(keys[['키', '보조키']], index=False).to_numpy())
+        return np.where(found >= 0, self._positions[found], -1)
+
+    def lookup(self, df: pd.DataFrame, data_key: str, entry_order: str) -> pd.Series:
+        """데이터키 + 입력순서로 행 조회 (없으면 None)"""
+        position = self.locate(pd.DataFrame({'키': [str(data_key)], '보조키': [str(entry_order)]}))[0]
+        return df.iloc[position] if position >= 0 else None
+
+    def report(self, sample_rows: int = 5) -> pd.DataFrame:
+        """데이터품질 시트 형식의 기본 키 검사 결과"""
+        rows = []
+        for column, positions, note in [('완전중복', self.duplicates,
+                                         f"같은 키·같은 내용 ({'제거' if self.collapsed else '유지'})"),
+                                        ('키충돌', self.conflicts, '같은 키·다른 내용 (유지)')]:
+            rows.append({
+                '규칙': '기본키', '조건': '데이터키+입력순서', '컬럼': column,
+                '대상건수': self.n_loaded, '위반건수': len(positions),
+                '위반율': round(len(positions) / self.n_loaded * 100, 1) if self.n_loaded else 0.0,
+                '비고': note if len(positions) else '',
+                '예시행': ', '.join(str(p) for p in positions[:sample_rows]),
+                '예시전표': '',
+            })
+        return pd.DataFrame(rows)
+
+
+def index_ledger(df: pd.DataFrame, collapse: bool = True):
+    """기본 키 인덱스 생성 (키 해시 한 번), collapse면 완전 중복 행 제거
+
+    완전 중복 = 키와 모든 컬럼 값이 같은 행 (이중 병합) - collapse 여부와 관계없이 판정하고,
+    collapse면 두 번째부터 제거하고 첫 행만 유지 (아니면 유지하고 기록만).
+    키만 같고 내용이 다른 행은 제거하지 않고 키 충돌로 기록.
+
+    Returns:
+        (DataFrame, KeyIndex) - 제거한 경우 인덱스는 0부터 다시 매김
+    """
+    hashes = pd.util.hash_pandas_object(row_keys(df), index=False).to_numpy()
+    repeated = pd.Index(hashes).duplicated()
+    if not repeated.any():
+        return df, KeyIndex(hashes, collapsed=collapse)
+
+    # 키가 반복된 행만 내용 해시로 완전 중복 판정
+    candidates = np.flatnonzero(pd.Index(hashes).duplicated(keep=False))
+    subset = df.iloc[candidates]
+    content = pd.util.hash_pandas_object(subset, index=False).to_numpy()
+    exact = pd.DataFrame({'키': hashes[candidates], '내용': content}).duplicated().to_numpy()
+    duplicates = candidates[exact]
+    if not collapse or not len(duplicates):
+        return df, KeyIndex(hashes, duplicates=duplicates, collapsed=collapse)
+
+    keep = np.ones(len(df), dtype=bool)
+    keep[duplicates] = False
+    return (df[keep].reset_index(drop=True),
+            KeyIndex(hashes[keep], duplicates=duplicates, collapsed=True, n_loaded=len(df)))
@@ -0,0 +1,269 @@
+"""
+다년도 비교 (년도를 차원으로 쌓은 다년도 큐브)
+- 연도별 병합 결과(result_{년도}_*.json)를 오래된 연도부터 한 파일씩 단년도 분석과 같은 입력 처리
+  (완전 중복 행 제거, 거래처명 정규화)로 읽고 큐브/기준선에 필요한 컬럼만 남김
+- 연도 큐브 셀과 계정과목 × 월 통계 파티션으로 집계한 뒤 행은 버림 - 메모리에는 한 해의 행과 집계 결과만 유지
+- 같은 패스에서 그 해의 행을 이전 연도들의 계정 통계(병합 분산 기준선)와 비교해 행 단위 금액이상 탐지
+- 연도별/전년대비/전년동월대비 시트와 월 합계 기준선 이상거래는 쌓인 큐브 조회로만 생성 (행 재집계 없음)
+
+실행:
+    python src/multi_year.py 더제이의원                        # input_merged_datas/더제이의원 의 연도별 최신 버전
+    python src/multi_year.py 2024.json 2025.json
+출력: output/{회사명}/다년도비교_{첫 년도}-{마지막 년도}.xlsx / .json
+"""
+import argparse
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cube import CUBE_DIMS, build_account_stats, build_cube, merge_account_stats
+from cube_query import CubeQuery, build_sheet
+from excel_export import export_workbooks
+from loader import index_ledger, ledger_year, load_ledger
+from result_export import df_to_dict
+from trader_names import canonical_trader_names
+from version_diff import file_year, list_versions
+
+BASE_DIR = Path(__file__).parent.parent
+INPUT_ROOT = BASE_DIR / "input_merged_datas"
+OUTPUT_ROOT = BASE_DIR / "output"
+
+# 다년도 큐브 차원
+YEAR_DIMS = CUBE_DIMS + ['년도']
+
+# 연도별로 남기는 컬럼 (큐브 차원 원천 + 행 단위 이상거래 표시)
+YEAR_COLUMNS = [
+    '데이터소스', '정렬순서', '손익분류', '계정과목', '거래처명', '증빙유형', '전표번호',
+    '회계일자', '월', '년도', '순액',
+]
+
+# 다년도 시트: {시트명: 큐브 조회 정의} (cube_query.build_sheet, 열은 년도)
+# - yoy: 연도 열 뒤에 직전 연도 대비 증감/증감률(%) 컬럼 추가
+YEAR_SHEETS = {
+    '연도별요약': dict(dimensions=['손익분류'], columns=['년도'], order='정렬순서', yoy=True),
+    '전년대비': dict(dimensions=['정렬순서', '손익분류', '계정과목'], columns=['년도'], yoy=True),
+    '전년동월대비': dict(dimensions=['손익분류', '월'], columns=['년도'], order='정렬순서', yoy=True),
+    '계정전년동월대비': dict(dimensions=['정렬순서', '손익분류', '계정과목', '월'], columns=['년도'], yoy=True),
+}
+
+# 기준선 이상거래 임계값 (이상거래 시트와 같은 기준: 3σ, 200% 급증, 50% 급감)
+Z_THRESHOLD = 3
+SURGE_RATE = 2
+DROP_RATE = -0.5
+
+ANOMALY_COLS = ['유형', '계정과목', '거래처명', '회계일자', '금액', '평균', 'Z-score', '비고']
+
+
+def latest_by_year(company: str, input_root: Path = INPUT_ROOT) -> list:
+    """회사 폴더의 연도별 최신 병합 결과 (연도 순)"""
+    return [paths[-1] for paths in list_versions(company, input_root).values()]
+
+
+def source_types(rows: pd.DataFrame) -> np.ndarray:
+    """소스유형 (카드미반영 / 전표번호 50000 이상은 분개장(vat) / 나머지 분개장(일반))"""
+    slip = pd.to_numeric(rows['전표번호'], errors='coerce').fillna(0).to_numpy()
+    return np.select(
+        [rows['데이터소스'].eq('카드미반영').to_numpy(), slip >= 50000],
+        ['카드미반영', '분개장(vat)'], default='분개장(일반)'
+    )
+
+
+def load_year(path: Path, trader_index_file: Path) -> pd.DataFrame:
+    """연도 원장 로드 + 큐브 차원 파생 컬럼
+
+    단년도 분석(analyze_thej.py)과 같은 입력 처리: 완전 중복 행 제거 후 거래처명을 정규화 인덱스의 대표명으로
+    (trader_index_file은 단년도 분석과 같은 output/{회사명}/trader_names.pkl), 이후 YEAR_COLUMNS만 남김
+    """
+    rows, key_index = index_ledger(load_ledger(path), collapse=True)
+    if len(key_index.duplicates):
+        print(f"   {path.name}: 완전 중복 {len(key_index.duplicates)}건 제거")
+    names = canonical_trader_names(rows, trader_index_file)
+    rows = rows.reindex(columns=YEAR_COLUMNS)
+    rows['소스유형'] = source_types(rows)
+    rows['거래처명_filled'] = names.fillna('(미지정)').replace('', '(미지정)')
+    return rows
+
+
+def row_anomalies(rows: pd.DataFrame, baseline: pd.DataFrame, base_years: list) -> pd.DataFrame:
+    """이전 연도 계정 통계 기준 행 단위 금액이상 (계정별 평균 대비 Z_THRESHOLD σ 이탈)"""
+    stats = merge_account_stats(baseline)
+    stats = stats[stats['std'] > 0]
+    mean = rows['계정과목'].map(stats['mean'])
+    z = (rows['순액'] - mean) / rows['계정과목'].map(stats['std'])
+    hit = z.abs() > Z_THRESHOLD
+    outliers = rows[hit].assign(평균=mean[hit].round(0), z=z[hit]).sort_values('계정과목', kind='stable')
+    return pd.DataFrame({
+        '유형': '금액이상(전년기준)',
+        '계정과목': outliers['계정과목'],
+        '거래처명': outliers['거래처명'],
+        '회계일자': outliers['회계일자'],
+        '금액': outliers['순액'],
+        '평균': outliers['평균'],
+        'Z-score': outliers['z'].round(2),
+        '비고': [f"{'·'.join(base_years)}년 평균 대비 {abs(v):.1f}σ 이탈" for v in outliers['z']],
+    }, columns=ANOMALY_COLS).reset_index(drop=True)
+
+
+def stack_years(paths: list, trader_index_file: Path) -> dict:
+    """연도별 원장을 한 번씩 읽어 다년도 큐브/계정 통계로 집계 (오래된 연도부터)
+
+    Returns:
+        {'years': 연도 목록, 'cube': YEAR_DIMS + 순액/건수, 'account_stats': 계정과목 × 월 × 년도 통계,
+         'row_anomalies': 행 단위 기준선 이상거래, 'summary': 연도별 현황}
+    """
+    years, cubes, stats, anomalies, summary = [], [], [], [], []
+    for path in sorted(paths, key=file_year):
+        rows = load_year(path, trader_index_file)
+        year = ledger_year(rows) or file_year(path)
+        if not year:
+            raise ValueError(f"연도를 알 수 없음: {path}")
+        if years and year <= years[-1]:
+            raise ValueError(f"연도 중복 또는 역순: {path.name} ({year}년, 앞 파일 {years[-1]}년)")
+
+        # 이전 연도 통계(기준선)와 비교한 뒤 이번 연도 파티션 추가
+        if stats:
+            anomalies.append(row_anomalies(rows, pd.concat(stats, ignore_index=True), years))
+        cubes.append(build_cube(rows).assign(년도=year))
+        stats.append(build_account_stats(rows).assign(년도=year))
+        summary.append({
+            '년도': year, '파일': path.name, '건수': len(rows), '순액합계': rows['순액'].sum(),
+            '시작월': rows['월'].min(), '종료월': rows['월'].max(),
+            '계정과목수': rows['계정과목'].nunique(), '거래처수': rows['거래처명_filled'].nunique(),
+        })
+        years.append(year)
+        print(f"   {year}년: {path.name} {len(rows):,}건 → 큐브 {len(cubes[-1]):,}셀")
+        del rows
+
+    return {
+        'years': years,
+        'cube': pd.concat(cubes, ignore_index=True)[YEAR_DIMS + ['순액', '건수']],
+        'account_stats': pd.concat(stats, ignore_index=True),
+        'row_anomalies': pd.concat(anomalies, ignore_index=True) if anomalies else pd.DataFrame(columns=ANOMALY_COLS),
+        'summary': pd.DataFrame(summary),
+    }
+
+
+def add_yoy(table: pd.DataFrame, years: list) -> pd.DataFrame:
+    """연도 열 뒤에 직전 연도 대비 증감_{년도} / 증감률_{년도}(%) 추가 (직전 연도 값이 0이면 증감률 결측)"""
+    for prev, cur in zip(years, years[1:]):
+        diff = table[cur] - table[prev]
+        table[f'증감_{cur}'] = diff
+        table[f'증감률_{cur}'] = (diff / table[prev].abs().where(table[prev] != 0) * 100).round(1)
+    return table
+
+
+def monthly_anomalies(cube: pd.DataFrame, years: list) -> pd.DataFrame:
+    """큐브의 계정과목 × 월 합계 기준 이상거래
+
+    - 전년동월급증/급감: 직전 연도 같은 월 대비 SURGE_RATE 초과 증가 / DROP_RATE 미만 감소
+    - 월합계이상(전년기준): 이전 연도들의 월 합계 평균/표준편차 대비 Z_THRESHOLD σ 이탈
+    """
+    monthly = cube.groupby(['계정과목', '월', '년도'])['순액'].sum().unstack('년도')
+    found = []
+    for i, (prev, cur) in enumerate(zip(years, years[1:]), start=1):
+        current = monthly[cur].dropna()
+
+        previous = monthly[prev].reindex(current.index)
+        rate = (current - previous) / previous.where(previous != 0)
+        for kind, mask, word in [('전년동월급증', rate > SURGE_RATE, '증가'), ('전년동월급감', rate < DROP_RATE, '감소')]:
+            hits = current[mask]
+            found.append(pd.DataFrame({
+                '유형': kind,
+                '계정과목': hits.index.get_level_values('계정과목'),
+                '거래처명': '',
+                '회계일자': [f"{cur}{month}" for month in hits.index.get_level_values('월')],
+                '금액': hits.to_numpy(),
+                '평균': previous[mask].to_numpy(),
+                'Z-score': 0,
+                '비고': [f"{prev}년 같은 월 대비 {r * 100:.0f}% {word}" for r in rate[mask]],
+            }))
+
+        base = monthly[years[:i]].stack().groupby(level='계정과목').agg(['mean', 'std'])
+        base = base[base['std'] > 0]
+        mean = current.index.get_level_values('계정과목').map(base['mean']).to_numpy(dtype=float)
+        std = current.index.get_level_values('계정과목').map(base['std']).to_numpy(dtype=float)
+        z = (current.to_numpy() - mean) / std
+        mask = np.abs(z) > Z_THRESHOLD
+        hits = current[mask]
+        found.append(pd.DataFrame({
+            '유형': '월합계이상(전년기준)',
+            '계정과목': hits.index.get_level_values('계정과목'),
+            '거래처명': '',
+            '회계일자': [f"{cur}{month}" for month in hits.index.get_level_values('월')],
+            '금액': hits.to_numpy(),
+            '평균': mean[mask].round(0),
+            'Z-score': z[mask].round(2),
+            '비고': [f"{'·'.join(years[:i])}년 월 합계 평균 대비 {abs(v):.1f}σ 이탈" for v in z[mask]],
+        }))
+
+    if not found:
+        return pd.DataFrame(columns=ANOMALY_COLS)
+    return pd.concat(found, ignore_index=True)[ANOMALY_COLS]
+
+
+def build_year_sheets(stacked: dict, sheets: dict = YEAR_SHEETS) -> dict:
+    """다년도 큐브 → {시트명: DataFrame} (연도별현황, YEAR_SHEETS, 이상거래_전년기준)"""
+    years = stacked['years']
+    cq = CubeQuery(stacked['cube'], dims=YEAR_DIMS)
+    tables = {'연도별현황': stacked['summary']}
+    for name, spec in sheets.items():
+        table = build_sheet(cq, spec)
+        tables[name] = add_yoy(table, years) if spec.get('yoy') else table
+    tables['이상거래_전년기준'] = pd.concat(
+        [stacked['row_anomalies'], monthly_anomalies(stacked['cube'], years)], ignore_index=True
+    )
+    return tables
+
+
+def compare_years(paths: list, company: str = None, output_root: Path = OUTPUT_ROOT) -> Path:
+    """연도별 병합 결과 파일 → 다년도 비교 Excel / JSON 출력"""
+    company = company or paths[0].parent.name
+    print(f"다년도 큐브 집계: {company} ({len(paths)}개 파일)")
+    output_dir = output_root / company
+    output_dir.mkdir(parents=True, exist_ok=True)
+    stacked = stack_years(paths, output_dir / "trader_names.pkl")
+    years = stacked['years']
+    tables = build_year_sheets(stacked)
+
+    stem = f"다년도비교_{years[0]}-{years[-1]}"
+    excel_path = output_dir / f"{stem}.xlsx"
+    export_workbooks(excel_path, [(name, table, name in YEAR_SHEETS, False) for name, table in tables.items()])
+
+    json_output = {'meta': {'회사명': company, '기간': f"{years[0]}~{years[-1]}", '년도': years,
+                            '총건수': int(stacked['summary']['건수'].sum())}}
+    for name, table in tables.items():
+        json_output[name] = df_to_dict(table.reset_index() if name in YEAR_SHEETS else table)
+    json_path = output_dir / f"{stem}.json"
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(json_output, f, ensure_ascii=False, indent=2, allow_nan=False)
+
+    print(f"   다년도 큐브: {len(stacked['cube']):,}셀 ({', '.join(years)}년)")
+    for name, table in tables.items():
+        print(f"   {name}: {len(table)}행")
+    print(f"   Excel 저장: {excel_path}")
+    print(f"   JSON 저장: {json_path}")
+    return excel_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='다년도 비교 (년도 차원 큐브)')
+    parser.add_argument('targets', nargs='+', help='회사명 (연도별 최신 버전) 또는 연도별 결과 파일 경로 2개 이상')
+    parser.add_argument('--input-root', type=Path, default=INPUT_ROOT)
+    parser.add_argument('--output-root', type=Path, default=OUTPUT_ROOT)
+    args = parser.parse_args()
+
+    if len(args.targets) == 1:
+        paths = latest_by_year(args.targets[0], args.input_root)
+        company = args.targets[0]
+    else:
+        paths = [Path(t) for t in args.targets]
+        company = None
+    if len(paths) < 2:
+        parser.error(f"비교할 연도가 2개 미만: {', '.join(p.name for p in paths) or '없음'}")
+    compare_years(paths, company, args.output_root)
+
+
+if __name__ == '__main__':
+    main()
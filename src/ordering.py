@@ -0,0 +1,93 @@
+"""
+시트 공통 정렬 계층
+- 정렬순서/손익분류/계정코드/거래처/증빙유형/월/소스유형 차원의 정렬 코드를 한 번만 계산
+- 시트는 정수 코드 배열을 np.lexsort 한 번으로 정렬 (시트마다 map/merge 하지 않음)
+- 가로 시트의 (월, 소스유형) 컬럼도 같은 코드로 정렬
+"""
+import numpy as np
+import pandas as pd
+
+# 증빙유형 코드 순서 (0→1→5→40→86→87→88→88.5→89→90), 목록에 없는 코드는 뒤로
+EV_TYPE_ORDER = [0, 1, 5, 40, 86, 87, 88, 88.5, 89, 90]
+
+# 소스유형 순서 (가로 시트 컬럼 그룹 순서)
+SOURCE_ORDER = ['분개장(vat)', '분개장(일반)', '카드미반영']
+
+TRADER_KEYS = ['정렬순서', '손익분류', '계정과목', '거래처명_filled']
+
+
+def _ordered(values, preferred=()) -> list:
+    """preferred 순서를 먼저, 나머지 값은 오름차순으로 뒤에"""
+    present = pd.unique(pd.Series(values).dropna())
+    head = [v for v in preferred if v in set(present)]
+    tail = sorted(v for v in present if v not in set(head))
+    return head + tail
+
+
+def _rank(values) -> np.ndarray:
+    """차원이 아닌 컬럼(합계, 플래그 등)의 오름차순 순위 (결측은 맨 뒤)"""
+    codes, uniques = pd.factorize(values, sort=True)
+    return np.where(codes < 0, len(uniques), codes)
+
+
+class SheetOrdering:
+    """큐브 차원의 정렬 코드와 거래처 합계를 한 번만 계산해 두는 정렬기
+
+    Args:
+        cube: build_cube() 결과
+        account_codes: 계정과목 → 계정코드
+    """
+
+    def __init__(self, cube: pd.DataFrame, account_codes: dict):
+        self.categories = {
+            '정렬순서': _ordered(cube['정렬순서']),
+            '손익분류': _ordered(cube['손익분류']),
+            '계정과목': _ordered(cube['계정과목']),
+            '거래처명_filled': _ordered(cube['거래처명_filled']),
+            '증빙유형': _ordered(cube['증빙유형'], EV_TYPE_ORDER),
+            '월': _ordered(cube['월']),
+            '소스유형': _ordered(cube['소스유형'], SOURCE_ORDER),
+        }
+
+        # 계정코드 순위: 계정과목 코드 → 계정코드 순위 (코드가 같은 계정과목은 같은 순위)
+        codes = pd.Series(self.categories['계정과목']).map(account_codes).fillna('').astype(str)
+        self.account_rank = np.append(_rank(codes), len(codes))
+
+        # 거래처(계정과목 × 거래처) 단위 순액/건수 합계 (세로 시트 정렬용)
+        self.trader_totals = cube.groupby(TRADER_KEYS)[['순액', '건수']].sum()
+
+    def codes(self, frame: pd.DataFrame, key: str) -> np.ndarray:
+        """정렬 코드 배열 ('계정코드'는 계정과목 컬럼에서 조회, 결측은 맨 뒤)"""
+        if key == '계정코드':
+            return self.account_rank[self.codes(frame, '계정과목')]
+        if key in self.categories:
+            categories = self.categories[key]
+            codes = pd.Categorical(frame[key], categories=categories).codes.astype(np.int64)
+            return np.where(codes < 0, len(categories), codes)
+        return _rank(frame[key])
+
+    def trader_total(self, frame: pd.DataFrame, measure: str = '순액') -> np.ndarray:
+        """행마다 해당 거래처(계정과목 × 거래처)의 합계"""
+        index = pd.MultiIndex.from_frame(frame[TRADER_KEYS])
+        return self.trader_totals[measure].reindex(index).to_numpy()
+
+    def sort(self, frame: pd.DataFrame, by: list, ascending=True) -> pd.DataFrame:
+        """by 순서대로 정렬 (np.lexsort, 안정 정렬)
+
+        Args:
+            by: 컬럼명 또는 값 배열의 리스트
+            ascending: bool 또는 by와 같은 길이의 bool 리스트
+        """
+        if isinstance(ascending, bool):
+            ascending = [ascending] * len(by)
+        keys = []
+        for key, asc in zip(by, ascending):
+            codes = self.codes(frame, key) if isinstance(key, str) else _rank(np.asarray(key))
+            keys.append(codes if asc else -codes)
+        return frame.iloc[np.lexsort(keys[::-1])]
+
+    def order_columns(self, columns: pd.MultiIndex, by: list) -> pd.MultiIndex:
+        """MultiIndex 컬럼을 차원 순서로 정렬 (예: 소스유형 그룹 → 월)"""
+        frame = columns.to_frame(index=False)
+        order = np.lexsort([self.codes(frame, key) for key in by][::-1])
+        return columns[order]
@@ -0,0 +1,76 @@
+"""
+회사별 결과 캐시
+- 입력 파일 내용 해시 + 분석 설정 + 로직 버전이 같으면 이전 실행의 큐브/결과 테이블을 그대로 재사용
+  (시트 배치/출력 형식만 바꾼 재실행은 집계 없이 바로 출력)
+- output/{회사명}/_results/{종류}_{키}.pkl, 종류별로 최근 MAX_ENTRIES개만 보관
+"""
+import hashlib
+import json
+from pathlib import Path
+
+import pandas as pd
+
+# 분석 로직(집계/정렬/탐지 규칙)이 바뀌면 올려서 기존 결과를 무효화
+RESULT_VERSION = 10
+
+# 종류별 보관 개수 (오래된 키부터 삭제)
+MAX_ENTRIES = 3
+
+# 파일 해시 읽기 단위
+READ_CHUNK = 1 << 20
+
+
+def file_digest(path: Path) -> str:
+    """파일 내용 SHA-256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_CHUNK), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def result_key(inputs: list, settings: dict, version: int = RESULT_VERSION) -> str:
+    """입력 파일(없는 파일은 제외) 내용 + 설정 + 버전으로 캐시 키 생성"""
+    parts = {
+        'version': version,
+        'settings': settings,
+        'inputs': {Path(p).name: file_digest(Path(p)) for p in inputs if Path(p).exists()},
+    }
+    payload = json.dumps(parts, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:20]
+
+
+def load_results(cache_dir: Path, key: str, kind: str = 'analysis'):
+    """캐시된 결과 로드 (없거나 버전이 다르면 None)"""
+    path = cache_dir / f"{kind}_{key}.pkl"
+    if not path.exists():
+        return None
+    cached = pd.read_pickle(path)
+    if cached.get('version') != RESULT_VERSION:
+        return None
+    path.touch()  # 최근 사용 표시 (보관 개수 정리 기준)
+    return cached['results']
+
+
+def save_results(cache_dir: Path, key: str, results, kind: str = 'analysis'):
+    """결과 저장 후 같은 종류의 오래된 캐시 정리"""
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    pd.to_pickle({'version': RESULT_VERSION, 'results': results}, cache_dir / f"{kind}_{key}.pkl")
+
+    entries = sorted(cache_dir.glob(f"{kind}_*.pkl"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for stale in entries[MAX_ENTRIES:]:
+        stale.unlink()
+
+
+def latest_results(cache_dir: Path, kind: str = 'analysis'):
+    """가장 최근에 저장/사용된 결과 (키를 모를 때, 예: 분석 서비스)
+
+    Returns:
+        (캐시 파일 경로, 결과) - 없으면 (None, None)
+    """
+    entries = sorted(cache_dir.glob(f"{kind}_*.pkl"), key=lambda p: p.stat().st_mtime, reverse=True)
+    for path in entries:
+        cached = pd.read_pickle(path)
+        if cached.get('version') == RESULT_VERSION:
+            return path, cached['results']
+    return None, None
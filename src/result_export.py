@@ -0,0 +1,219 @@
+"""
+분석 결과 출력 (analyze_thej.py 13~15단계)
+- 결과 dict(새로 계산했거나 결과 캐시에서 읽은 것)를 Excel / 컬럼 형식 / JSON / JSON Lines로 출력하고 요약 표시
+- 결과 dict: {'meta': {총건수, 년도, 시작월, 종료월}, 'cube': 큐브, 'tables': {시트명: DataFrame 또는 SparseCellStore}}
+- 아래 시트 목록에 없는 테이블(선언형 시트 REPORT_SHEETS로 추가한 시트)은 인덱스 포함으로 맨 뒤에 출력
+"""
+import json
+from datetime import datetime
+from pathlib import Path
+
+import pandas as pd
+
+from columnar_export import columnar_available, export_columnar
+from excel_export import export_workbooks
+from json_sections import write_sections
+
+# Excel 시트 순서: (시트명, 인덱스 출력 여부) - 피벗 시트는 index=False로 병합 셀 문제 방지
+EXCEL_SHEETS = [
+    ('원본데이터', False),                # 원본 데이터 (맨 앞)
+    ('기본피벗', False),                  # 1. 기본 피벗
+    ('기본_거래처추가_피벗', False),       # 1-2. 기본_거래처추가_피벗
+    ('기본_거래처_증빙유형', False),       # 1-3. 기본_거래처_증빙유형
+    ('total_월별추이_가로', False),        # 1-4. 소스유형 × 월별 컬럼
+    ('total_월별추이_세로', False),        # 1-5. 월을 행으로
+    ('total_월별추이_가로_빈도', False),   # 1-6. 거래 횟수
+    ('total_월별추이_세로_빈도', False),   # 1-7. 거래 횟수
+    ('표준계정별', False),                # 1-8. 계정과목 마스터 표준계정 롤업
+    ('월별추이', True),                   # 2. 월별 추이
+    ('계정월별', True),                   # 3. 계정월별상세
+    ('거래처TOP', False),                 # 4. 거래처 TOP 10
+    ('증빙유형별', True),                 # 5. 증빙유형별
+    ('카드현황', True),                   # 6. 카드 현황
+    ('카드미반영', False),                # 7. 카드미반영 상세
+    ('카드대사', False),                  # 7-1. 카드미반영 ↔ 반영 카드 전표 대사
+    ('요일별', False),                    # 8. 요일별 패턴
+    ('입력지연', False),                  # 8-1. 입력 지연
+    ('금액구간별', False),                # 9. 금액구간별
+    ('이상거래', False),                  # 10. 이상 거래
+    ('데이터품질', False),                # 11. 입력 검증 규칙별 위반
+]
+
+# 결과가 비어 있으면 시트를 만들지 않음 (JSON은 빈 리스트)
+OPTIONAL_SHEETS = {'카드현황', '카드미반영', '카드대사', '이상거래'}
+
+# JSON 섹션: (섹션명, reset_index 여부) - 원본데이터/카드현황은 JSON에 넣지 않음
+JSON_TABLES = [
+    ('기본피벗', True),
+    ('기본_거래처추가_피벗', True),
+    ('기본_거래처_증빙유형', False),
+    ('표준계정별', False),
+    ('월별추이', True),
+    ('계정월별', True),
+    ('거래처TOP', False),
+    ('증빙유형별', True),
+    ('요일별', False),
+    ('입력지연', False),
+    ('금액구간별', False),
+    ('카드미반영', False),
+    ('카드대사', False),
+    ('이상거래', False),
+    ('데이터품질', False),
+]
+
+
+def extra_tables(tables: dict) -> list:
+    """시트 목록에 없는 추가 테이블명 (결과 dict 순서)"""
+    known = {name for name, _ in EXCEL_SHEETS}
+    return [name for name in tables if name not in known]
+
+
+def df_to_dict(df):
+    """DataFrame을 JSON 직렬화 가능한 dict로 변환 (결측은 모든 타입에서 None → JSON null)"""
+    result = df.copy()
+    if isinstance(result.index, pd.MultiIndex):
+        result = result.reset_index()
+    for col in result.columns:
+        if result[col].dtype in ['int64', 'Int64', 'float64']:
+            # object로 만들어야 None이 float 컬럼에서 다시 NaN으로 바뀌지 않음
+            result[col] = pd.Series([
+                int(x) if pd.notna(x) and x == int(x)
+                else float(x) if pd.notna(x) else None
+                for x in result[col]
+            ], index=result.index, dtype=object)
+    result = result.astype(object).where(result.notna(), None)
+    return result.to_dict(orient='records')
+
+
+def export_results(results: dict, output_dir: Path, company_name: str, compact_trader_ev: bool = False,
+                   columnar_format: str = 'parquet', json_sections: bool = True) -> dict:
+    """13. Excel / 13-1. 컬럼 형식 / 14. JSON / 14-1. JSON Lines 출력 후 15. 요약 표시
+
+    Returns:
+        출력 경로 {'excel', 'json', 'jsonl', 'columnar'} (출력하지 않은 형식은 None)
+    """
+    tables = results['tables']
+    meta = results['meta']
+
+    # ============================================================
+    # 13. Excel 출력
+    # ============================================================
+    print("13. Excel 출력 중...")
+
+    # 파일명에 타임스탬프 추가 (mm-dd-hh-mm)
+    timestamp = datetime.now().strftime("%m-%d-%H-%M")
+    excel_path = output_dir / f"분석결과_{timestamp}.xlsx"
+
+    # (시트명, 테이블, index 출력 여부, compact) - 출력 순서
+    excel_sheets = [
+        (name, tables[name], index, compact_trader_ev if name == '기본_거래처_증빙유형' else False)
+        for name, index in EXCEL_SHEETS
+        if name not in OPTIONAL_SHEETS or len(tables[name]) > 0
+    ] + [(name, tables[name], True, False) for name in extra_tables(tables)]
+
+    # 행 한도를 넘는 시트는 보조 통합문서로 분할, 위치는 {파일명}_index.json 에 기록
+    sheet_index = export_workbooks(excel_path, excel_sheets)
+    split_sheets = sorted({e['시트'] for e in sheet_index['시트'] if e['파일'] != excel_path.name})
+
+    print(f"   Excel 저장: {excel_path}")
+    if split_sheets:
+        print(f"   행 한도 초과로 분할된 시트: {', '.join(split_sheets)} (위치: {excel_path.stem}_index.json)")
+
+    # 13-1. 컬럼 형식 출력 (Excel 시트와 같은 테이블, 행 한도 없이 테이블당 파일 1개)
+    columnar_dir = None
+    if columnar_format:
+        if columnar_available():
+            columnar_dir = output_dir / f"분석결과_{timestamp}_columnar"
+            manifest = export_columnar(columnar_dir, excel_sheets, fmt=columnar_format)
+            print(f"   {columnar_format} 저장: {columnar_dir} ({len(manifest['테이블'])}개 테이블)")
+        else:
+            print(f"   경고: pyarrow가 설치되어 있지 않아 {columnar_format} 출력 생략 (uv sync 또는 pip install pyarrow)")
+
+    # ============================================================
+    # 14. JSON 출력
+    # ============================================================
+    print("14. JSON 출력 중...")
+
+    json_output = {
+        "meta": {
+            "회사명": company_name,
+            "기간": meta['년도'],
+            "총건수": meta['총건수'],
+            "생성일시": datetime.now().isoformat()
+        }
+    }
+    for name, reset in JSON_TABLES:
+        table = tables[name]
+        if name == '기본_거래처_증빙유형':
+            json_output[name] = df_to_dict(table.to_frame(compact=compact_trader_ev))
+        elif name in OPTIONAL_SHEETS and len(table) == 0:
+            json_output[name] = []
+        else:
+            json_output[name] = df_to_dict(table.reset_index() if reset else table)
+    for name in extra_tables(tables):
+        json_output[name] = df_to_dict(tables[name].reset_index())
+
+    json_path = output_dir / f"분석결과_{timestamp}.json"
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(json_output, f, ensure_ascii=False, indent=2)
+
+    print(f"   JSON 저장: {json_path}")
+
+    # 14-1. 섹션 단위 JSON Lines + 오프셋 인덱스
+    jsonl_path = None
+    if json_sections:
+        jsonl_path = output_dir / f"분석결과_{timestamp}.jsonl"
+        section_index = write_sections(jsonl_path, json_output)
+        print(f"   JSON Lines 저장: {jsonl_path} ({len(section_index['섹션'])}개 섹션, 인덱스: {jsonl_path.stem}_sections.json)")
+
+    # ============================================================
+    # 15. 요약 출력
+    # ============================================================
+    print("\n" + "="*60)
+    print("분석 완료! (10가지 분석)")
+    print("="*60)
+
+    print(f"\n[데이터 요약]")
+    print(f"  - 총 건수: {meta['총건수']:,}건")
+    print(f"  - 기간: {meta['년도']}년 {meta['시작월']}월 ~ {meta['종료월']}월")
+
+    print(f"\n[손익 요약]")
+    for idx, row in tables['월별추이'].iterrows():
+        print(f"  - {idx}: {row['합계']:,.0f}원")
+
+    trader_ev = tables['기본_거래처_증빙유형']
+    print(f"\n[분석 결과]")
+    print(f"  - 기본 피벗: {len(tables['기본피벗'])}행")
+    print(f"  - 기본_거래처추가_피벗: {len(tables['기본_거래처추가_피벗'])}행")
+    print(f"  - 기본_거래처_증빙유형: {len(trader_ev)}행" + (f" (0인 행 제외 {trader_ev.nnz}행 출력)" if compact_trader_ev else ""))
+    print(f"  - 표준계정별: {len(tables['표준계정별'])}행")
+    print(f"  - 월별 추이: {len(tables['월별추이'])}행")
+    print(f"  - 계정월별: {len(tables['계정월별'])}행")
+    print(f"  - 거래처 TOP: {len(tables['거래처TOP'])}건")
+    print(f"  - 증빙유형별: {len(tables['증빙유형별'])}행")
+    print(f"  - 카드미반영: {len(tables['카드미반영'])}건")
+    print(f"  - 카드대사: {len(tables['카드대사'])}건")
+    print(f"  - 요일별: {len(tables['요일별'])}행")
+    print(f"  - 입력지연: {len(tables['입력지연'])}행")
+    print(f"  - 금액구간별: {len(tables['금액구간별'])}행")
+    print(f"  - 이상 거래: {len(tables['이상거래'])}건")
+    print(f"  - 데이터품질: 규칙 {len(tables['데이터품질'])}개, 위반 {tables['데이터품질']['위반건수'].sum():,}건")
+
+    print(f"\n[출력 파일]")
+    print(f"  - Excel: {excel_path}")
+    print(f"  - JSON: {json_path}")
+    if jsonl_path:
+        print(f"  - JSON Lines: {jsonl_path}")
+    if columnar_dir:
+        print(f"  - {columnar_format}: {columnar_dir}")
+
+    print(f"\n[Excel 시트 목록]")
+    sheets = [
+        "원본데이터", "기본피벗", "기본_거래처추가_피벗", "기본_거래처_증빙유형",
+        "표준계정별", "월별추이", "계정월별", "거래처TOP", "증빙유형별", "카드현황", "카드미반영", "카드대사",
+        "요일별", "입력지연", "금액구간별", "이상거래", "데이터품질"
+    ] + extra_tables(tables)
+    for i, sheet in enumerate(sheets, 1):
+        print(f"  {i:2}. {sheet}")
+
+    return {'excel': excel_path, 'json': json_path, 'jsonl': jsonl_path, 'columnar': columnar_dir}
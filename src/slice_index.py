@@ -0,0 +1,49 @@
+"""
+슬라이스 인덱스 (데이터셋당 1회 생성)
+- 데이터소스/증빙유형/손익분류/월 값별 행 위치(정렬된 정수 배열) 보관
+- 분석 단계/차트는 boolean 필터로 전체 프레임을 다시 스캔하지 않고 위치로 바로 선택
+"""
+import numpy as np
+import pandas as pd
+
+SLICE_DIMS = ['데이터소스', '증빙유형', '손익분류', '월']
+
+
+class SliceIndex:
+    """차원 값 → 행 위치 인덱스
+
+    Args:
+        df: 행 단위 데이터 (인덱스 생성 후 행 순서가 바뀌면 다시 생성)
+        dims: 인덱스를 만들 차원
+    """
+
+    def __init__(self, df: pd.DataFrame, dims: list = SLICE_DIMS):
+        self.size = len(df)
+        self.positions = {
+            dim: {value: np.asarray(rows) for value, rows in df.groupby(dim, sort=False).indices.items()}
+            for dim in dims if dim in df.columns
+        }
+
+    def rows(self, conditions: dict) -> np.ndarray:
+        """조건을 모두 만족하는 행 위치 (원래 행 순서)
+
+        Args:
+            conditions: {차원: 값 또는 값 리스트} (리스트는 OR, 차원 간은 AND)
+        """
+        result = None
+        for dim, values in conditions.items():
+            if not isinstance(values, (list, tuple, set)):
+                values = [values]
+            index = self.positions[dim]
+            parts = [index[v] for v in values if v in index]
+            rows = np.sort(np.concatenate(parts)) if parts else np.empty(0, dtype=np.intp)
+            result = rows if result is None else np.intersect1d(result, rows, assume_unique=True)
+        return np.arange(self.size) if result is None else result
+
+    def count(self, conditions: dict) -> int:
+        """조건을 만족하는 행 수"""
+        return len(self.rows(conditions))
+
+    def take(self, df: pd.DataFrame, conditions: dict) -> pd.DataFrame:
+        """조건을 만족하는 행만 선택 (boolean 필터와 같은 결과)"""
+        return df.iloc[self.rows(conditions)]
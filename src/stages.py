@@ -0,0 +1,83 @@
+"""
+분석 단계 스케줄러
+- 파생 프레임/큐브를 읽기만 하는 단계들을 스레드 풀에서 동시에 실행 (단계 간 의존이 있으면 선행 단계 완료 후 제출)
+- 분석 스크립트는 최상위 코드라 프로세스 풀(spawn)은 스크립트 전체를 다시 실행하므로 스레드만 사용
+- free-threaded 빌드(Python 3.13t, GIL 비활성)에서는 순수 파이썬 구간까지 코어 수만큼 병렬로 실행되고,
+  일반 빌드에서는 GIL을 놓는 numpy/pandas 연산 구간만 겹쳐 실행됨
+- 단계 로그는 단계별로 모아 두었다가 완료 순서대로 한 번에 출력 (다른 단계 로그와 섞이지 않음)
+"""
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def gil_enabled() -> bool:
+    """GIL 활성 여부 (3.13 미만이거나 일반 빌드면 True)"""
+    return getattr(sys, '_is_gil_enabled', lambda: True)()
+
+
+def default_workers(n_stages: int) -> int:
+    """작업 스레드 수: 단계 수와 코어 수 중 작은 값"""
+    return max(1, min(n_stages, os.cpu_count() or 1))
+
+
+def _run(func, inputs: dict):
+    lines = []
+    start = time.perf_counter()
+    output = func(lines.append, **inputs)
+    return output, lines, time.perf_counter() - start
+
+
+def _report(title: str, lines: list, elapsed: float):
+    print(f"{title} 완료 ({elapsed:.2f}초)")
+    for line in lines:
+        print(line)
+
+
+def run_stages(stages: dict, max_workers: int = None) -> dict:
+    """단계 실행
+
+    Args:
+        stages: {단계명: (함수, [선행 단계명])}
+            함수는 log(문자열)와 선행 단계 결과를 키워드 인자로 받아 {결과명: 값} dict를 반환
+        max_workers: 작업 스레드 수 (None이면 코어 수, 1이면 정의 순서대로 순차 실행)
+
+    Returns:
+        모든 단계 결과를 병합한 {결과명: 값}
+    """
+    workers = max_workers or default_workers(len(stages))
+    results = {}   # 단계명 → 결과 dict
+
+    def inputs(after):
+        merged = {}
+        for title in after:
+            merged.update(results[title])
+        return merged
+
+    if workers == 1:
+        for title, (func, after) in stages.items():
+            output, lines, elapsed = _run(func, inputs(after))
+            results[title] = output
+            _report(title, lines, elapsed)
+    else:
+        pending, running = dict(stages), {}
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            while pending or running:
+                for title in [t for t, (_, after) in pending.items() if set(after) <= results.keys()]:
+                    func, after = pending.pop(title)
+                    running[pool.submit(_run, func, inputs(after))] = title
+                if not running:
+                    raise ValueError(f"선행 단계를 찾을 수 없음: {sorted(pending)}")
+
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    title = running.pop(future)
+                    output, lines, elapsed = future.result()
+                    results[title] = output
+                    _report(title, lines, elapsed)
+
+    merged = {}
+    for title in stages:
+        merged.update(results[title])
+    return merged
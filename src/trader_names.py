@@ -0,0 +1,237 @@
+"""
+거래처명 정규화 인덱스
+- 표기 차이((주)/주식회사, 공백, 전각문자, 지점 접미사)를 정규화 키로 통일
+- 사업자등록번호/거래처코드가 같은 이름은 같은 거래처로 묶음
+- 모든 묶음 단계에서 사업자등록번호가 서로 다른 거래처는 묶지 않음 (다른 사업자의 같은 상호/지점)
+- 키가 다른 이름은 문자 bigram 블로킹 인덱스 안에서만 유사도 비교 (전체 쌍 비교 없음)
+  유사도만으로는 묶지 않고 병합 후보로만 보고 (예: 스타벅스강남 / 스타벅스강동은 다른 지점)
+- 회사별 대표명 매핑은 output/{회사명}/ 아래 pickle로 캐시, (거래처명, 사업자등록번호, 거래처코드)별 건수 지문이 같을 때만 재사용
+"""
+import hashlib
+from collections import defaultdict
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# 매핑 규칙이 바뀌면 올려서 기존 캐시를 무효화
+INDEX_VERSION = 3
+
+# 법인 형태 표기 (NFKC 정규화 후: （주）→(주), ㈜→(주))
+LEGAL_FORM_PATTERN = r'\((?:주|유|사|재|합|사단법인|재단법인)\)|주식회사|유한회사|사단법인|재단법인|^주\)'
+
+# 업종명 '…점' (정육점, 서점, 편의점 등): 지점 접미사가 아니라 상호의 일부
+BUSINESS_SUFFIX = r'(?:정육|서|상|편의|매|음식|할인|전문|대리|백화|잡화|철물|문구|제과|안경|사진|미용|이발|주유|판매)점'
+
+# 지점 접미사: 마지막 단어나 괄호 안이 '지명+점'인 경우 (예: 씨유 논현골드점, 본래순대(원효로점))
+BRANCH_PATTERN = (
+    rf'\s+(?!\S*{BUSINESS_SUFFIX}$)(?:\S+점|\S*(?:영업소|출장소))$'
+    rf'|\((?![^)]*{BUSINESS_SUFFIX}\))[^)]+점\)$'
+)
+
+# 병합 후보 보고 기준 (bigram Dice 계수, 후보는 매핑에 반영하지 않음)
+SIMILARITY_THRESHOLD = 0.8
+MIN_KEY_LENGTH = 4
+
+# 너무 흔한 bigram 블록은 후보 생성에서 제외 (블록 크기 상한)
+MAX_BLOCK_SIZE = 200
+
+
+def _base_names(names: pd.Series) -> pd.Series:
+    """표시용 기본명: 법인 형태/지점 접미사 제거, 공백 정리"""
+    base = names.str.normalize('NFKC').str.replace(LEGAL_FORM_PATTERN, ' ', regex=True)
+    base = base.str.split().str.join(' ')
+    stripped = base.str.replace(BRANCH_PATTERN, '', regex=True).str.strip()
+    # 접미사만 남는 이름(예: '본점')은 그대로 둔다
+    return stripped.where(stripped != '', base)
+
+
+def _name_keys(base: pd.Series) -> pd.Series:
+    """비교용 정규화 키: 기본명에서 공백/기호 제거, 소문자"""
+    return base.str.lower().str.replace(r'[\W_]+', '', regex=True)
+
+
+def _bigrams(key: str) -> set:
+    return {key[i:i + 2] for i in range(len(key) - 1)}
+
+
+class _UnionFind:
+    """그룹별 사업자등록번호를 함께 들고, 번호가 서로 다른 그룹은 합치지 않는 union-find"""
+
+    def __init__(self, n: int, ids=None):
+        self.parent = list(range(n))
+        self.ids = [i if isinstance(i, str) else None for i in ids] if ids is not None else [None] * n
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int):
+        ri, rj = self.find(i), self.find(j)
+        if ri == rj:
+            return
+        id_i, id_j = self.ids[ri], self.ids[rj]
+        if id_i is not None and id_j is not None and id_i != id_j:
+            return
+        root, child = min(ri, rj), max(ri, rj)
+        self.parent[child] = root
+        self.ids[root] = id_i if id_i is not None else id_j
+
+
+def _union_by(uf: _UnionFind, groups):
+    for members in groups:
+        first = members[0]
+        for other in members[1:]:
+            uf.union(first, other)
+
+
+def _clean_ids(values: pd.Series) -> pd.Series:
+    """사업자등록번호/거래처코드 정리 (빈값, 'nan', 0으로만 된 코드는 결측)"""
+    ids = values.astype(str).str.strip()
+    return ids.mask(ids.isin(['', 'nan', 'None']) | ids.str.fullmatch(r'0*'))
+
+
+def _trader_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """매핑 입력 행 [거래처명, 사업자등록번호, 거래처코드] (빈 거래처명 제외)"""
+    rows = df[['거래처명']].assign(
+        사업자등록번호=_clean_ids(df['사업자등록번호']) if '사업자등록번호' in df.columns else np.nan,
+        거래처코드=_clean_ids(df['거래처코드']) if '거래처코드' in df.columns else np.nan,
+    )
+    rows = rows[rows['거래처명'].notna() & (rows['거래처명'].astype(str).str.strip() != '')]
+    rows['거래처명'] = rows['거래처명'].astype(str)
+    return rows
+
+
+def index_key(df: pd.DataFrame) -> str:
+    """매핑 입력 지문: (거래처명, 사업자등록번호, 거래처코드)별 건수의 해시
+
+    식별번호 배정이나 건수(대표명 선택 기준)가 바뀌면 이름 목록이 같아도 키가 달라진다.
+    """
+    counts = _trader_rows(df).groupby(['거래처명', '사업자등록번호', '거래처코드'], dropna=False).size()
+    counts = counts.reset_index(name='건수').astype(str)
+    hashes = pd.util.hash_pandas_object(counts, index=False).to_numpy()
+    return hashlib.sha256(hashes.tobytes()).hexdigest()[:20]
+
+
+def build_trader_index(df: pd.DataFrame) -> dict:
+    """거래처명 → 대표 거래처명 매핑 생성
+
+    1) 정규화 키가 같은 이름 (법인 형태/지점 접미사를 뗀 키가 정확히 같음)
+    2) 사업자등록번호 또는 거래처코드가 같은 이름
+    을 같은 거래처로 묶고, 묶음에서 건수가 가장 많은 표기의 기본명을 대표명으로 사용한다.
+    어느 단계든 사업자등록번호가 서로 다른 묶음은 합치지 않는다.
+    3) bigram 블록을 공유하고 유사도가 기준 이상인데 1), 2)로 묶이지 않은 이름은 병합 후보로만 기록한다.
+
+    Returns:
+        {'mapping': {거래처명: 대표명}, 'proposals': DataFrame [거래처명, 유사거래처명, 유사도]}
+    """
+    proposals = pd.DataFrame(columns=['거래처명', '유사거래처명', '유사도'])
+    rows = _trader_rows(df)
+    names = rows.groupby('거래처명').agg(
+        건수=('거래처명', 'size'),
+        사업자등록번호=('사업자등록번호', 'first'),
+    ).reset_index()
+    if names.empty:
+        return {'mapping': {}, 'proposals': proposals}
+
+    names['기본명'] = _base_names(names['거래처명'])
+    names['키'] = _name_keys(names['기본명'])
+    position = pd.Series(names.index, index=names['거래처명'])
+    uf = _UnionFind(len(names), names['사업자등록번호'].to_numpy())
+
+    # 1) 정규화 키
+    _union_by(uf, names.groupby('키').indices.values())
+
+    # 2) 사업자등록번호 / 거래처코드 교차 참조
+    for id_col in ['사업자등록번호', '거래처코드']:
+        pairs = rows[['거래처명', id_col]].dropna().drop_duplicates()
+        pairs = pairs.assign(pos=pairs['거래처명'].map(position).to_numpy())
+        _union_by(uf, pairs.groupby(id_col)['pos'].agg(list))
+
+    # 3) bigram 블로킹 후 블록 안에서만 유사도 비교 (묶지 않고 후보만, 사업자등록번호가 다른 묶음 제외)
+    keys = names['키'].drop_duplicates()
+    grams = {pos: _bigrams(key) for pos, key in keys.items() if len(key) >= MIN_KEY_LENGTH}
+    blocks = defaultdict(list)
+    for pos, key_grams in grams.items():
+        for gram in key_grams:
+            blocks[gram].append(pos)
+
+    compared, similar = set(), []
+    for members in blocks.values():
+        if len(members) < 2 or len(members) > MAX_BLOCK_SIZE:
+            continue
+        for i, a in enumerate(members):
+            for b in members[i + 1:]:
+                if (a, b) in compared:
+                    continue
+                compared.add((a, b))
+                dice = 2 * len(grams[a] & grams[b]) / (len(grams[a]) + len(grams[b]))
+                if dice < SIMILARITY_THRESHOLD:
+                    continue
+                ra, rb = uf.find(a), uf.find(b)
+                id_a, id_b = uf.ids[ra], uf.ids[rb]
+                if ra != rb and (id_a is None or id_b is None or id_a == id_b):
+                    similar.append((names.at[a, '거래처명'], names.at[b, '거래처명'], round(dice, 2)))
+    if similar:
+        proposals = pd.DataFrame(similar, columns=proposals.columns).sort_values(
+            ['유사도', '거래처명', '유사거래처명'], ascending=[False, True, True], ignore_index=True)
+
+    # 대표명: 단일 표기면 원래 이름, 여러 표기가 묶였으면 최다 건수 표기의 기본명
+    names['그룹'] = [uf.find(i) for i in range(len(names))]
+    names = names.sort_values(['그룹', '건수', '거래처명'], ascending=[True, False, True])
+    leaders = names.drop_duplicates('그룹').set_index('그룹')
+    variants = names.groupby('그룹').size()
+    canonical = np.where(
+        names['그룹'].map(variants).to_numpy() > 1,
+        names['그룹'].map(leaders['기본명']).to_numpy(),
+        names['거래처명'].to_numpy(),
+    )
+    return {'mapping': dict(zip(names['거래처명'], canonical)), 'proposals': proposals}
+
+
+def load_trader_index(df: pd.DataFrame, cache_file: Path) -> dict:
+    """캐시된 인덱스 로드 (입력 지문이나 버전이 다르면 다시 생성)
+
+    Returns:
+        {'version', 'key', 'mapping', 'proposals'} (build_trader_index 참고)
+    """
+    key = index_key(df)
+    if cache_file.exists():
+        cached = pd.read_pickle(cache_file)
+        if cached.get('version') == INDEX_VERSION and cached.get('key') == key:
+            return cached
+
+    index = {'version': INDEX_VERSION, 'key': key, **build_trader_index(df)}
+    cache_file.parent.mkdir(parents=True, exist_ok=True)
+    pd.to_pickle(index, cache_file)
+    return index
+
+
+def canonical_trader_names(df: pd.DataFrame, cache_file: Path) -> pd.Series:
+    """거래처명을 대표명으로 치환한 Series (빈 거래처명은 그대로)
+
+    고유 이름 단위로만 조회하고 행에는 범주 코드로 펼친다.
+    """
+    mapping = load_trader_index(df, cache_file)['mapping']
+    codes, uniques = pd.factorize(df['거래처명'])
+    remapped = np.array([mapping.get(name, name) if isinstance(name, str) else name for name in uniques],
+                        dtype=object)
+    values = np.where(codes >= 0, remapped[codes] if len(remapped) else None, df['거래처명'].to_numpy())
+    return pd.Series(values, index=df.index, name='거래처명')
+
+
+def merge_proposal_report(df: pd.DataFrame, cache_file: Path, sample_pairs: int = 5) -> pd.DataFrame:
+    """유사도 병합 후보 (데이터품질 시트 형식, 매핑에는 반영하지 않은 이름 쌍)"""
+    index = load_trader_index(df, cache_file)
+    proposals = index['proposals']
+    target = len(index['mapping'])
+    examples = [f"{a} ↔ {b} ({score:.2f})" for a, b, score in proposals.head(sample_pairs).itertuples(index=False)]
+    return pd.DataFrame([{
+        '규칙': '거래처유사명', '조건': f'유사도 {SIMILARITY_THRESHOLD} 이상, 식별번호로 묶이지 않음', '컬럼': '거래처명',
+        '대상건수': target, '위반건수': len(proposals),
+        '위반율': round(len(proposals) / target * 100, 1) if target else 0.0,
+        '비고': f"병합하지 않음 (확인 후 사업자등록번호/거래처코드 보완), 예: {'; '.join(examples)}" if len(proposals) else '',
+        '예시행': '', '예시전표': '',
+    }])
@@ -0,0 +1,95 @@
+"""
+입력 데이터 검증 (IMPLEMENTATION_GUIDE §1 핵심 컬럼 / 조건부 필수 컬럼)
+- 규칙을 (조건 마스크, 필수 컬럼) 검사 목록으로 컴파일하고, 로드 직후 한 번 벡터 연산으로 검사
+  (조건 마스크와 컬럼별 빈값 마스크는 한 번씩만 계산해 규칙 간 재사용)
+- 규칙별 대상/위반 건수와 위반 예시 행을 데이터품질 시트로 출력
+- 빈값: 결측, 빈 문자열, 공백만 있는 문자열 (0은 값으로 봄)
+"""
+import numpy as np
+import pandas as pd
+
+# 핵심 컬럼 (모든 행 필수)
+REQUIRED_COLUMNS = [
+    '데이터소스', '손익/재무구분', '손익분류', '정렬순서', '계정과목', '계정코드',
+    '증빙유형', '전표유형구분', '거래처명', '거래처코드', '월', '년도', '순액',
+]
+
+# 조건부 필수 컬럼: (조건 설명, 조건 컬럼, 조건 값, 필수 컬럼)
+CONDITIONAL_RULES = [
+    ('증빙유형 ∈ {86,87,89}', '증빙유형', [86, 87, 89], ['유형코드', '매입매출구분', '사업자등록번호', '품명']),
+    ('증빙유형 ∈ {86,87}', '증빙유형', [86, 87], ['전송일자', '국세청승인번호']),
+    ('증빙유형 ∈ {88,88.5}', '증빙유형', [88, 88.5], ['전표상태', '공제구분', '관련거래처']),
+    ('증빙유형 = 88.5', '증빙유형', [88.5], ['공급가액', '부가세', '총금액', '카드미반영_예측', 'AI추천_차변후보수']),
+    ('공제구분 = 1', '공제구분', [1], ['불공제사유코드']),
+]
+
+# 규칙별 위반 예시 행 수
+SAMPLE_ROWS = 5
+
+
+def compile_rules(required: list = REQUIRED_COLUMNS, conditional: list = CONDITIONAL_RULES) -> list:
+    """규칙 → [(규칙명, 조건 설명, 조건 컬럼, 조건 값, 필수 컬럼)] (필수 컬럼 하나당 검사 하나)"""
+    checks = [('핵심컬럼', '전체', None, None, col) for col in required]
+    for condition, cond_col, cond_values, columns in conditional:
+        checks += [('조건부필수', condition, cond_col, tuple(cond_values), col) for col in columns]
+    return checks
+
+
+def blank_mask(values: pd.Series) -> np.ndarray:
+    """빈값 마스크 (결측/빈 문자열/공백 문자열)"""
+    mask = values.isna().to_numpy()
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        mask = mask | values.astype(str).str.strip().eq('').to_numpy()
+    return mask
+
+
+def validate(df: pd.DataFrame, checks: list = None, sample_rows: int = SAMPLE_ROWS) -> pd.DataFrame:
+    """규칙별 위반 집계
+
+    Returns:
+        DataFrame [규칙, 조건, 컬럼, 대상건수, 위반건수, 위반율, 비고, 예시행, 예시전표]
+        예시행은 원본데이터 행 순서(0부터), 예시전표는 그중 전표번호가 있는 행만, 컬럼 자체가 없으면 대상 행 전체를 위반으로 보고 비고에 표시
+    """
+    checks = checks if checks is not None else compile_rules()
+    conditions, blanks = {}, {}
+    everything = np.ones(len(df), dtype=bool)
+    slips = None
+    if '전표번호' in df.columns:
+        slips = np.where(blank_mask(df['전표번호']), '', df['전표번호'].astype(str).to_numpy())
+
+    rows = []
+    for rule, condition, cond_col, cond_values, col in checks:
+        if cond_col is None:
+            target = everything
+        elif cond_col not in df.columns:
+            target = np.zeros(len(df), dtype=bool)
+        else:
+            key = (cond_col, cond_values)
+            if key not in conditions:
+                numeric = pd.to_numeric(df[cond_col], errors='coerce')
+                conditions[key] = numeric.isin(cond_values).to_numpy()
+            target = conditions[key]
+
+        if col in df.columns:
+            if col not in blanks:
+                blanks[col] = blank_mask(df[col])
+            violation = target & blanks[col]
+            note = ''
+        else:
+            violation = target
+            note = '컬럼 없음'
+
+        positions = np.flatnonzero(violation)
+        n_target = int(target.sum())
+        rows.append({
+            '규칙': rule,
+            '조건': condition,
+            '컬럼': col,
+            '대상건수': n_target,
+            '위반건수': len(positions),
+            '위반율': round(len(positions) / n_target * 100, 1) if n_target else 0.0,
+            '비고': note,
+            '예시행': ', '.join(str(p) for p in positions[:sample_rows]),
+            '예시전표': ', '.join(s for s in slips[positions[:sample_rows]] if s) if slips is not None else '',
+        })
+    return pd.DataFrame(rows)
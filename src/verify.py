@@ -0,0 +1,401 @@
+"""
+기준 경로 ↔ 최적화 경로 차등 검증
+- 같은 입력으로 레거시 구현(reference_analysis.run_reference)과 현재 analyze_thej.py를 한 프로세스에서 실행
+  (analyze_thej.py는 --legacy-compatible --no-cache --no-export: 거래처명 정규화/중복 행 제거 없이, 출력 없이)
+- --default-path: analyze_thej.py를 기본 설정(완전 중복 제거, 거래처명 정규화)으로 실행하고, 기준 경로 입력에도
+  같은 처리(loader.index_ledger, trader_names 대표명)를 적용해 비교
+  (최적화 경로가 원래 거래처명을 보여주는 RAW_TRADER_SHEETS 컬럼은 같은 대표명 매핑을 적용해 비교)
+- 두 결과의 공통 시트를 Excel에 쓰이는 모양 그대로(인덱스 출력 시트는 인덱스 포함) 셀 단위로 비교
+  정수 값은 정확히 같아야 하고, 정수가 아닌 실수만 FLOAT_TOLERANCE(상대 오차) 허용, 결측/빈 문자열/공백은 같은 값,
+  숫자로 읽히는 값은 숫자로 비교 (로더의 타입 변환: '1'과 1, 1.0은 같음)
+- 시트별 행수/불일치 셀 수/첫 불일치와 단계별 소요 시간(기준, 최적화, 배율)을 나란히 출력
+- 레거시에 없는 시트(표준계정별, 카드대사 등)는 '기준 없음', 이상거래의 NEW_ANOMALY_TYPES 행은 비교에서 빼고 건수만 표시
+- 레거시 이후 의도적으로 바뀐 출력은 비교 전에 맞춤 (비고에 표시): 피벗 소계 행 제외,
+  거래처TOP 빈 거래처명 → '(미지정)', 월별추이 가로(금액·빈도) 시트의 동률 행 순서(거래처명으로 고정)는 무시,
+  이상거래 급증/급감 회계일자의 연도(레거시는 2024 고정 → 장부 회계연도)
+
+실행:
+    python src/verify.py                          # input_merged_datas 의 모든 회사 (회사별 최신 버전)
+    python src/verify.py example 유니콘소프트       # 지정 회사
+    python src/verify.py --input FILE.json
+    python src/verify.py --synthetic 100000       # 합성 원장 (샘플 행 재표본추출, 금액/일자 변형)
+    python src/verify.py --default-path           # 기본 설정(중복 제거, 거래처명 정규화) 경로 비교
+종료 코드: 불일치 시트가 있으면 1
+"""
+import argparse
+import contextlib
+import io
+import json
+import runpy
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from cell_store import SparseCellStore
+from loader import index_ledger, ledger_year
+from reference_analysis import load_reference, run_reference
+from result_export import EXCEL_SHEETS
+from trader_names import canonical_trader_names, load_trader_index
+
+BASE_DIR = Path(__file__).parent.parent
+INPUT_ROOT = BASE_DIR / "input_merged_datas"
+ANALYSIS_SCRIPT = Path(__file__).with_name('analyze_thej.py')
+
+# 정수가 아닌 실수 비교 허용 오차 (큰 절대값 대비 비율, 평균/비율 컬럼의 합산 순서 차이)
+FLOAT_TOLERANCE = 1e-9
+
+# 레거시 이후 추가된 이상거래 유형 (비교 제외)
+NEW_ANOMALY_TYPES = ['중복의심']
+
+# 레거시 이후 의도된 출력 변경
+# - SUBTOTAL_SHEETS: grouping sets 소계 행 추가 → 최적화 경로에서 SUBTOTAL_LABELS 행 제외
+# - UNKNOWN_TRADER_SHEETS: 빈 거래처명을 '(미지정)'으로 표시 → 기준 쪽 빈값을 같은 표시로
+# - TIE_ORDER_SHEETS: 정렬 키가 모두 같은 행의 순서를 거래처명으로 고정 → 양쪽 모두 전체 컬럼 순으로 정렬 후 비교
+SUBTOTAL_SHEETS = ['기본피벗', '기본_거래처추가_피벗']
+SUBTOTAL_LABELS = ['소계']
+UNKNOWN_TRADER_SHEETS = {'거래처TOP': '거래처명'}
+UNKNOWN_TRADER = '(미지정)'
+TIE_ORDER_SHEETS = ['total_월별추이_가로', 'total_월별추이_가로_빈도']
+# - MONTHLY_ANOMALY_TYPES: 월 단위 이상거래의 회계일자 연도를 장부 회계연도로 (레거시는 '2024' + 월)
+MONTHLY_ANOMALY_TYPES = ['급증', '급감']
+LEGACY_YEAR = '2024'
+# - RAW_TRADER_SHEETS: --default-path에서 최적화 경로는 원래 거래처명, 기준 경로는 대표명 입력 → 최적화 쪽에 매핑 적용
+RAW_TRADER_SHEETS = {'원본데이터': '거래처명', '카드미반영': '거래처명', '이상거래': '거래처명'}
+
+# 합성 원장 기본 템플릿 / 난수 시드
+SYNTHETIC_TEMPLATE = INPUT_ROOT / "example" / "result_2024_v01_20260106_003725.json"
+SYNTHETIC_SEED = 0
+
+# 시트별 Excel 인덱스 출력 여부 (인덱스 출력 시트는 인덱스를 컬럼으로 펼쳐 비교)
+SHEET_INDEX = dict(EXCEL_SHEETS)
+
+
+def latest_inputs(companies: list = None, input_root: Path = INPUT_ROOT) -> list:
+    """회사별 최신 병합 결과 파일 (파일명의 생성 시각 순 마지막)"""
+    folders = [input_root / c for c in companies] if companies else sorted(p for p in input_root.iterdir() if p.is_dir())
+    inputs = []
+    for folder in folders:
+        versions = sorted(folder.glob('result_*.json'), key=lambda p: p.stem.split('_')[-2:])
+        if versions:
+            inputs.append(versions[-1])
+    return inputs
+
+
+def synthetic_ledger(n_rows: int, path: Path, template: Path = SYNTHETIC_TEMPLATE, seed: int = SYNTHETIC_SEED) -> Path:
+    """합성 원장: 템플릿 행을 재표본추출하고 순액(0.5~1.5배)과 일(같은 월 안)을 바꿔 저장
+
+    데이터키는 복제 번호를 붙여 유일하게 유지 (카드미반영은 원래대로 빈값)
+    """
+    with open(template, 'r', encoding='utf-8') as f:
+        rows = json.load(f)['data']
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(rows), n_rows)
+    factors = rng.uniform(0.5, 1.5, n_rows)
+    days = rng.integers(1, 29, n_rows)
+
+    data = []
+    for i, (pick, factor, day) in enumerate(zip(picks, factors, days)):
+        row = dict(rows[pick])
+        if isinstance(row['순액'], (int, float)):
+            row['순액'] = int(round(row['순액'] * factor))
+        if row.get('회계일자') and row.get('월'):
+            row['회계일자'] = f"{row['회계일자'][:6]}{day:02d}"
+            row['일'] = f"{day:02d}"
+        if row.get('데이터키'):
+            row['데이터키'] = f"{row['데이터키']}-{i}"
+        data.append(row)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'tot': len(data), 'data': data}, f, ensure_ascii=False)
+    return path
+
+
+def default_path_input(df: pd.DataFrame, trader_index_file: Path) -> tuple:
+    """기준 경로 입력에 기본 설정의 입력 처리 적용 (완전 중복 제거 → 거래처명 대표명)
+
+    Returns:
+        (DataFrame, {거래처명: 대표명})
+    """
+    df, _ = index_ledger(df, collapse=True)
+    mapping = load_trader_index(df, trader_index_file)['mapping']
+    return df.assign(거래처명=canonical_trader_names(df, trader_index_file)), mapping
+
+
+def run_reference_path(input_file: Path, trader_index_file: Path = None) -> tuple:
+    """기준 경로 실행 → (테이블 dict, {'로드', '분석', '전체'} 초, 거래처명 매핑)
+
+    trader_index_file이 있으면 기본 설정 비교용으로 default_path_input 적용 (분석 시간에 포함), 없으면 매핑은 None
+    """
+    mapping = None
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        df = load_reference(input_file)
+        loaded = time.perf_counter()
+        if trader_index_file is not None:
+            df, mapping = default_path_input(df, trader_index_file)
+        tables = run_reference(df)
+        end = time.perf_counter()
+    return tables, {'로드': loaded - start, '분석': end - loaded, '전체': end - start}, mapping
+
+
+def run_fast_path(input_file: Path, output_root: Path, legacy: bool = True) -> tuple:
+    """최적화 경로(analyze_thej.py) 실행 → (테이블 dict, {'로드', '분석', '전체'} 초)
+
+    legacy면 --legacy-compatible (중복 제거/거래처명 정규화 없음), 아니면 기본 설정
+    """
+    argv = [str(ANALYSIS_SCRIPT), '--input', str(input_file), '--output-root', str(output_root),
+            '--no-cache', '--no-export'] + (['--legacy-compatible'] if legacy else [])
+    saved_argv = sys.argv
+    sys.argv = argv
+    try:
+        with contextlib.redirect_stdout(io.StringIO()):
+            start = time.perf_counter()
+            namespace = runpy.run_path(str(ANALYSIS_SCRIPT), run_name='__main__')
+            end = time.perf_counter()
+    finally:
+        sys.argv = saved_argv
+    load = namespace['load_elapsed']
+    return namespace['results']['tables'], {'로드': load, '분석': end - start - load, '전체': end - start}
+
+
+def as_sheet(name: str, table) -> pd.DataFrame:
+    """Excel에 쓰이는 모양의 DataFrame (인덱스 출력 시트는 인덱스를 컬럼으로, 셀 저장소는 'index' 제외)"""
+    if isinstance(table, SparseCellStore):
+        return table.to_frame().drop(columns='index')
+    if SHEET_INDEX.get(name, False):
+        table = table.reset_index()
+    else:
+        table = table.reset_index(drop=True)
+    table.columns = ['_'.join(str(c) for c in col) if isinstance(col, tuple) else str(col) for col in table.columns]
+    return table
+
+
+def _cells(values: pd.Series) -> tuple:
+    """(숫자 배열, 문자열 배열, 빈값 마스크) - 숫자가 아닌 셀은 숫자 배열에서 NaN"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        values = values.astype(object)
+    blank = values.isna().to_numpy()
+    text = values.astype(str).str.strip()
+    if values.dtype == object or pd.api.types.is_string_dtype(values):
+        blank = blank | text.eq('').to_numpy()
+    if pd.api.types.is_bool_dtype(values):
+        numeric = values.astype(float).to_numpy()
+    elif pd.api.types.is_datetime64_any_dtype(values):
+        numeric = np.full(len(values), np.nan)
+    else:
+        numeric = pd.to_numeric(values, errors='coerce').to_numpy(dtype=float, na_value=np.nan)
+    return numeric, text.to_numpy(dtype=object), blank
+
+
+def _canonical_order(frame: pd.DataFrame) -> pd.DataFrame:
+    """전체 컬럼 순 정렬 (숫자 컬럼은 숫자로, 나머지는 문자열로, 빈값은 맨 앞)"""
+    keys = {}
+    for i, col in enumerate(frame.columns):
+        numeric, text, blank = _cells(frame[col])
+        if np.isnan(numeric[~blank]).any():
+            keys[i] = np.where(blank, '', text)
+        else:
+            keys[i] = np.where(blank, -np.inf, numeric)
+    order = pd.DataFrame(keys).sort_values(list(keys), kind='stable').index
+    return frame.iloc[order].reset_index(drop=True)
+
+
+def apply_known_changes(name: str, expected: pd.DataFrame, actual: pd.DataFrame, year: str = '',
+                        trader_map: dict = None) -> tuple:
+    """의도된 출력 변경을 반영한 (기준, 최적화, 비고 리스트)
+
+    Args:
+        year: 장부 회계연도 (레거시의 월 단위 이상거래 회계일자 연도 보정용)
+        trader_map: --default-path의 거래처명 대표명 매핑 (RAW_TRADER_SHEETS 컬럼에 적용)
+    """
+    notes = []
+    if trader_map and name in RAW_TRADER_SHEETS and RAW_TRADER_SHEETS[name] in actual.columns:
+        col = RAW_TRADER_SHEETS[name]
+        mapped = actual[col].map(trader_map)
+        renamed = mapped.notna() & mapped.ne(actual[col])
+        if renamed.any():
+            actual = actual.assign(**{col: actual[col].where(~renamed, mapped)})
+            notes.append(f"{col} 대표명 {int(renamed.sum())}행")
+    if name in SUBTOTAL_SHEETS:
+        label_cols = [c for c in actual.columns if actual[c].dtype == object or pd.api.types.is_string_dtype(actual[c])]
+        subtotal = actual[label_cols].isin(SUBTOTAL_LABELS).any(axis=1) if label_cols else pd.Series(False, index=actual.index)
+        if subtotal.any():
+            actual = actual[~subtotal].reset_index(drop=True)
+            notes.append(f"소계 {int(subtotal.sum())}행 제외")
+    if name in UNKNOWN_TRADER_SHEETS:
+        col = UNKNOWN_TRADER_SHEETS[name]
+        if col in expected.columns:
+            blank = expected[col].isna() | expected[col].astype(str).str.strip().eq('')
+            if blank.any():
+                expected = expected.assign(**{col: expected[col].where(~blank, UNKNOWN_TRADER)})
+                notes.append(f"빈 {col} {int(blank.sum())}행 → '{UNKNOWN_TRADER}'")
+    if name in TIE_ORDER_SHEETS and len(expected) == len(actual):
+        expected, actual = _canonical_order(expected), _canonical_order(actual)
+        notes.append('동률 행 순서 무시')
+    if name == '이상거래' and year and year != LEGACY_YEAR and '유형' in expected.columns:
+        monthly = expected['유형'].isin(MONTHLY_ANOMALY_TYPES)
+        if monthly.any():
+            dates = expected['회계일자'].astype(str).str.replace(f'^{LEGACY_YEAR}', year, regex=True)
+            expected = expected.assign(회계일자=expected['회계일자'].where(~monthly, dates))
+            notes.append(f"{', '.join(MONTHLY_ANOMALY_TYPES)} {int(monthly.sum())}건 회계일자 {LEGACY_YEAR} → {year}")
+    if name == '이상거래' and '유형' in actual.columns:
+        new_rows = actual['유형'].isin(NEW_ANOMALY_TYPES)
+        if new_rows.any():
+            actual = actual[~new_rows].reset_index(drop=True)
+            notes.append(f"신규 유형 {int(new_rows.sum())}건 제외 ({', '.join(NEW_ANOMALY_TYPES)})")
+    return expected, actual, notes
+
+
+def compare_column(expected: pd.Series, actual: pd.Series) -> np.ndarray:
+    """셀별 일치 마스크 (같은 길이)"""
+    num_e, text_e, blank_e = _cells(expected)
+    num_a, text_a, blank_a = _cells(actual)
+    is_num_e = ~np.isnan(num_e) & ~blank_e
+    is_num_a = ~np.isnan(num_a) & ~blank_a
+
+    with np.errstate(invalid='ignore'):
+        integral = (num_e == np.round(num_e)) & (num_a == np.round(num_a))
+        close = np.abs(num_e - num_a) <= FLOAT_TOLERANCE * np.maximum(np.abs(num_e), np.abs(num_a))
+        numbers_match = np.where(integral, num_e == num_a, close)
+
+    same = blank_e & blank_a
+    same |= is_num_e & is_num_a & numbers_match
+    same |= ~is_num_e & ~is_num_a & ~blank_e & ~blank_a & (text_e == text_a)
+    return same
+
+
+def compare_sheet(expected: pd.DataFrame, actual: pd.DataFrame) -> dict:
+    """시트 비교 → {'비교셀', '불일치셀', '비고'} (행은 위치로, 컬럼은 이름으로 대응)"""
+    n = min(len(expected), len(actual))
+    common = [c for c in expected.columns if c in actual.columns]
+    missing = [c for c in expected.columns if c not in actual.columns]
+    notes, first = [], None
+    mismatches = abs(len(expected) - len(actual)) * len(expected.columns) + n * len(missing)
+
+    for col in common:
+        same = compare_column(expected[col].iloc[:n].reset_index(drop=True), actual[col].iloc[:n].reset_index(drop=True))
+        bad = np.flatnonzero(~same)
+        mismatches += len(bad)
+        if len(bad) and first is None:
+            row = bad[0]
+            first = f"첫 불일치 {row}행 '{col}': {expected[col].iloc[row]!r} ≠ {actual[col].iloc[row]!r}"
+
+    if len(expected) != len(actual):
+        notes.append(f"행수 {len(expected):,} ≠ {len(actual):,}")
+    if missing:
+        notes.append(f"없는 컬럼: {', '.join(missing)}")
+    if [c for c in actual.columns if c in common] != common:
+        notes.append('컬럼 순서 다름')
+    extra = [c for c in actual.columns if c not in expected.columns]
+    if extra:
+        notes.append(f"추가 컬럼(비교 제외): {', '.join(extra)}")
+    if first:
+        notes.append(first)
+    return {'비교셀': n * len(common), '불일치셀': mismatches, '비고': '; '.join(notes)}
+
+
+def verify_tables(reference: dict, fast: dict, trader_map: dict = None) -> pd.DataFrame:
+    """시트별 비교 결과 [시트, 기준행수, 최적화행수, 비교셀, 불일치셀, 결과, 비고]"""
+    year = ledger_year(reference['원본데이터']) if '원본데이터' in reference else ''
+    rows = []
+    for name in list(reference) + [n for n in fast if n not in reference]:
+        if name not in fast:
+            rows.append({'시트': name, '기준행수': len(reference[name]), '최적화행수': 0,
+                         '비교셀': 0, '불일치셀': 0, '결과': '불일치', '비고': '최적화 경로에 시트 없음'})
+            continue
+        actual = as_sheet(name, fast[name])
+        if name not in reference:
+            rows.append({'시트': name, '기준행수': 0, '최적화행수': len(actual),
+                         '비교셀': 0, '불일치셀': 0, '결과': '기준 없음', '비고': ''})
+            continue
+        expected, actual, notes = apply_known_changes(name, as_sheet(name, reference[name]), actual, year, trader_map)
+
+        if len(expected) == 0 and len(actual) == 0:
+            result = {'비교셀': 0, '불일치셀': 0, '비고': ''}
+        else:
+            result = compare_sheet(expected, actual)
+        result['비고'] = '; '.join(n for n in notes + [result['비고']] if n)
+        rows.append({'시트': name, '기준행수': len(expected), '최적화행수': len(actual), **result,
+                     '결과': '일치' if result['불일치셀'] == 0 else '불일치'})
+    return pd.DataFrame(rows, columns=['시트', '기준행수', '최적화행수', '비교셀', '불일치셀', '결과', '비고'])
+
+
+def verify_file(input_file: Path, output_root: Path, repeat: int = 1, default_path: bool = False) -> tuple:
+    """입력 파일 하나 검증 → (시트별 비교 결과, 소요 시간 비교) - 시간은 repeat회 중 최소
+
+    default_path면 기본 설정 경로 비교 (기준 입력에도 중복 제거/거래처명 정규화 적용)
+    """
+    trader_index_file = output_root / '_verify' / input_file.parent.name / 'trader_names.pkl' if default_path else None
+    reference_runs = [run_reference_path(input_file, trader_index_file) for _ in range(repeat)]
+    fast_runs = [run_fast_path(input_file, output_root, legacy=not default_path) for _ in range(repeat)]
+    report = verify_tables(reference_runs[0][0], fast_runs[0][0], reference_runs[0][2])
+
+    timing = pd.DataFrame([
+        {'단계': step,
+         '기준(초)': min(t[step] for _, t, _ in reference_runs),
+         '최적화(초)': min(t[step] for _, t in fast_runs)}
+        for step in ['로드', '분석', '전체']
+    ])
+    timing['배율'] = (timing['기준(초)'] / timing['최적화(초)']).round(1)
+    return report, timing
+
+
+def print_report(input_file: Path, report: pd.DataFrame, timing: pd.DataFrame, mode: str = ''):
+    print(f"\n=== {input_file.parent.name} / {input_file.name}{f' ({mode})' if mode else ''} ===")
+    for _, row in report.iterrows():
+        line = f"   [{row['결과']}] {row['시트']}: 행 {row['기준행수']:,} / {row['최적화행수']:,}"
+        if row['결과'] != '기준 없음':
+            line += f", 셀 {row['비교셀']:,}개 중 불일치 {row['불일치셀']:,}"
+        if row['비고']:
+            line += f" ({row['비고']})"
+        print(line)
+    print("   소요 시간 (기준 / 최적화 / 배율)")
+    for _, row in timing.iterrows():
+        print(f"      {row['단계']}: {row['기준(초)']:.2f}초 / {row['최적화(초)']:.2f}초 / {row['배율']}배")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='기준 경로 ↔ 최적화 경로 차등 검증')
+    parser.add_argument('companies', nargs='*', help='회사명 (생략하면 input_merged_datas 의 모든 회사)')
+    parser.add_argument('--input', type=Path, action='append', help='병합 결과 파일 (여러 번 지정 가능)')
+    parser.add_argument('--input-root', type=Path, default=INPUT_ROOT)
+    parser.add_argument('--synthetic', type=int, metavar='N', help='합성 원장 N행으로 검증')
+    parser.add_argument('--template', type=Path, default=SYNTHETIC_TEMPLATE, help='합성 원장 템플릿 병합 결과 파일')
+    parser.add_argument('--seed', type=int, default=SYNTHETIC_SEED)
+    parser.add_argument('--repeat', type=int, default=1, help='경로별 반복 실행 횟수 (소요 시간은 최소값)')
+    parser.add_argument('--default-path', action='store_true',
+                        help='기본 설정(완전 중복 제거, 거래처명 정규화) 경로 비교 (기준 입력에도 같은 처리 적용)')
+    args = parser.parse_args()
+
+    failed = []
+    with tempfile.TemporaryDirectory() as workdir:
+        workdir = Path(workdir)
+        if args.synthetic:
+            inputs = [synthetic_ledger(args.synthetic, workdir / '합성원장' / f"result_synthetic_{args.synthetic}.json",
+                                       args.template, args.seed)]
+        elif args.input:
+            inputs = args.input
+        else:
+            inputs = latest_inputs(args.companies, args.input_root)
+        if not inputs:
+            parser.error(f"검증할 입력 파일 없음: {args.input_root}")
+
+        for input_file in inputs:
+            report, timing = verify_file(input_file, workdir / 'output', args.repeat, args.default_path)
+            print_report(input_file, report, timing, '기본 설정' if args.default_path else '')
+            if (report['결과'] == '불일치').any():
+                failed.append(input_file)
+
+    print(f"\n검증 완료: {len(inputs)}개 입력 중 불일치 {len(failed)}개")
+    for input_file in failed:
+        print(f"   불일치: {input_file}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
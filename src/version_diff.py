@@ -0,0 +1,192 @@
+"""
+병합 결과 버전 비교
+- 두 버전(result_*.json)을 행 키로 해시 조인해 추가/삭제/변경 행과 변경 컬럼을 찾음
+  행 키: loader 기본 키 인덱스(데이터키 + 입력순서, 데이터키가 없는 카드미반영은 데이터소스 + 전표번호)의 키 해시,
+  같은 키가 여러 번이면 등장 순번으로 구분
+- 변경 판정은 공통 컬럼 전체의 행 해시 비교, 변경 컬럼은 해시가 다른 행만 컬럼별로 비교
+- 기본피벗 셀(정렬순서/손익분류/계정과목 × 분개장/카드미반영)별 증감은 바뀐 행만 집계
+  (두 버전의 분석 전체를 만들지 않음, 행 수에 선형)
+
+실행:
+    python src/version_diff.py 더제이의원                  # input_merged_datas/더제이의원 의 같은 연도 최근 두 버전
+    python src/version_diff.py 더제이의원 --year 2024      # 지정 연도의 최근 두 버전
+    python src/version_diff.py OLD.json NEW.json
+출력: output/{회사명}/버전비교_{이전 버전}__{새 버전}.xlsx (요약, 추가, 삭제, 변경, 피벗증감 시트)
+"""
+import argparse
+import re
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from excel_export import export_workbooks
+from loader import index_ledger, load_ledger
+
+BASE_DIR = Path(__file__).parent.parent
+INPUT_ROOT = BASE_DIR / "input_merged_datas"
+OUTPUT_ROOT = BASE_DIR / "output"
+
+# 피벗 증감 차원 (기본피벗 행) / 열 (데이터소스)
+PIVOT_DIMS = ['정렬순서', '손익분류', '계정과목']
+
+# 추가/삭제/변경 시트에 함께 보여줄 컬럼
+DETAIL_COLS = ['데이터소스', '데이터키', '입력순서', '전표번호', '회계일자', '계정과목', '거래처명', '순액']
+
+KEY_COLS = ['키해시', '순번']
+
+
+def file_year(path: Path) -> str:
+    """파일명의 연도 (result_2024_v01_... → '2024', 없으면 '')"""
+    match = re.search(r'(?<!\d)(19|2\d)\d{2}(?!\d)', path.stem)
+    return match.group(0) if match else ''
+
+
+def list_versions(company: str, input_root: Path = INPUT_ROOT) -> dict:
+    """회사 폴더의 병합 결과를 파일명의 연도별로 묶음
+
+    Returns:
+        {연도: [경로, ...]} - 연도 순, 연도 안은 파일명의 생성 시각 순 (다른 연도 파일끼리는 버전이 아님)
+    """
+    versions = {}
+    for path in sorted((input_root / company).glob('result_*.json'), key=lambda p: p.stem.split('_')[-2:]):
+        versions.setdefault(file_year(path), []).append(path)
+    return dict(sorted(versions.items()))
+
+
+def _hash_rows(frame: pd.DataFrame) -> np.ndarray:
+    """행 내용 해시 (dtype 차이 무시: 값의 문자열 표현으로 비교, 결측끼리는 같음)"""
+    normalized = frame.astype(object).where(frame.notna(), None)
+    return pd.util.hash_pandas_object(normalized, index=False).to_numpy()
+
+
+def _changed_columns(old_rows: pd.DataFrame, new_rows: pd.DataFrame, columns: list) -> list:
+    """변경 행별 '컬럼: 이전 → 이후' 목록 (컬럼 단위 벡터 비교, 다른 셀만 문자열로)"""
+    changes = [[] for _ in range(len(old_rows))]
+    for col in columns:
+        before, after = old_rows[col].to_numpy(dtype=object), new_rows[col].to_numpy(dtype=object)
+        same = (before.astype(str) == after.astype(str)) | (pd.isna(before) & pd.isna(after))
+        for i in np.flatnonzero(~same):
+            changes[i].append(f"{col}: {before[i]} → {after[i]}")
+    return ['; '.join(c) for c in changes]
+
+
+def pivot_delta(added: pd.DataFrame, removed: pd.DataFrame) -> pd.DataFrame:
+    """기본피벗 셀별 순액/건수 증감 (added는 +, removed는 -)"""
+    rows = pd.concat([added.assign(_부호=1), removed.assign(_부호=-1)], ignore_index=True)
+    if len(rows) == 0:
+        return pd.DataFrame(columns=PIVOT_DIMS + ['분개장', '카드미반영', '총합계', '건수증감'])
+    rows['_증감'] = rows['순액'].fillna(0) * rows['_부호']
+
+    amount = rows.pivot_table(index=PIVOT_DIMS, columns='데이터소스', values='_증감', aggfunc='sum', fill_value=0)
+    for col in ['분개장', '카드미반영']:
+        if col not in amount.columns:
+            amount[col] = 0
+    delta = amount[['분개장', '카드미반영']].copy()
+    delta['총합계'] = delta.sum(axis=1)
+    delta['건수증감'] = rows.groupby(PIVOT_DIMS)['_부호'].sum()
+    delta = delta[(delta['총합계'] != 0) | (delta['분개장'] != 0) | (delta['건수증감'] != 0)]
+    delta.columns.name = None
+    return delta.reset_index()
+
+
+def diff_versions(old: pd.DataFrame, new: pd.DataFrame) -> dict:
+    """두 버전 비교
+
+    Returns:
+        {'요약', '추가', '삭제', '변경', '피벗증감'} DataFrame
+    """
+    columns = [c for c in old.columns if c in new.columns]
+    _, old_index = index_ledger(old, collapse=False)
+    _, new_index = index_ledger(new, collapse=False)
+    old_side = pd.DataFrame({'키해시': old_index.hashes, '순번': old_index.occurrence,
+                             '_이전': np.arange(len(old)), '_이전해시': _hash_rows(old[columns])})
+    new_side = pd.DataFrame({'키해시': new_index.hashes, '순번': new_index.occurrence,
+                             '_이후': np.arange(len(new)), '_이후해시': _hash_rows(new[columns])})
+
+    # 행 키 해시 조인 (loader 기본 키 인덱스의 키 해시 + 등장 순번)
+    joined = old_side.merge(new_side, on=KEY_COLS, how='outer', indicator=True)
+    removed_pos = joined.loc[joined['_merge'] == 'left_only', '_이전'].astype(int).to_numpy()
+    added_pos = joined.loc[joined['_merge'] == 'right_only', '_이후'].astype(int).to_numpy()
+    both = joined[joined['_merge'] == 'both']
+    modified = both[both['_이전해시'] != both['_이후해시']]
+    modified_old = old.iloc[modified['_이전'].astype(int).to_numpy()]
+    modified_new = new.iloc[modified['_이후'].astype(int).to_numpy()]
+
+    detail = [c for c in DETAIL_COLS if c in columns]
+    added = new.iloc[added_pos]
+    removed = old.iloc[removed_pos]
+    changes = modified_new[detail].reset_index(drop=True)
+    changes.insert(len(changes.columns), '이전_순액', modified_old['순액'].to_numpy())
+    changes['변경내용'] = _changed_columns(modified_old, modified_new, columns)
+
+    # 피벗 증감: 추가 + 변경 후 행은 +, 삭제 + 변경 전 행은 -
+    delta = pivot_delta(pd.concat([added, modified_new]), pd.concat([removed, modified_old]))
+
+    summary = pd.DataFrame([
+        {'항목': '이전 버전 행수', '값': len(old)},
+        {'항목': '새 버전 행수', '값': len(new)},
+        {'항목': '추가', '값': len(added)},
+        {'항목': '삭제', '값': len(removed)},
+        {'항목': '변경', '값': len(changes)},
+        {'항목': '동일', '값': len(both) - len(changes)},
+        {'항목': '이전 버전 완전 중복', '값': len(old_index.duplicates)},
+        {'항목': '새 버전 완전 중복', '값': len(new_index.duplicates)},
+        {'항목': '순액 증감', '값': int(delta['총합계'].sum()) if len(delta) else 0},
+        {'항목': '새 버전에만 있는 컬럼', '값': ', '.join(c for c in new.columns if c not in old.columns)},
+        {'항목': '이전 버전에만 있는 컬럼', '값': ', '.join(c for c in old.columns if c not in new.columns)},
+    ])
+    return {
+        '요약': summary,
+        '추가': added[detail].reset_index(drop=True),
+        '삭제': removed[detail].reset_index(drop=True),
+        '변경': changes,
+        '피벗증감': delta,
+    }
+
+
+def compare_files(old_path: Path, new_path: Path, output_root: Path = OUTPUT_ROOT) -> Path:
+    """두 병합 결과 파일 비교 후 Excel 출력"""
+    print(f"버전 비교: {old_path.name} → {new_path.name}")
+    diff = diff_versions(load_ledger(old_path), load_ledger(new_path))
+
+    output_dir = output_root / new_path.parent.name
+    output_dir.mkdir(parents=True, exist_ok=True)
+    excel_path = output_dir / f"버전비교_{old_path.stem}__{new_path.stem}.xlsx"
+    export_workbooks(excel_path, [(name, table, False, False) for name, table in diff.items()])
+
+    for _, row in diff['요약'].iterrows():
+        if row['값'] != '':
+            print(f"   {row['항목']}: {row['값']:,}" if isinstance(row['값'], (int, np.integer)) else f"   {row['항목']}: {row['값']}")
+    print(f"   피벗 증감 셀: {len(diff['피벗증감'])}개")
+    print(f"   Excel 저장: {excel_path}")
+    return excel_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description='병합 결과 버전 비교')
+    parser.add_argument('targets', nargs='+', help='회사명 (최근 두 버전 비교) 또는 이전/새 결과 파일 경로 2개')
+    parser.add_argument('--year', help='회사명으로 비교할 때 연도 (기본: 버전이 2개 이상인 가장 최근 연도)')
+    parser.add_argument('--input-root', type=Path, default=INPUT_ROOT)
+    parser.add_argument('--output-root', type=Path, default=OUTPUT_ROOT)
+    args = parser.parse_args()
+
+    if len(args.targets) == 1:
+        versions = list_versions(args.targets[0], args.input_root)
+        if args.year:
+            candidates = [args.year] if len(versions.get(args.year, [])) >= 2 else []
+        else:
+            candidates = [year for year, paths in versions.items() if len(paths) >= 2]
+        if not candidates:
+            counts = ', '.join(f"{year or '연도 없음'} {len(paths)}개" for year, paths in versions.items()) or '0개'
+            parser.error(f"같은 연도의 비교할 버전이 2개 미만: {args.input_root / args.targets[0]} ({counts})")
+        old_path, new_path = versions[candidates[-1]][-2:]
+    elif len(args.targets) == 2:
+        old_path, new_path = (Path(t) for t in args.targets)
+    else:
+        parser.error('회사명 하나 또는 파일 경로 두 개를 지정')
+    compare_files(old_path, new_path, args.output_root)
+
+
+if __name__ == '__main__':
+    main()
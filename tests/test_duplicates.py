@@ -0,0 +1,74 @@
+"""중복 전표 탐지(find_duplicates) 회귀 테스트"""
+import pandas as pd
+
+from duplicates import CROSS_SOURCE_LABEL, find_duplicates
+
+
+def ledger(rows):
+    df = pd.DataFrame(rows, columns=['데이터소스', '전표번호', '거래처명_filled', '회계일자', '순액'])
+    df['회계일자_dt'] = pd.to_datetime(df['회계일자'], format='%Y%m%d')
+    return df
+
+
+def pairs(result):
+    return sorted(zip(result['원행'], result['중복행'], result['구분']))
+
+
+def test_card_row_booked_in_journal_is_reported():
+    # 같은 전표번호/거래처/금액/일자로 분개장에 반영됐는데 카드미반영에도 남은 행
+    df = ledger([
+        ['분개장', '3674', '한빛상사', '20240628', 55000],
+        ['카드미반영', '3674', '한빛상사', '20240628', 55000],
+        ['분개장', '3700', '다른상사', '20240701', 12000],
+    ])
+    result = find_duplicates(df)
+    assert pairs(result) == [(0, 1, CROSS_SOURCE_LABEL)]
+    assert result['일자차'].tolist() == [0]
+
+
+def test_cross_source_twin_is_not_reported_twice():
+    df = ledger([
+        ['분개장', '3674', '한빛상사', '20240628', 55000],
+        ['분개장', '3674', '한빛상사', '20240628', -5000],
+        ['카드미반영', '3674', '한빛상사', '20240628', 55000],
+    ])
+    assert pairs(find_duplicates(df)) == [(0, 2, CROSS_SOURCE_LABEL)]
+
+
+def test_double_entry_with_different_slips():
+    df = ledger([
+        ['분개장', '100', '한빛상사', '20240301', 33000],
+        ['분개장', '105', '한빛상사', '20240302', 33000],
+        ['분개장', '106', '한빛상사', '20240320', 33000],  # 일자 허용 범위 밖
+        ['분개장', '107', '한빛상사', '20240302', 33200],  # 금액 1% 이내
+    ])
+    assert pairs(find_duplicates(df)) == [(0, 1, '근접'), (0, 3, '근접'), (1, 3, '근접')]
+
+
+def test_exact_label_needs_same_trader_amount_and_date():
+    df = ledger([
+        ['분개장', '100', '한빛상사', '20240301', 33000],
+        ['카드미반영', '900', '한빛상사', '20240301', 33000],
+    ])
+    assert pairs(find_duplicates(df)) == [(0, 1, '정확')]
+
+
+def test_lines_of_the_same_voucher_are_not_pairs():
+    df = ledger([
+        ['분개장', '5431', '한빛상사', '20240301', 10000],
+        ['분개장', '5431', '한빛상사', '20240301', 10000],
+        ['분개장', '', '한빛상사', '20240405', 7000],
+        ['분개장', '', '한빛상사', '20240405', 7000],
+    ])
+    # 전표번호가 없는 행은 서로 다른 전표로 봄
+    assert pairs(find_duplicates(df)) == [(2, 3, '정확')]
+
+
+def test_unknown_trader_and_zero_amount_are_skipped():
+    df = ledger([
+        ['분개장', '1', '(미지정)', '20240301', 1000],
+        ['분개장', '2', '(미지정)', '20240301', 1000],
+        ['분개장', '3', '한빛상사', '20240301', 0],
+        ['분개장', '4', '한빛상사', '20240301', 0],
+    ])
+    assert find_duplicates(df).empty
@@ -0,0 +1,50 @@
+"""기본 키 인덱스(index_ledger) 회귀 테스트"""
+import pandas as pd
+import pytest
+
+from loader import index_ledger
+
+
+@pytest.fixture
+def ledger():
+    # 0, 1: 완전 중복 (이중 병합) / 2, 3: 키 충돌 (같은 키, 다른 금액) / 4, 5: 데이터키 없는 카드미반영
+    return pd.DataFrame({
+        '데이터키': ['K1', 'K1', 'K2', 'K2', None, None],
+        '입력순서': ['1', '1', '1', '1', None, None],
+        '데이터소스': ['분개장', '분개장', '분개장', '분개장', '카드미반영', '카드미반영'],
+        '전표번호': [10, 10, 11, 11, 900, 901],
+        '순액': [1000, 1000, 2000, 2500, 300, 300],
+    })
+
+
+def test_collapse_removes_exact_duplicates(ledger):
+    df, index = index_ledger(ledger, collapse=True)
+    assert len(df) == 5
+    assert index.duplicates.tolist() == [1]
+    assert index.conflicts.tolist() == [2]  # 제거 후 위치
+    report = index.report().set_index('컬럼')
+    assert report.loc['완전중복', '위반건수'] == 1
+    assert report.loc['완전중복', '비고'].endswith('(제거)')
+    assert report.loc['키충돌', '위반건수'] == 1
+
+
+def test_without_collapse_duplicates_are_still_identified(ledger):
+    df, index = index_ledger(ledger, collapse=False)
+    assert len(df) == 6
+    assert index.duplicates.tolist() == [1]
+    assert index.conflicts.tolist() == [3]
+    report = index.report().set_index('컬럼')
+    assert report.loc['완전중복', '위반건수'] == 1
+    assert report.loc['완전중복', '비고'].endswith('(유지)')
+    assert report.loc['키충돌', '위반건수'] == 1
+
+
+def test_card_rows_without_data_key_use_slip_number(ledger):
+    _, index = index_ledger(ledger.iloc[4:].reset_index(drop=True), collapse=False)
+    assert len(index.duplicates) == 0 and len(index.conflicts) == 0
+
+
+def test_lookup_returns_first_row_of_key(ledger):
+    df, index = index_ledger(ledger, collapse=True)
+    assert index.lookup(df, 'K2', 1)['순액'] == 2000
+    assert index.lookup(df, 'K9', 1) is None
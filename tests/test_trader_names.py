@@ -0,0 +1,64 @@
+"""거래처명 정규화 인덱스 회귀 테스트"""
+import pandas as pd
+
+from trader_names import build_trader_index, canonical_trader_names, load_trader_index, merge_proposal_report
+
+
+def ledger(names, biz=None, codes=None):
+    df = pd.DataFrame({'거래처명': names})
+    if biz is not None:
+        df['사업자등록번호'] = biz
+    if codes is not None:
+        df['거래처코드'] = codes
+    return df
+
+
+def test_legal_form_and_spacing_merge():
+    mapping = build_trader_index(ledger(['(주)엘지유플러스', '엘지유플러스', '엘지 유플러스', '엘지유플러스']))['mapping']
+    assert set(mapping.values()) == {'엘지유플러스'}
+
+
+def test_similar_branches_are_proposed_not_merged():
+    index = build_trader_index(ledger(['스타벅스강남', '스타벅스강남', '스타벅스강동']))
+    assert index['mapping'] == {'스타벅스강남': '스타벅스강남', '스타벅스강동': '스타벅스강동'}
+    assert index['proposals'][['거래처명', '유사거래처명']].values.tolist() == [['스타벅스강남', '스타벅스강동']]
+
+
+def test_same_key_with_different_business_ids_stays_apart():
+    index = build_trader_index(ledger(['(주)한빛', '한빛'], biz=['1110000001', '2220000002']))
+    assert index['mapping'] == {'(주)한빛': '(주)한빛', '한빛': '한빛'}
+
+
+def test_shared_trader_code_merges_different_names():
+    mapping = build_trader_index(ledger(['토스페이먼츠', '토스페이먼츠', '비바리퍼블리카'], codes=['T01', 'T01', 'T01']))['mapping']
+    assert mapping['비바리퍼블리카'] == '토스페이먼츠'
+
+
+def test_business_suffix_is_not_a_branch():
+    mapping = build_trader_index(ledger(['대한 정육점', '대한 서점']))['mapping']
+    assert mapping['대한 정육점'] != mapping['대한 서점']
+
+
+def test_cache_rebuilds_when_ids_change(tmp_path):
+    cache = tmp_path / 'trader_names.pkl'
+    before = ledger(['가나상사', '가나무역'], codes=['A1', 'B2'])
+    assert canonical_trader_names(before, cache).tolist() == ['가나상사', '가나무역']
+
+    # 이름 목록은 같고 거래처코드 배정만 바뀜 → 캐시 재사용하지 않음
+    after = ledger(['가나상사', '가나무역'], codes=['A1', 'A1'])
+    assert load_trader_index(after, cache)['key'] != load_trader_index(before, cache)['key']
+    assert canonical_trader_names(after, cache).nunique() == 1
+
+
+def test_cache_rebuilds_when_counts_change(tmp_path):
+    cache = tmp_path / 'trader_names.pkl'
+    codes = ['A1'] * 3
+    assert canonical_trader_names(ledger(['가나상사', '가나상사', '가나무역'], codes=codes), cache).iloc[0] == '가나상사'
+    # 최다 건수 표기가 바뀌면 대표명도 바뀜
+    assert canonical_trader_names(ledger(['가나상사', '가나무역', '가나무역'], codes=codes), cache).iloc[0] == '가나무역'
+
+
+def test_merge_proposal_report(tmp_path):
+    report = merge_proposal_report(ledger(['스타벅스강남', '스타벅스강동']), tmp_path / 'trader_names.pkl')
+    assert report['위반건수'].tolist() == [1]
+    assert '스타벅스강남 ↔ 스타벅스강동' in report['비고'].iloc[0]